@@ -0,0 +1,121 @@
+"""Benchmark sync vs async Firestore access under concurrent webhooks.
+
+Runs 50 concurrent fake webhook handlers against an in-process Firestore
+stand-in that simulates a fixed round-trip latency, once with the sync
+FirestoreClient called from the event loop and once with AsyncFirestoreClient.
+The query cache is disabled so both runs pay for every round trip.
+
+Usage:
+    python scripts/bench_async_firestore.py [--requests 50] [--latency-ms 40]
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.storage.firestore import AsyncFirestoreClient, FirestoreClient, query_cache  # noqa: E402
+
+
+class _FakeDoc:
+    def __init__(self, doc_id: str, data: dict | None):
+        self.id = doc_id
+        self._data = data
+        self.exists = data is not None
+
+    def to_dict(self) -> dict:
+        return dict(self._data)
+
+
+class _FakeQuery:
+    """Chainable query stand-in that sleeps once per round trip."""
+
+    def __init__(self, latency: float, is_async: bool):
+        self.latency = latency
+        self.is_async = is_async
+        self.docs = [_FakeDoc(f"doc{i}", {"type": "run", "calories": 500}) for i in range(5)]
+
+    def collection(self, *args, **kwargs):
+        return self
+
+    document = where = order_by = limit = collection
+
+    def stream(self):
+        if self.is_async:
+            return self._astream()
+        time.sleep(self.latency)
+        return iter(self.docs)
+
+    async def _astream(self):
+        await asyncio.sleep(self.latency)
+        for doc in self.docs:
+            yield doc
+
+    def get(self, **kwargs):
+        """Point read of a doc that doesn't exist (no activity doc yet)."""
+        if self.is_async:
+            return self._aget()
+        time.sleep(self.latency)
+        return _FakeDoc("missing", None)
+
+    async def _aget(self):
+        await asyncio.sleep(self.latency)
+        return _FakeDoc("missing", None)
+
+
+def _client(cls, latency: float, is_async: bool):
+    client = object.__new__(cls)
+    client.db = _FakeQuery(latency, is_async)
+    if cls is FirestoreClient:
+        client.write_behind = None
+    return client
+
+
+async def _sync_webhook(fs: FirestoreClient) -> float:
+    start = time.perf_counter()
+    await asyncio.sleep(0)
+    fs.get_workouts(days=3)
+    fs.get_meals(days=1)
+    fs.get_last_workout_date()
+    return time.perf_counter() - start
+
+
+async def _async_webhook(fs: AsyncFirestoreClient) -> float:
+    start = time.perf_counter()
+    await asyncio.sleep(0)
+    await asyncio.gather(fs.get_workouts(days=3), fs.get_meals(days=1))
+    await fs.get_last_workout_date()
+    return time.perf_counter() - start
+
+
+def _report(name: str, latencies: list[float]):
+    latencies = sorted(latencies)
+    p50 = statistics.median(latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"{name:<8} p50={p50 * 1000:8.1f} ms  p99={p99 * 1000:8.1f} ms")
+
+
+async def main(requests: int, latency_ms: float):
+    latency = latency_ms / 1000
+    query_cache.ttl = 0
+
+    sync_fs = _client(FirestoreClient, latency, is_async=False)
+    sync_latencies = await asyncio.gather(*(_sync_webhook(sync_fs) for _ in range(requests)))
+
+    async_fs = _client(AsyncFirestoreClient, latency, is_async=True)
+    async_latencies = await asyncio.gather(*(_async_webhook(async_fs) for _ in range(requests)))
+
+    print(f"{requests} concurrent webhooks, {latency_ms:.0f} ms simulated Firestore latency")
+    _report("sync", sync_latencies)
+    _report("async", async_latencies)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=40)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.latency_ms))
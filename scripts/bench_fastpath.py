@@ -0,0 +1,86 @@
+"""Benchmark the fast-path log parser against the labeled corpus.
+
+Reports precision and recall of parse() on tests/data/fastpath_corpus.jsonl,
+parse latency, and end-to-end try_fast_path latency (parse + write to the
+in-memory storage engine + template reply), next to a nominal agent round-trip time for
+comparison.
+
+Usage:
+    python scripts/bench_fastpath.py [--runs 200] [--agent-ms 1500]
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+os.environ.setdefault("STORAGE_BACKEND", "memory")
+
+from src.agent.fastpath import parse, try_fast_path  # noqa: E402
+
+CORPUS = Path(__file__).parent.parent / "tests" / "data" / "fastpath_corpus.jsonl"
+
+
+def _label(log) -> dict | None:
+    if log is None:
+        return None
+    if log.kind == "workout":
+        return {"kind": "workout", "workout_type": log.workout_type, "duration_mins": log.duration_mins}
+    return {"kind": "meal", "meal_type": log.meal_type, "calories": log.calories}
+
+
+def _percentiles(samples: list[float]) -> str:
+    samples = sorted(samples)
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))]
+    return f"p50 {statistics.median(samples) * 1000:.3f} ms, p99 {p99 * 1000:.3f} ms"
+
+
+def accuracy(rows: list[dict]):
+    parsed = [(row["label"], _label(parse(row["text"]))) for row in rows]
+    hits = [(want, got) for want, got in parsed if got is not None]
+    correct = sum(1 for want, got in hits if want == got)
+    logs = sum(1 for want, _ in parsed if want is not None)
+    print(f"Corpus: {len(rows)} messages, {logs} logs")
+    print(f"  precision {correct / len(hits):.1%} ({correct}/{len(hits)} parses correct)")
+    print(f"  recall    {correct / logs:.1%} ({correct}/{logs} logs handled without the agent)")
+
+
+async def latency(rows: list[dict], runs: int, agent_ms: float):
+    texts = [row["text"] for row in rows]
+
+    parse_times = []
+    for _ in range(runs):
+        for text in texts:
+            start = time.perf_counter()
+            parse(text)
+            parse_times.append(time.perf_counter() - start)
+    print(f"parse():          {_percentiles(parse_times)}")
+
+    logs = [row["text"] for row in rows if _label(parse(row["text"])) is not None]
+    e2e = []
+    for _ in range(runs):
+        for text in logs:
+            start = time.perf_counter()
+            await try_fast_path(text, "bench", {})
+            e2e.append(time.perf_counter() - start)
+    print(f"try_fast_path():  {_percentiles(e2e)}  (in-memory storage)")
+    print(f"agent round trip: ~{agent_ms:.0f} ms per log (--agent-ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--agent-ms", type=float, default=1500.0)
+    args = parser.parse_args()
+
+    rows = [json.loads(line) for line in CORPUS.read_text().splitlines()]
+    accuracy(rows)
+    asyncio.run(latency(rows, args.runs, args.agent_ms))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Benchmark local memory index search against a Mem0 round trip.
+
+Builds one user's index from synthetic memories with the offline hashing
+embedder, then reports search latency (query embedding + cosine top-k) and
+the time to embed the whole set, next to a nominal Mem0 search round trip.
+
+Usage:
+    python scripts/bench_memory_index.py [--memories 500] [--runs 2000] [--mem0-ms 250]
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.storage.memory_index import HashingEmbedder, MemoryIndex  # noqa: E402
+
+SUBJECTS = ["morning workouts", "evening runs", "leg day", "the marathon", "burpees", "oatmeal", "protein shakes",
+            "the gym near work", "swimming", "yoga", "their knee", "sleep", "late-night snacks", "cycling to work"]
+VERBS = ["prefers", "hates", "is trying", "wants more", "is worried about", "skipped", "loves", "is cutting back on"]
+QUERIES = ["how am I doing this week", "recent activity and mood", "knee sore after running",
+           "what should I eat before a long run", "plan my leg day", "I skipped the gym again"]
+
+
+def _memories(count: int) -> list[dict]:
+    rng = random.Random(7)
+    return [
+        {"id": f"m{i}", "memory": f"User {rng.choice(VERBS)} {rng.choice(SUBJECTS)} ({i})",
+         "updated_at": f"2026-01-01T00:00:{i:06d}"}
+        for i in range(count)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--memories", type=int, default=500)
+    parser.add_argument("--runs", type=int, default=2000)
+    parser.add_argument("--mem0-ms", type=float, default=250.0, help="nominal Mem0 search round trip")
+    args = parser.parse_args()
+
+    index = MemoryIndex(HashingEmbedder())
+    start = time.perf_counter()
+    index.upsert(_memories(args.memories))
+    build = time.perf_counter() - start
+
+    samples = []
+    for i in range(args.runs):
+        query = QUERIES[i % len(QUERIES)]
+        start = time.perf_counter()
+        index.search(query, limit=10)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    p50 = statistics.median(samples) * 1e6
+    p99 = samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1e6
+
+    print(f"{args.memories} memories, embedded in {build * 1000:.1f} ms")
+    print(f"local search: p50 {p50:.0f} us, p99 {p99:.0f} us")
+    print(f"Mem0 search (nominal): {args.mem0_ms:.0f} ms ({args.mem0_ms * 1000 / p50:.0f}x p50)")
+
+
+if __name__ == "__main__":
+    main()
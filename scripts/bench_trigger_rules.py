@@ -0,0 +1,104 @@
+"""Benchmark trigger evaluation: per-rule queries vs a compiled rule plan.
+
+Evaluates 100 rules against an in-process async storage stand-in that
+simulates a fixed round-trip latency. The per-rule baseline fetches each
+rule's data inline, like check_triggers did before rules were compiled; the
+compiled plan fetches each distinct fact once, concurrently.
+
+Usage:
+    python scripts/bench_trigger_rules.py [--rules 100] [--latency-ms 40] [--runs 20]
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.scheduler.rules import EVENT_TYPES, FACT_PROVIDERS, compile_rules  # noqa: E402
+
+
+class _FakeStorage:
+    """Async storage stand-in that sleeps once per round trip."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    async def _round_trip(self):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+
+    async def get_last_workout_date(self, user_id: str):
+        await self._round_trip()
+        return None
+
+    async def get_daily_rollups(self, days: int = 7, user_id: str = "default"):
+        await self._round_trip()
+        return [{"calories": 1200}]
+
+
+def _rules(count: int) -> list[dict]:
+    """A mix of no_workout and calorie_deficit rules with varied thresholds."""
+    rules = []
+    for i in range(count):
+        if i % 2:
+            rules.append({"event": "calorie_deficit", "threshold": 100 + i * 10, "action": "sms"})
+        else:
+            rules.append({"event": "no_workout", "days": 1 + i % 7, "action": "sms"})
+    return rules
+
+
+async def _per_rule(rules: list[dict], storage, user_id: str) -> list[dict]:
+    triggered = []
+    for rule in rules:
+        event = EVENT_TYPES[rule["event"]]
+        facts = {name: await FACT_PROVIDERS[name](storage, user_id) for name in event.facts}
+        context = event.predicate(rule, facts)
+        if context is not None:
+            triggered.append({"rule": rule, "context": context})
+    return triggered
+
+
+async def _compiled(rules: list[dict], storage, user_id: str) -> list[dict]:
+    return await compile_rules(rules).run(storage, user_id)
+
+
+async def _measure(name: str, evaluate, rules: list[dict], latency: float, runs: int):
+    storage = _FakeStorage(latency)
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fired = await evaluate(rules, storage, "bench")
+        timings.append(time.perf_counter() - start)
+    print(
+        f"{name:<9} p50={statistics.median(timings) * 1000:8.1f} ms  "
+        f"queries/run={storage.calls // runs:4d}  fired={len(fired)}"
+    )
+
+
+async def main(rule_count: int, latency_ms: float, runs: int):
+    rules = _rules(rule_count)
+    latency = latency_ms / 1000
+    print(f"{rule_count} rules, {latency_ms:.0f} ms simulated storage latency, {runs} runs")
+    await _measure("per-rule", _per_rule, rules, latency, runs)
+    await _measure("compiled", _compiled, rules, latency, runs)
+
+    # Predicate evaluation alone, with facts already fetched
+    plan = compile_rules(rules)
+    facts = await plan.fetch_facts(_FakeStorage(0), "bench")
+    start = time.perf_counter()
+    for _ in range(1000):
+        plan.evaluate(facts)
+    print(f"evaluate  {(time.perf_counter() - start) * 1000:.3f} us per {rule_count}-rule pass")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rules", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=40)
+    parser.add_argument("--runs", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.rules, args.latency_ms, args.runs))
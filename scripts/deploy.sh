@@ -73,6 +73,30 @@ gcloud scheduler jobs create http layz-trigger-check \
   --schedule "0 * * * *" \
   --uri "$SERVICE_URL/cron/check-triggers"
 
+# Activity state repair (nightly)
+gcloud scheduler jobs create http layz-activity-repair \
+  --location $REGION \
+  --schedule "30 3 * * *" \
+  --uri "$SERVICE_URL/cron/repair-activity-state" \
+  --http-method POST \
+  --oidc-service-account-email "$PROJECT_ID@appspot.gserviceaccount.com" \
+  2>/dev/null || gcloud scheduler jobs update http layz-activity-repair \
+  --location $REGION \
+  --schedule "30 3 * * *" \
+  --uri "$SERVICE_URL/cron/repair-activity-state"
+
+# Log compaction (weekly)
+gcloud scheduler jobs create http layz-compact-logs \
+  --location $REGION \
+  --schedule "0 4 * * 0" \
+  --uri "$SERVICE_URL/cron/compact-logs" \
+  --http-method POST \
+  --oidc-service-account-email "$PROJECT_ID@appspot.gserviceaccount.com" \
+  2>/dev/null || gcloud scheduler jobs update http layz-compact-logs \
+  --location $REGION \
+  --schedule "0 4 * * 0" \
+  --uri "$SERVICE_URL/cron/compact-logs"
+
 echo ""
 echo "Deployment complete!"
 echo ""
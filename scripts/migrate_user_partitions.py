@@ -0,0 +1,131 @@
+"""Migrate global log collections into per-user partitions.
+
+Copies ``logs/workouts/entries`` and ``logs/nutrition/entries`` into
+``users/{user_id}/workouts`` and ``users/{user_id}/meals``, keeping document
+IDs and rebuilding daily rollups as it goes.
+
+The migration is resumable: each page of copied entries (and, with
+``--delete-source``, the deletes of their sources) is committed in the same
+WriteBatch as the user's checkpoint doc (``migrations/user_partitions_{id}``),
+so a rerun picks up after the last committed page, never double-counts
+rollups and never leaves a copied page undeleted. Once every page is copied,
+the user's activity doc is rebuilt from the new rollups and entries.
+
+Usage:
+    python scripts/migrate_user_partitions.py [--user-id 15551234567] [--page-size 150] [--delete-source]
+"""
+import argparse
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+from dotenv import load_dotenv
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+load_dotenv()
+
+# (source path under logs/, target collection under users/{id}/)
+SOURCES = [("workouts", "workouts"), ("nutrition", "meals")]
+
+MAX_BATCH_WRITES = 500
+
+
+def max_page_size(delete_source: bool) -> int:
+    """Largest page whose writes (entry, rollup[, delete] per doc, plus the checkpoint) fit one batch."""
+    return (MAX_BATCH_WRITES - 1) // (3 if delete_source else 2)
+
+
+def _day_key(timestamp) -> str:
+    """Rollup day for an entry timestamp in the user's timezone."""
+    tz = ZoneInfo(os.getenv("USER_TIMEZONE") or "America/Los_Angeles")
+    if isinstance(timestamp, datetime):
+        return timestamp.astimezone(tz).date().isoformat()
+    return datetime.now(tz).date().isoformat()
+
+
+def _rollup_update(target: str, day_key: str, entry: dict) -> dict:
+    from src.storage.firestore import _meal_rollup_update, _workout_rollup_update
+
+    if target == "workouts":
+        return _workout_rollup_update(day_key, entry.get("type", "general"), entry.get("duration_mins", 0))
+    return _meal_rollup_update(
+        day_key,
+        entry.get("calories", 0),
+        entry.get("protein", 0),
+        entry.get("carbs", 0),
+        entry.get("fat", 0),
+    )
+
+
+def migrate(db, user_id: str, page_size: int = 150, delete_source: bool = False) -> dict:
+    """Copy every global entry into the user's partition; returns counts per target."""
+    from firebase_admin import firestore
+
+    checkpoint_ref = db.collection("migrations").document(f"user_partitions_{user_id}")
+    checkpoint = checkpoint_ref.get()
+    state = checkpoint.to_dict() if checkpoint.exists else {}
+    migrated = {}
+
+    for source, target in SOURCES:
+        source_entries = db.collection("logs").document(source).collection("entries")
+        user_ref = db.collection("users").document(user_id)
+        cursor = state.get(target)
+        migrated[target] = 0
+
+        while True:
+            query = source_entries.order_by(firestore.FieldPath.document_id()).limit(page_size)
+            if cursor:
+                query = query.start_after([cursor])
+            docs = list(query.stream())
+            if not docs:
+                break
+
+            # Entry + rollup (+ delete) per doc, plus the checkpoint, must fit one batch
+            batch = db.batch()
+            for doc in docs:
+                entry = doc.to_dict()
+                batch.set(user_ref.collection(target).document(doc.id), {**entry, "user_id": user_id})
+                day_key = _day_key(entry.get("timestamp"))
+                batch.set(
+                    user_ref.collection("rollups").document(day_key),
+                    _rollup_update(target, day_key, entry),
+                    merge=True,
+                )
+                if delete_source:
+                    batch.delete(doc.reference)
+            cursor = docs[-1].id
+            batch.set(checkpoint_ref, {target: cursor, "user_id": user_id}, merge=True)
+            batch.commit()
+            migrated[target] += len(docs)
+            print(f"  {target}: migrated {migrated[target]} entries (cursor {cursor})")
+
+    return migrated
+
+
+def main():
+    from src.agent.context import user_id_from_phone
+    from src.storage.firestore import FirestoreClient
+
+    parser = argparse.ArgumentParser(description="Migrate global logs into per-user partitions.")
+    parser.add_argument("--user-id", default=user_id_from_phone(os.getenv("USER_PHONE_NUMBER")))
+    parser.add_argument("--page-size", type=int, default=150)
+    parser.add_argument("--delete-source", action="store_true", help="Delete source entries once copied")
+    args = parser.parse_args()
+
+    limit = max_page_size(args.delete_source)
+    if args.page_size > limit:
+        parser.error(f"--page-size must be at most {limit} with these options (one batch per page)")
+
+    client = FirestoreClient()
+    print(f"Migrating global logs into users/{args.user_id}/...")
+    counts = migrate(client.db, args.user_id, args.page_size, args.delete_source)
+    print(f"Migrated {counts}; rebuilding users/{args.user_id}/state/activity...")
+    state = client.rebuild_activity_state(user_id=args.user_id)
+    print(f"Done! Streak {state['streak_days']} days, last workout {state['last_workout_at']}")
+
+
+if __name__ == "__main__":
+    main()
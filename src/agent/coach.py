@@ -1,4 +1,11 @@
 """Fitness coach agent definition."""
+import asyncio
+import logging
+import os
+import time
+from functools import lru_cache
+from typing import Hashable, Mapping
+
 from agents import Agent, Runner
 
 from src.agent.tools import (
@@ -7,107 +14,225 @@ from src.agent.tools import (
     get_last_workout,
     log_meal,
     get_nutrition_summary,
+    get_dashboard,
     send_sms,
     initiate_call,
+    log_workout_async,
+    get_fitness_summary_async,
+    get_last_workout_async,
+    log_meal_async,
+    get_nutrition_summary_async,
+    get_dashboard_async,
+    send_sms_async,
+    initiate_call_async,
 )
+from src.agent import prompts
+from src.agent.context import tool_stats, user_context
+from src.agent.prompts import prompt_cache_stats
+from src.agent.response_cache import response_cache
+from src.agent.router import default_model, model_router
+from src.agent.factory import agent_builder, get_agent
+from src.agent.fastpath import try_fast_path
+from src.agent.memory_packer import memory_context, memory_context_async
+from src.agent.stages import Stage, gather_stages
 from src.config.loader import ConfigLoader
+from src.config.snapshot import load_defaults
+from src.storage.engine import get_async_storage
 from src.storage.memory import MemoryWrapper
+from src.storage.memory_persister import memory_persister
+
+logger = logging.getLogger(__name__)
+
+# Per-stage context budgets for chat_async, in seconds
+MEMORY_TIMEOUT = float(os.getenv("CONTEXT_MEMORY_TIMEOUT", "1.5"))
+AGENT_TIMEOUT = float(os.getenv("CONTEXT_AGENT_TIMEOUT", "2.0"))
+ACTIVITY_TIMEOUT = float(os.getenv("CONTEXT_ACTIVITY_TIMEOUT", "1.0"))
+PREFETCH_ACTIVITY = os.getenv("CONTEXT_PREFETCH_ACTIVITY", "true").lower() in ("1", "true", "yes")
+
+
+# Async tools for runs on the event loop. chat() runs on a fresh loop per
+# call (Runner.run_sync), where the loop-bound async storage client can't be
+# used, so it keeps the sync tools; the SDK runs those in worker threads.
+COACH_TOOLS = [
+    log_workout_async,
+    get_fitness_summary_async,
+    get_last_workout_async,
+    log_meal_async,
+    get_nutrition_summary_async,
+    get_dashboard_async,
+    send_sms_async,
+    initiate_call_async,
+]
+COACH_TOOLS_SYNC = [
+    log_workout,
+    get_fitness_summary,
+    get_last_workout,
+    log_meal,
+    get_nutrition_summary,
+    get_dashboard,
+    send_sms,
+    initiate_call,
+]
 
 
+def _build_fitness_coach(personality: Mapping, user: Mapping, tools: list = COACH_TOOLS) -> Agent:
+    instructions = prompts.instructions(
+        personality,
+        f"You are coaching {user.get('name') or 'the user'}.",
+        prompts.COACH_TOOLS_DOC,
+    )
+
+    return Agent(
+        name="FitnessCoach",
+        instructions=instructions,
+        tools=list(tools),
+        model=default_model(),
+    )
+
+
+@agent_builder("coach")
 def create_fitness_coach() -> Agent:
     """Create the fitness coach agent with current personality."""
     config = ConfigLoader()
-    personality = config.get_personality()
-    user = config.get_user()
+    return _build_fitness_coach(config.get_personality(), config.get_user())
 
-    base_prompt = personality.get("prompt", "You are a helpful fitness coach.")
 
-    instructions = f"""
-{base_prompt}
+@agent_builder("coach-sync")
+def create_sync_fitness_coach() -> Agent:
+    """The fitness coach with sync tools, for chat()."""
+    config = ConfigLoader()
+    return _build_fitness_coach(config.get_personality(), config.get_user(), COACH_TOOLS_SYNC)
 
-You are coaching {user.get('name', 'the user')}.
 
-You have access to tools to:
-- Log workouts and meals they tell you about
-- Check their workout and nutrition history
-- Send them SMS messages
-- Call them if needed
+@lru_cache(maxsize=1)
+def default_fitness_coach() -> Agent:
+    """Coach built from configs/defaults.json, for when config can't be loaded in time."""
+    personality = load_defaults().get("personality", {})
+    preset = personality.get("presets", {}).get(personality.get("active"), {})
+    return _build_fitness_coach(preset, {"name": os.getenv("USER_NAME") or "the user"})
 
-When they tell you about a workout or meal, log it. When they ask about their progress, check their history.
-Be concise in your responses - this is SMS, not email.
-"""
 
-    return Agent(
-        name="FitnessCoach",
-        instructions=instructions,
-        tools=[
-            log_workout,
-            get_fitness_summary,
-            get_last_workout,
-            log_meal,
-            get_nutrition_summary,
-            send_sms,
-            initiate_call,
-        ],
-        model="gpt-4o",
-    )
+def _remember(user_id: str, user_message: str, reply: str):
+    """Store the exchange in memory off the reply path."""
+    memory_persister.persist(user_id, [
+        {"role": "user", "content": user_message},
+        {"role": "assistant", "content": reply},
+    ])
 
 
 def chat(user_message: str, user_id: str = "default") -> str:
     """Handle a chat message with memory integration."""
-    config = ConfigLoader()
     memory = MemoryWrapper(user_id=user_id)
 
     # Search for relevant memories
-    relevant_memories = memory.search(user_message, limit=10)
+    relevant_memories = memory_context(memory, user_message, "sms")
 
-    # Create agent with memory context
-    agent = create_fitness_coach()
+    agent = get_agent("coach-sync", user_id)
 
-    # Inject memories into the conversation context
-    memory_context = memory.format_memories(relevant_memories)
-    augmented_message = f"""
-[Context from past conversations:]
-{memory_context}
+    augmented_message = prompts.run_input(user_message, relevant_memories)
 
-[User message:]
-{user_message}
-"""
+    # Run the agent on the model tier this turn needs
+    route = model_router.route("coach", user_message)
+    started = time.perf_counter()
+    with user_context(user_id):
+        result = Runner.run_sync(agent, augmented_message, run_config=route.run_config())
+    model_router.record(route, started, result)
+    prompt_cache_stats.record("coach", result)
+    tool_stats.record_run(result)
 
-    # Run the agent
-    result = Runner.run_sync(agent, augmented_message)
-
-    # Store this conversation in memory
-    memory.add_conversation([
-        {"role": "user", "content": user_message},
-        {"role": "assistant", "content": result.final_output},
-    ])
+    # Store this conversation in memory off the reply path
+    _remember(user_id, user_message, result.final_output)
 
     return result.final_output
 
 
-async def chat_async(user_message: str, user_id: str = "default") -> str:
-    """Async version of chat."""
-    config = ConfigLoader()
-    memory = MemoryWrapper(user_id=user_id)
+def _format_activity(state: dict) -> str:
+    """One-line summary of the user's activity state for the prompt."""
+    today = state["today"]
+    return (
+        f"Streak: {state['streak_days']} days. "
+        f"Today: {today['workout_count']} workouts ({today['workout_minutes']} min), "
+        f"{today['meal_count']} meals, {today['calories']} cal."
+    )
 
-    relevant_memories = memory.search(user_message, limit=10)
-    agent = create_fitness_coach()
 
-    memory_context = memory.format_memories(relevant_memories)
-    augmented_message = f"""
-[Context from past conversations:]
-{memory_context}
+async def _search_memories(user_message: str, user_id: str) -> list[str]:
+    return await memory_context_async(MemoryWrapper(user_id=user_id), user_message, "sms")
 
-[User message:]
-{user_message}
-"""
 
-    result = await Runner.run(agent, augmented_message)
+async def _load_agent(user_id: str) -> Agent:
+    return await asyncio.to_thread(get_agent, "coach", user_id)
 
-    memory.add_conversation([
-        {"role": "user", "content": user_message},
-        {"role": "assistant", "content": result.final_output},
-    ])
+
+async def _recent_activity(user_id: str) -> str:
+    return _format_activity(await get_async_storage().get_activity_state(user_id=user_id))
+
+
+async def chat_async(user_message: str, user_id: str = "default") -> str:
+    """Async version of chat.
+
+    Memory search, agent/config load and the activity prefetch run as
+    concurrent stages with their own timeouts. A stage that is slow or fails
+    degrades to empty context (or the default personality, for the agent)
+    instead of delaying the reply. Plain workout/meal logs are handled by
+    the fast path without an agent run, and repeated progress questions are
+    answered from the response cache until the user logs something new.
+    """
+    personality = ConfigLoader().get_personality()
+    reply, cache_key = await quick_reply(user_message, user_id, personality)
+    if reply is not None:
+        return reply
+    return await agent_reply(user_message, user_id, personality, cache_key)
+
+
+async def quick_reply(user_message: str, user_id: str, personality: Mapping) -> tuple[str | None, Hashable | None]:
+    """Answer from the fast path or the response cache, without an agent run.
+
+    Returns the reply (None on a miss) and the response cache key to hand to
+    agent_reply(), so a miss doesn't read the data version twice.
+    """
+    reply = await try_fast_path(user_message, user_id, personality)
+    if reply is not None:
+        _remember(user_id, user_message, reply)
+        return reply, None
+
+    # The version read shares the activity stage's budget; a slow one is a cache miss
+    cache_key = await response_cache.key_for(user_message, user_id, personality, timeout=ACTIVITY_TIMEOUT)
+    reply = response_cache.get(cache_key) if cache_key is not None else None
+    if reply is not None:
+        _remember(user_id, user_message, reply)
+    return reply, cache_key
+
+
+async def agent_reply(
+    user_message: str, user_id: str, personality: Mapping, cache_key: Hashable | None = None
+) -> str:
+    """Run the coach agent on a message quick_reply() couldn't answer."""
+    stages = [
+        Stage("memory", lambda: _search_memories(user_message, user_id), MEMORY_TIMEOUT, []),
+        Stage("agent", lambda: _load_agent(user_id), AGENT_TIMEOUT),
+    ]
+    if PREFETCH_ACTIVITY:
+        stages.append(Stage("activity", lambda: _recent_activity(user_id), ACTIVITY_TIMEOUT, ""))
+    results = await gather_stages(*stages)
+    logger.debug("Context stages: %s", {name: (r.status, round(r.seconds * 1000, 1)) for name, r in results.items()})
+
+    relevant_memories = results["memory"].value
+    agent = results["agent"].value or default_fitness_coach()
+    activity = results["activity"].value if "activity" in results else ""
+
+    augmented_message = prompts.run_input(user_message, relevant_memories, activity or None)
+
+    route = model_router.route("coach", user_message)
+    started = time.perf_counter()
+    with user_context(user_id):
+        result = await Runner.run(agent, augmented_message, run_config=route.run_config())
+    model_router.record(route, started, result)
+    prompt_cache_stats.record("coach", result)
+    tool_stats.record_run(result)
+
+    if cache_key is not None:
+        response_cache.set(cache_key, result.final_output)
+    _remember(user_id, user_message, result.final_output)
 
     return result.final_output
@@ -0,0 +1,144 @@
+"""Per-conversation context shared with agent tools.
+
+``user_context`` scopes one agent run: tools read the user it is acting for,
+and read-only tools decorated with ``memoized`` return the same result when
+called again with the same arguments inside the run.
+
+Every tool has a sync implementation for ``chat()`` and an ``async_twin``
+for runs on the event loop, which the model sees under the same name.
+"""
+import functools
+import inspect
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from src import metrics
+from src.storage.base import DEFAULT_USER_ID
+
+_current_user_id: ContextVar[str] = ContextVar("current_user_id", default=DEFAULT_USER_ID)
+_run_results: ContextVar[dict | None] = ContextVar("run_results", default=None)
+
+
+def user_id_from_phone(phone: str | None) -> str:
+    """Derive the storage user ID from a phone number."""
+    return (phone or "").replace("+", "") or DEFAULT_USER_ID
+
+
+def get_user_id() -> str:
+    """The user the current agent run is acting for."""
+    return _current_user_id.get()
+
+
+@contextmanager
+def user_context(user_id: str):
+    """Scope tool calls made inside the block to ``user_id`` and one run's memoized results."""
+    token = _current_user_id.set(user_id)
+    results_token = _run_results.set({})
+    try:
+        yield
+    finally:
+        _run_results.reset(results_token)
+        _current_user_id.reset(token)
+
+
+def forget_run_results():
+    """Drop the run's memoized results; write tools call this after writing."""
+    results = _run_results.get()
+    if results is not None:
+        results.clear()
+
+
+class ToolStats:
+    """Tool calls, memo hits, and LLM turns and tool calls per agent run."""
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._calls: Counter = Counter()
+        self._memo = {"hits": 0, "misses": 0}
+        self._runs = {"runs": 0, "llm_turns": 0, "tool_calls": 0}
+
+    def record_call(self, name: str, hit: bool):
+        self._calls[name] += 1
+        self._memo["hits" if hit else "misses"] += 1
+
+    def record_run(self, result):
+        """Count one run's LLM requests and tool calls."""
+        usage = getattr(getattr(result, "context_wrapper", None), "usage", None)
+        requests = getattr(usage, "requests", None)
+        if not isinstance(requests, int):
+            return
+        items = getattr(result, "new_items", None) or []
+        self._runs["runs"] += 1
+        self._runs["llm_turns"] += requests
+        self._runs["tool_calls"] += sum(1 for item in items if getattr(item, "type", None) == "tool_call_item")
+
+    def stats(self) -> dict:
+        runs = self._runs["runs"]
+        return {
+            **self._runs,
+            "llm_turns_per_run": self._runs["llm_turns"] / runs if runs else 0.0,
+            "tool_calls_per_run": self._runs["tool_calls"] / runs if runs else 0.0,
+            "memo": dict(self._memo),
+            "calls": dict(self._calls),
+        }
+
+
+tool_stats = ToolStats()
+metrics.register("tools", tool_stats.stats)
+
+
+def memoized(func):
+    """Reuse a read-only tool's result for repeat calls with the same arguments in one run.
+
+    Outside a ``user_context`` block the tool always runs.
+    """
+    name = func.__name__.lstrip("_")
+
+    def lookup(args, kwargs):
+        results = _run_results.get()
+        if results is None:
+            return None, None
+        key = (name, _current_user_id.get(), args, tuple(sorted(kwargs.items())))
+        return results, key
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def run_async(*args, **kwargs):
+            results, key = lookup(args, kwargs)
+            if results is not None and key in results:
+                tool_stats.record_call(name, hit=True)
+                return results[key]
+            tool_stats.record_call(name, hit=False)
+            value = await func(*args, **kwargs)
+            if results is not None:
+                results[key] = value
+            return value
+        return run_async
+
+    @functools.wraps(func)
+    def run(*args, **kwargs):
+        results, key = lookup(args, kwargs)
+        if results is not None and key in results:
+            tool_stats.record_call(name, hit=True)
+            return results[key]
+        tool_stats.record_call(name, hit=False)
+        value = func(*args, **kwargs)
+        if results is not None:
+            results[key] = value
+        return value
+    return run
+
+
+def async_twin(sync_func):
+    """Present an async tool implementation under its sync twin's name and docstring.
+
+    The model sees the same tool either way; only the I/O differs.
+    """
+    def adopt(async_func):
+        async_func.__name__ = sync_func.__name__
+        async_func.__doc__ = sync_func.__doc__
+        return async_func
+    return adopt
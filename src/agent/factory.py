@@ -0,0 +1,95 @@
+"""Cache of built agents, keyed by kind, config version and user.
+
+Building an Agent means reading config, formatting instructions and wrapping
+its tools, so agents are built once and reused until the config snapshot
+changes. Builders must only bake in config; anything that changes per run
+(recent activity, memories, trigger context) belongs in the run input.
+
+Agent kinds register a zero-argument builder::
+
+    @agent_builder("coach")
+    def create_fitness_coach() -> Agent:
+        ...
+"""
+import threading
+import time
+from collections import Counter
+from typing import Callable
+
+from agents import Agent
+
+from src import metrics
+from src.config.snapshot import config_store
+from src.storage.base import DEFAULT_USER_ID
+
+AgentBuilder = Callable[[], Agent]
+AGENT_BUILDERS: dict[str, AgentBuilder] = {}
+
+
+def agent_builder(kind: str):
+    """Register the builder for an agent kind."""
+    def register(builder: AgentBuilder) -> AgentBuilder:
+        AGENT_BUILDERS[kind] = builder
+        return builder
+    return register
+
+
+class AgentFactory:
+    """Builds agents on first use and reuses them for the same config version."""
+
+    def __init__(self):
+        self._agents: dict[tuple, Agent] = {}
+        self._lock = threading.Lock()
+        self._builds: Counter = Counter()
+        self._hits = 0
+        self._build_seconds = 0.0
+
+    def get(self, kind: str, user_id: str = DEFAULT_USER_ID) -> Agent:
+        """The agent for ``kind`` and ``user_id`` under the current config."""
+        key = (kind, config_store.version, user_id)
+        agent = self._agents.get(key)
+        if agent is not None:
+            self._hits += 1
+            return agent
+
+        # Load any config the builder reads first, so loading it doesn't
+        # bump the version this agent is keyed under
+        config_store.load()
+        key = (kind, config_store.version, user_id)
+        start = time.perf_counter()
+        agent = AGENT_BUILDERS[kind]()
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            # Agents built for older config versions are never used again
+            self._agents = {k: v for k, v in self._agents.items() if k[1] == key[1]}
+            self._agents[key] = agent
+            self._builds[kind] += 1
+            self._build_seconds += elapsed
+        return agent
+
+    def clear(self):
+        with self._lock:
+            self._agents = {}
+            self._builds = Counter()
+            self._hits = 0
+            self._build_seconds = 0.0
+
+    def stats(self) -> dict:
+        builds = sum(self._builds.values())
+        return {
+            "builds": builds,
+            "builds_by_kind": dict(self._builds),
+            "hits": self._hits,
+            "hit_rate": self._hits / (builds + self._hits) if builds + self._hits else 0.0,
+            "avg_build_ms": self._build_seconds / builds * 1000 if builds else 0.0,
+            "size": len(self._agents),
+        }
+
+
+agent_factory = AgentFactory()
+metrics.register("agents", agent_factory.stats)
+
+
+def get_agent(kind: str, user_id: str = DEFAULT_USER_ID) -> Agent:
+    """Shortcut for ``agent_factory.get``."""
+    return agent_factory.get(kind, user_id)
@@ -0,0 +1,391 @@
+"""Deterministic fast path for short workout and meal logs.
+
+Most inbound texts are plain logs ("ran 5k 28 min", "bench 185x5x3, 45
+mins", "lunch: burrito bowl 850 cal"). parse() recognizes those with a
+small grammar and returns a structured log. Anything it can't account for
+word for word returns None and goes to the agent. A miss costs one
+agent round trip, but a wrong parse would log bad data, so the grammar
+stays conservative.
+
+Workout messages are split into clauses on commas, semicolons, " and " and
+" - ". Every clause must be one of:
+
+    cardio      ran 5k | 3 mile run | swam 1500 meters in 30 min
+    strength    bench 185x5x3 | bench 135x10 | pullups 3x10 | squat 225 5x5
+    session     push day | leg day | yoga | lifted
+    duration    45 mins | 1 hr | for 1.5 hours | 28:30
+    feeling     felt strong | tired
+
+A lift with two numbers is sets x reps when the first is at most MAX_SETS
+and weight x reps (one set) when it is at least MIN_WEIGHT; in between it's
+ambiguous and goes to the agent. A workout must also say it happened: a
+duration, a distance, lift numbers or a past-tense verb ("ran", "did",
+"lifted"). A bare "run" or "gym later" is more likely a plan or a question
+than a log.
+
+Meal messages start with a meal word ("lunch:", "had", "ate") and must state
+calories. Protein/carbs/fat in grams are optional. A description that is
+only a time ("had 2000 cal today") is a daily total, not a meal.
+
+Replies come from the active personality's ``fastpath`` templates, falling
+back to DEFAULT_TEMPLATES.
+"""
+import logging
+import os
+import re
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Mapping
+
+from src import metrics
+from src.storage.engine import get_async_storage
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.getenv("FASTPATH_ENABLED", "true").lower() in ("1", "true", "yes")
+
+MAX_LENGTH = 160
+
+DEFAULT_TEMPLATES = {
+    "workout": "Logged: {summary}.",
+    "meal": "Logged {summary}.",
+}
+
+KM_PER_UNIT = {"k": 1.0, "km": 1.0, "kms": 1.0, "mi": 1.609, "mile": 1.609, "miles": 1.609, "meters": 0.001}
+
+MINUTES_PER_UNIT = {"min": 1, "mins": 1, "minute": 1, "minutes": 1, "hr": 60, "hrs": 60, "hour": 60, "hours": 60, "h": 60}
+
+# Verb and noun forms of cardio activities -> workout type
+CARDIO = {
+    "ran": "run", "run": "run", "running": "run", "jogged": "run", "jog": "run",
+    "walked": "walk", "walk": "walk",
+    "biked": "bike", "bike": "bike", "cycled": "bike", "rode": "bike", "ride": "bike",
+    "swam": "swim", "swim": "swim",
+    "rowed": "row", "erg": "row",
+    "hiked": "hike", "hike": "hike",
+}
+
+# Past-tense forms that say a workout happened, not that it's planned
+PAST_TENSE = {"ran", "jogged", "walked", "biked", "cycled", "rode", "swam", "rowed", "hiked", "lifted"}
+
+# "bench 5x5" is sets x reps; "bench 135x10" is weight x reps
+MAX_SETS = 10
+MIN_WEIGHT = 20
+
+# Lift names -> canonical exercise name
+LIFTS = {
+    "bench": "bench press", "bench press": "bench press", "incline bench": "incline bench press",
+    "squat": "squat", "squats": "squat", "front squat": "front squat", "front squats": "front squat",
+    "deadlift": "deadlift", "deadlifts": "deadlift", "dl": "deadlift",
+    "rdl": "romanian deadlift", "rdls": "romanian deadlift",
+    "ohp": "overhead press", "overhead press": "overhead press",
+    "rows": "barbell row", "barbell row": "barbell row", "barbell rows": "barbell row",
+    "pullups": "pull-up", "pull-ups": "pull-up", "pull ups": "pull-up",
+    "chinups": "chin-up", "chin-ups": "chin-up", "chin ups": "chin-up",
+    "pushups": "push-up", "push-ups": "push-up", "push ups": "push-up",
+    "dips": "dip", "curls": "curl", "lunges": "lunge",
+    "hip thrust": "hip thrust", "hip thrusts": "hip thrust", "leg press": "leg press",
+}
+
+# Session labels -> workout type
+SESSIONS = {
+    "push day": "push", "pull day": "pull", "leg day": "legs", "legs day": "legs",
+    "upper body": "upper body", "lower body": "lower body", "full body": "full body",
+    "lifted": "strength", "lifting": "strength", "gym": "strength",
+    "yoga": "yoga", "pilates": "pilates", "hiit": "hiit", "crossfit": "crossfit", "spin": "bike",
+}
+
+FEELINGS = ("strong", "good", "great", "tired", "rough", "easy", "hard", "awesome", "solid", "meh")
+
+MEAL_TYPES = ("breakfast", "lunch", "dinner", "snack")
+
+_NUM = r"\d+(?:\.\d+)?"
+_PREFIX = r"(?:(?:i\s+)?(?:just\s+)?(?:did\s+(?:a\s+|my\s+)?)?)?(?:(?:today|this morning|tonight)\s+)?"
+_DISTANCE = rf"({_NUM})\s*(k|km|kms|mi|miles?|meters)"
+_DURATION = rf"({_NUM})\s*({'|'.join(MINUTES_PER_UNIT)})"
+_CLOCK = r"(\d{1,3}):([0-5]\d)"
+
+
+def _alternation(words) -> str:
+    # Longest first, so "bench press" wins over "bench"
+    return "|".join(re.escape(word) for word in sorted(words, key=len, reverse=True))
+
+
+_WHEN = re.compile(r"\s+(?:today|this morning|this afternoon|this evening|tonight)$")
+_CLAUSE_SPLIT = re.compile(r"\s*(?:[,;]|\s-\s|\band\b|\.(?!\d))\s*")
+_DURATION_RE = re.compile(rf"^(?:for\s+|in\s+)?(?:{_DURATION}|{_CLOCK})$")
+_CARDIO_VERB_RE = re.compile(
+    rf"^{_PREFIX}({_alternation(CARDIO)})(?:\s+{_DISTANCE})?(?:\s+(?:in\s+|for\s+)?(?:{_DURATION}|{_CLOCK}))?$"
+)
+_CARDIO_NOUN_RE = re.compile(
+    rf"^{_PREFIX}{_DISTANCE}\s+({_alternation(CARDIO)})(?:\s+(?:in\s+|for\s+)?(?:{_DURATION}|{_CLOCK}))?$"
+)
+_LIFT_RE = re.compile(
+    rf"^{_PREFIX}({_alternation(LIFTS)})\s+(?:(\d+)\s*(?:lbs?|kg)?\s+)?(\d+)\s*x\s*(\d+)(?:\s*x\s*(\d+))?$"
+)
+_SESSION_RE = re.compile(rf"^{_PREFIX}({_alternation(SESSIONS)})(?:\s+(?:for\s+)?{_DURATION})?$")
+_FEELING_RE = re.compile(rf"^(?:felt\s+|feeling\s+)?({'|'.join(FEELINGS)})$")
+
+_MEAL_RE = re.compile(
+    rf"^(?:(?:for\s+)?({'|'.join(MEAL_TYPES)})\s*[:\-]?\s*(?:was\s+|i\s+had\s+|had\s+)?|(?:i\s+)?(?:ate|had)\s+)(.+)$"
+)
+_CALORIES_RE = re.compile(r"(?:,\s*|\s+|\()(?:~|about\s+)?(\d{2,4})\s*(?:cal|cals|calories|kcal)\b\)?")
+_MACRO_RE = re.compile(r"(?:,\s*|\s+|\()(\d{1,3})\s*g?\s*(protein|carbs|carb|fat|p|c|f)\b\)?")
+
+# Calories in messages like "had a great run, 400 cal" were burned, not eaten
+_NOT_FOOD_RE = re.compile(rf"\b(?:burn(?:ed|t)?|workout|{_alternation(CARDIO)})\b")
+
+# Descriptions that only say when ("2000 cal today") report a total, not a meal
+_TIME_ONLY_RE = re.compile(
+    r"^(?:(?:so\s+far|in\s+total|total|today|yesterday|tonight|this\s+(?:morning|week))\s*)+$"
+)
+_DID_RE = re.compile(r"^(?:i\s+)?(?:just\s+)?did\b")
+
+MACRO_NAMES = {"protein": "protein", "p": "protein", "carbs": "carbs", "carb": "carbs", "c": "carbs", "fat": "fat", "f": "fat"}
+
+
+@dataclass(frozen=True)
+class WorkoutLog:
+    workout_type: str
+    duration_mins: int = 0
+    exercises: tuple[dict, ...] = ()
+    notes: str | None = None
+
+    kind = "workout"
+
+    def summary(self) -> str:
+        parts = [_describe_exercise(ex) for ex in self.exercises] or [self.workout_type]
+        if self.duration_mins:
+            parts.append(f"{self.duration_mins} min")
+        return ", ".join(parts)
+
+
+@dataclass(frozen=True)
+class MealLog:
+    meal_type: str
+    calories: int
+    description: str
+    protein: int = 0
+    carbs: int = 0
+    fat: int = 0
+
+    kind = "meal"
+
+    def summary(self) -> str:
+        text = f"{self.meal_type}, {self.calories} cal"
+        if self.protein:
+            text += f", {self.protein}g protein"
+        return text
+
+
+def _describe_exercise(exercise: dict) -> str:
+    if "distance_km" in exercise:
+        return f"{exercise['distance_km']:g} km {exercise['name']}"
+    if "sets" not in exercise:
+        return exercise["name"]
+    if exercise.get("weight"):
+        return f"{exercise['name']} {exercise['weight']}x{exercise['reps']}x{exercise['sets']}"
+    return f"{exercise['name']} {exercise['sets']}x{exercise['reps']}"
+
+
+def _minutes(amount: str | None, unit: str | None, clock_min: str | None, clock_sec: str | None) -> float:
+    if amount:
+        return float(amount) * MINUTES_PER_UNIT[unit]
+    if clock_min:
+        return int(clock_min) + int(clock_sec) / 60
+    return 0.0
+
+
+def _cardio(activity: str, distance: str | None, unit: str | None) -> dict:
+    exercise = {"name": CARDIO[activity]}
+    if distance:
+        exercise["distance_km"] = round(float(distance) * KM_PER_UNIT[unit], 2)
+    return exercise
+
+
+def _normalize(message: str) -> str:
+    return re.sub(r"\s+", " ", message.strip().lower()).rstrip("!.")
+
+
+def parse_workout(message: str) -> WorkoutLog | None:
+    """A WorkoutLog if every clause of ``message`` is workout grammar, else None."""
+    types: list[str] = []
+    exercises: list[dict] = []
+    minutes = 0.0
+    notes = []
+    happened = False
+    for clause in filter(None, _CLAUSE_SPLIT.split(_normalize(message))):
+        clause = _WHEN.sub("", clause)
+        happened = happened or bool(_DID_RE.match(clause))
+        if match := _DURATION_RE.match(clause):
+            minutes += _minutes(*match.groups())
+        elif match := _CARDIO_VERB_RE.match(clause):
+            activity, distance, unit, *duration = match.groups()
+            exercises.append(_cardio(activity, distance, unit))
+            types.append(CARDIO[activity])
+            minutes += _minutes(*duration)
+            happened = happened or activity in PAST_TENSE or distance is not None
+        elif match := _CARDIO_NOUN_RE.match(clause):
+            distance, unit, activity, *duration = match.groups()
+            exercises.append(_cardio(activity, distance, unit))
+            types.append(CARDIO[activity])
+            minutes += _minutes(*duration)
+            happened = True
+        elif match := _LIFT_RE.match(clause):
+            lift, weight, a, b, c = match.groups()
+            if c is not None:
+                # weight x reps x sets
+                if weight:
+                    return None
+                weight, reps, sets = a, b, c
+            elif weight or int(a) <= MAX_SETS:
+                # [weight] sets x reps
+                sets, reps = a, b
+            elif int(a) >= MIN_WEIGHT:
+                # weight x reps, one set
+                weight, reps, sets = a, b, 1
+            else:
+                # "curls 15x12": 15 sets or 15 lbs?
+                return None
+            exercises.append({
+                "name": LIFTS[lift], "sets": int(sets), "reps": int(reps),
+                **({"weight": int(weight)} if weight else {}),
+            })
+            types.append("strength")
+            happened = True
+        elif match := _SESSION_RE.match(clause):
+            session, amount, unit = match.groups()
+            types.append(SESSIONS[session])
+            minutes += _minutes(amount, unit, None, None)
+            happened = happened or session in PAST_TENSE
+        elif match := _FEELING_RE.match(clause):
+            notes.append(f"felt {match.group(1)}")
+        else:
+            return None
+
+    if not types or not (happened or minutes):
+        return None
+    # Session labels ("push day") describe the workout better than "strength"
+    workout_type = next((t for t in types if t != "strength"), types[0])
+    return WorkoutLog(workout_type, round(minutes), tuple(exercises), "; ".join(notes) or None)
+
+
+def parse_meal(message: str) -> MealLog | None:
+    """A MealLog if ``message`` names a meal and states its calories, else None."""
+    text = _normalize(message)
+    match = _MEAL_RE.match(text)
+    if not match:
+        return None
+    meal_type = match.group(1) or "meal"
+    rest = " " + match.group(2)
+    if _NOT_FOOD_RE.search(rest):
+        return None
+
+    calories = _CALORIES_RE.findall(rest)
+    if len(calories) != 1:
+        return None
+    macros = {}
+    for amount, name in _MACRO_RE.findall(rest):
+        key = MACRO_NAMES[name]
+        if key in macros:
+            return None
+        macros[key] = int(amount)
+
+    description = _MACRO_RE.sub("", _CALORIES_RE.sub("", rest)).strip(" ,;:-")
+    if not re.search(r"[a-z]", description) or _TIME_ONLY_RE.match(description):
+        return None
+    return MealLog(meal_type, int(calories[0]), description, **macros)
+
+
+def parse(message: str) -> WorkoutLog | MealLog | None:
+    """Parse a high-confidence log message, or None to let the agent handle it."""
+    if not message or len(message) > MAX_LENGTH or "?" in message:
+        return None
+    return parse_meal(message) or parse_workout(message)
+
+
+def render(log: WorkoutLog | MealLog, personality: Mapping) -> str:
+    """The personality's reply template for ``log``."""
+    templates = personality.get("fastpath", {})
+    template = templates.get(log.kind) or DEFAULT_TEMPLATES[log.kind]
+    return template.format(summary=log.summary())
+
+
+class FastPathStats:
+    """Fast path hits per log kind, misses and parse/write latency."""
+
+    def __init__(self):
+        self._stats = {"hits": 0, "misses": 0, "errors": 0, "total_ms": 0.0}
+        self._kinds: dict[str, int] = defaultdict(int)
+
+    def record(self, kind: str | None, seconds: float, error: bool = False):
+        if error:
+            self._stats["errors"] += 1
+        elif kind is None:
+            self._stats["misses"] += 1
+        else:
+            self._stats["hits"] += 1
+            self._kinds[kind] += 1
+        self._stats["total_ms"] += seconds * 1000
+
+    def clear(self):
+        self._stats = {"hits": 0, "misses": 0, "errors": 0, "total_ms": 0.0}
+        self._kinds.clear()
+
+    def stats(self) -> dict:
+        total = self._stats["hits"] + self._stats["misses"] + self._stats["errors"]
+        return {
+            **self._stats,
+            "hits_by_kind": dict(self._kinds),
+            "hit_rate": self._stats["hits"] / total if total else 0.0,
+            "avg_ms": self._stats["total_ms"] / total if total else 0.0,
+        }
+
+
+fastpath_stats = FastPathStats()
+metrics.register("fastpath", fastpath_stats.stats)
+
+
+async def _store(log: WorkoutLog | MealLog, message: str, user_id: str):
+    storage = get_async_storage()
+    if isinstance(log, WorkoutLog):
+        await storage.log_workout(
+            workout_type=log.workout_type,
+            duration_mins=log.duration_mins,
+            exercises=list(log.exercises),
+            notes=log.notes,
+            raw_input=message,
+            user_id=user_id,
+        )
+    else:
+        await storage.log_meal(
+            meal_type=log.meal_type,
+            calories=log.calories,
+            protein=log.protein,
+            carbs=log.carbs,
+            fat=log.fat,
+            description=log.description,
+            raw_input=message,
+            user_id=user_id,
+        )
+
+
+async def try_fast_path(message: str, user_id: str, personality: Mapping) -> str | None:
+    """Log ``message`` and return the reply, or None if the agent should handle it."""
+    if not ENABLED:
+        return None
+    start = time.perf_counter()
+    log = parse(message)
+    if log is None:
+        fastpath_stats.record(None, time.perf_counter() - start)
+        return None
+    try:
+        await _store(log, message, user_id)
+    except Exception:
+        # The agent can still log it through its tools
+        logger.exception("Fast path write failed; falling back to the agent")
+        fastpath_stats.record(log.kind, time.perf_counter() - start, error=True)
+        return None
+    fastpath_stats.record(log.kind, time.perf_counter() - start)
+    return render(log, personality)
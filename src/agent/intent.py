@@ -0,0 +1,49 @@
+"""Normalized intents for read-only progress questions.
+
+"How am I doing this week?", "how's my week going" and "hey coach, how am
+I doing this week" all ask the same thing. classify() maps a message to a
+stable intent name when the whole message is one of the known question
+forms, and returns None for everything else. A message that also logs
+something or asks a follow-up must not share a cached answer, so
+classify() only matches whole messages.
+"""
+import re
+
+CONTRACTIONS = {
+    "how's": "how is", "hows": "how is", "what's": "what is", "whats": "what is",
+    "i'm": "i am", "im": "i am", "i've": "i have", "ive": "i have",
+}
+
+FILLER = re.compile(r"^(?:(?:hey|hi|yo|ok|so|coach|quick question)\s+)+|\s+(?:(?:so far|lately|please|coach|lol)\s*)+$")
+
+_WEEK = r"(?:this|the|past|last)\s+(?:week|7 days)"
+_TODAY = r"today|so far today"
+
+INTENTS = (
+    ("progress:week", rf"how am i doing {_WEEK}|how is my week(?: going)?|how was my week|(?:what is |show )?my (?:weekly progress|progress {_WEEK})|weekly (?:progress|summary)"),
+    ("progress:today", rf"how am i doing (?:{_TODAY})|how is today going|how is my day(?: going)?"),
+    ("progress", r"how am i doing|how am i doing overall|how is my progress|(?:what is |show )?my progress|progress(?: report| update)?"),
+    ("workouts:week", rf"how many workouts (?:(?:have i done|did i do) )?(?:{_WEEK})|how many workouts have i done|how often did i work ?out {_WEEK}"),
+    ("last_workout", r"when (?:was|is) my last workout|when did i last work ?out|when was the last time i worked out|last workout"),
+    ("nutrition:today", rf"how many calories (?:have i (?:had|eaten)|did i eat)(?: {_TODAY})?|how many calories {_TODAY}|what (?:have i|did i) eat(?:en)? {_TODAY}|(?:my )?(?:calories|nutrition|macros) {_TODAY}"),
+    ("streak", r"what is my streak|how long is my streak|(?:my )?(?:current )?streak"),
+)
+
+_COMPILED = tuple((name, re.compile(pattern)) for name, pattern in INTENTS)
+
+
+def normalize(message: str) -> str:
+    """Lowercase, punctuation-free, contraction-expanded text without greetings or sign-offs."""
+    text = message.lower().replace("’", "'")
+    words = [CONTRACTIONS.get(word, word) for word in re.findall(r"[a-z0-9']+", text)]
+    text = " ".join(word.strip("'") for word in words)
+    return FILLER.sub("", text).strip()
+
+
+def classify(message: str) -> str | None:
+    """The intent of a cacheable progress question, or None."""
+    text = normalize(message)
+    for name, pattern in _COMPILED:
+        if pattern.fullmatch(text):
+            return name
+    return None
@@ -0,0 +1,172 @@
+"""Fit searched memories into a per-channel token budget.
+
+Memory search returns up to ``limit`` memories in relevance order, which can
+include near-duplicates ("likes morning runs" / "prefers running in the
+morning") and barely relevant matches. The packer drops memories below the
+channel's relevance floor, drops near-duplicates of higher-ranked memories,
+then keeps memories in rank order while they fit the channel's token budget.
+
+Budgets live in the "memory" config doc::
+
+    {"dedup_similarity": 0.8,
+     "channels": {"sms": {"limit": 10, "max_tokens": 300, "min_score": 0.3}, ...}}
+
+Tokens are estimated at ~4 characters each; the estimate only has to be
+consistent, not exact, for budgets and savings to be comparable.
+"""
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Mapping
+
+from src import metrics
+from src.config.loader import ConfigLoader
+from src.config.snapshot import load_defaults
+from src.storage.memory import MemoryWrapper, ScoredMemory
+
+CHANNELS = ("sms", "voice", "checkin", "trigger")
+
+_WORD = re.compile(r"[a-z0-9']+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for budgeting: about four characters per token."""
+    return (len(text) + 3) // 4
+
+
+def _line_tokens(text: str) -> int:
+    # Memories are rendered one per line as "- {memory}"
+    return estimate_tokens(f"- {text}\n")
+
+
+def similarity(a: str, b: str) -> float:
+    """Jaccard similarity of the two texts' word sets."""
+    words_a, words_b = set(_WORD.findall(a.lower())), set(_WORD.findall(b.lower()))
+    if not words_a or not words_b:
+        return float(a.strip().lower() == b.strip().lower())
+    return len(words_a & words_b) / len(words_a | words_b)
+
+
+@dataclass(frozen=True)
+class ChannelBudget:
+    """How many memories to search for a channel and how much of them to keep."""
+
+    limit: int = 10
+    max_tokens: int = 300
+    min_score: float = 0.0
+    dedup_similarity: float = 0.8
+
+    @classmethod
+    def from_config(cls, config: Mapping, channel: str) -> "ChannelBudget":
+        defaults = load_defaults().get("memory", {})
+        channel_defaults = defaults.get("channels", {}).get(channel, {})
+        overrides = config.get("channels", {}).get(channel, {})
+        settings = {**channel_defaults, **overrides}
+        return cls(
+            limit=int(settings.get("limit", cls.limit)),
+            max_tokens=int(settings.get("max_tokens", cls.max_tokens)),
+            min_score=float(settings.get("min_score", cls.min_score)),
+            dedup_similarity=float(
+                config.get("dedup_similarity", defaults.get("dedup_similarity", cls.dedup_similarity))
+            ),
+        )
+
+
+@dataclass
+class Packed:
+    """Result of packing: the kept memories and what was dropped and why."""
+
+    memories: list[str] = field(default_factory=list)
+    candidates: int = 0
+    tokens_in: int = 0
+    tokens_out: int = 0
+    dropped_low_score: int = 0
+    dropped_duplicate: int = 0
+    dropped_over_budget: int = 0
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_in - self.tokens_out
+
+
+def pack(memories: list[ScoredMemory], budget: ChannelBudget) -> Packed:
+    """Filter, dedupe and trim ``memories`` (in rank order) to ``budget``."""
+    packed = Packed(candidates=len(memories))
+    packed.tokens_in = sum(_line_tokens(mem.text) for mem in memories)
+
+    kept: list[str] = []
+    remaining = budget.max_tokens
+    for mem in memories:
+        text = mem.text.strip()
+        if not text or (mem.score is not None and mem.score < budget.min_score):
+            packed.dropped_low_score += 1
+            continue
+        if any(similarity(text, other) >= budget.dedup_similarity for other in kept):
+            packed.dropped_duplicate += 1
+            continue
+        cost = _line_tokens(text)
+        if cost > remaining:
+            # A smaller, lower-ranked memory may still fit
+            packed.dropped_over_budget += 1
+            continue
+        kept.append(text)
+        remaining -= cost
+
+    packed.memories = kept
+    packed.tokens_out = budget.max_tokens - remaining
+    return packed
+
+
+class PackerStats:
+    """Per-channel packing totals, including tokens kept out of prompts."""
+
+    FIELDS = (
+        "candidates", "tokens_in", "tokens_out",
+        "dropped_low_score", "dropped_duplicate", "dropped_over_budget",
+    )
+
+    def __init__(self):
+        self._channels: dict[str, dict[str, int]] = defaultdict(
+            lambda: {"packs": 0, "kept": 0, **dict.fromkeys(self.FIELDS, 0)}
+        )
+
+    def record(self, channel: str, packed: Packed):
+        stats = self._channels[channel]
+        stats["packs"] += 1
+        stats["kept"] += len(packed.memories)
+        for name in self.FIELDS:
+            stats[name] += getattr(packed, name)
+
+    def clear(self):
+        self._channels.clear()
+
+    def stats(self) -> dict:
+        return {
+            channel: {**stats, "tokens_saved": stats["tokens_in"] - stats["tokens_out"]}
+            for channel, stats in self._channels.items()
+        }
+
+
+packer_stats = PackerStats()
+metrics.register("memory_packer", packer_stats.stats)
+
+
+def budget_for(channel: str) -> ChannelBudget:
+    """The current budget for ``channel`` from the config snapshot."""
+    return ChannelBudget.from_config(ConfigLoader().get_memory(), channel)
+
+
+def memory_context(memory: MemoryWrapper, query: str, channel: str) -> list[str]:
+    """Search ``memory`` for ``query`` and pack the results for ``channel``."""
+    budget = budget_for(channel)
+    packed = pack(memory.search_scored(query, limit=budget.limit), budget)
+    packer_stats.record(channel, packed)
+    return packed.memories
+
+
+async def memory_context_async(memory: MemoryWrapper, query: str, channel: str) -> list[str]:
+    """Async version of memory_context."""
+    budget = budget_for(channel)
+    packed = pack(await memory.search_scored_async(query, limit=budget.limit), budget)
+    packer_stats.record(channel, packed)
+    return packed.memories
@@ -0,0 +1,144 @@
+"""Prompt assembly ordered for provider prompt-prefix caching.
+
+Providers cache the longest previously seen prefix of a request, so prompts
+are assembled from segments ordered from most to least stable::
+
+    personality -> user -> tool docs    (agent instructions; change with config)
+    memories -> context -> message      (run input; change every call)
+
+Every segment is normalized (line endings, trailing whitespace, sorted keys
+for dict context), so the same inputs always produce the same bytes and two
+calls for the same agent share the entire instruction block.
+
+Run usage is recorded per agent kind, so the cached-token hit rate can be
+tracked at /metrics.
+"""
+from collections import defaultdict
+from typing import Any, Mapping
+
+from src import metrics
+from src.storage.memory import MemoryWrapper
+
+# Segment kinds, most stable first
+SEGMENT_ORDER = ("personality", "user", "tools", "memories", "context", "message")
+
+SEGMENT_TITLES = {
+    "personality": None,
+    "user": None,
+    "tools": None,
+    "memories": "[Context from past conversations:]",
+    "context": "[Current context:]",
+    "message": "[User message:]",
+}
+
+COACH_TOOLS_DOC = """You have access to tools to:
+- Log workouts and meals they tell you about
+- Get a dashboard of their week, today's nutrition and streak in one call
+- Check their workout and nutrition history in more detail
+- Send them SMS messages
+- Call them if needed
+
+When they tell you about a workout or meal, log it. When they ask about their progress, start with the dashboard.
+Be concise in your responses - this is SMS, not email."""
+
+
+def normalize(text: str) -> str:
+    """Canonical form of a segment: LF line endings, no trailing whitespace."""
+    lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    return "\n".join(line.rstrip() for line in lines).strip("\n")
+
+
+def format_context(context: Mapping[str, Any]) -> str:
+    """Dict context as sorted ``key: value`` lines, so equal dicts render identically."""
+    return "\n".join(f"- {key}: {context[key]}" for key in sorted(context))
+
+
+def assemble(**segments: str | None) -> str:
+    """Join segments in stability order; empty segments are left out entirely."""
+    unknown = set(segments) - set(SEGMENT_ORDER)
+    if unknown:
+        raise ValueError(f"Unknown prompt segments: {sorted(unknown)}")
+    parts = []
+    for kind in SEGMENT_ORDER:
+        text = segments.get(kind)
+        if not text:
+            continue
+        text = normalize(text)
+        title = SEGMENT_TITLES[kind]
+        parts.append(f"{title}\n{text}" if title else text)
+    return "\n\n".join(parts) + "\n"
+
+
+def instructions(personality: Mapping, user_line: str, tools_doc: str) -> str:
+    """Agent instructions: only the config-stable segments."""
+    return assemble(
+        personality=personality.get("prompt", "You are a helpful fitness coach."),
+        user=user_line,
+        tools=tools_doc,
+    )
+
+
+def run_input(message: str, memories: list[str] | None = None, context: Mapping[str, Any] | str | None = None) -> str:
+    """Per-call run input: the volatile segments, after the cached instructions."""
+    if isinstance(context, Mapping):
+        context = format_context(context)
+    return assemble(
+        memories=MemoryWrapper.format_memories(memories) if memories is not None else None,
+        context=context,
+        message=message,
+    )
+
+
+def run_usage(result) -> dict[str, int] | None:
+    """Token counts from a RunResult's usage, or None when it has none (e.g. mocked runs)."""
+    usage = getattr(getattr(result, "context_wrapper", None), "usage", None)
+    input_tokens = getattr(usage, "input_tokens", None)
+    if not isinstance(input_tokens, int):
+        return None
+
+    def count(value) -> int:
+        return value if isinstance(value, int) else 0
+
+    return {
+        "requests": count(getattr(usage, "requests", 0)),
+        "input_tokens": input_tokens,
+        "cached_tokens": count(getattr(getattr(usage, "input_tokens_details", None), "cached_tokens", 0)),
+        "output_tokens": count(getattr(usage, "output_tokens", 0)),
+    }
+
+
+class PromptCacheStats:
+    """Cached vs uncached input tokens per agent kind, from run usage."""
+
+    def __init__(self):
+        self._kinds: dict[str, dict[str, int]] = defaultdict(
+            lambda: {"runs": 0, "requests": 0, "input_tokens": 0, "cached_tokens": 0}
+        )
+
+    def record(self, kind: str, result):
+        """Fold a RunResult's usage into the stats for ``kind``."""
+        usage = run_usage(result)
+        if usage is None:
+            return
+        stats = self._kinds[kind]
+        stats["runs"] += 1
+        stats["requests"] += usage["requests"]
+        stats["input_tokens"] += usage["input_tokens"]
+        stats["cached_tokens"] += usage["cached_tokens"]
+
+    def clear(self):
+        self._kinds.clear()
+
+    def stats(self) -> dict:
+        return {
+            kind: {
+                **stats,
+                "uncached_tokens": stats["input_tokens"] - stats["cached_tokens"],
+                "hit_rate": stats["cached_tokens"] / stats["input_tokens"] if stats["input_tokens"] else 0.0,
+            }
+            for kind, stats in self._kinds.items()
+        }
+
+
+prompt_cache_stats = PromptCacheStats()
+metrics.register("prompt_cache", prompt_cache_stats.stats)
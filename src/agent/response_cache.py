@@ -0,0 +1,91 @@
+"""Cache of agent replies to repeated progress questions.
+
+Replies are keyed by (intent, user, data version, day, config version):
+
+- intent: the normalized question (src/agent/intent.py); only read-only
+  progress questions are cacheable.
+- data version: changes with every workout or meal log (see
+  StorageBackend.get_data_version), so a new log invalidates every cached
+  answer for that user without touching the cache.
+- day and config version: "today" answers roll over at midnight, and
+  personality edits take effect immediately.
+
+The data version is a point read; callers bound it with a timeout, and a
+slow read is a cache miss rather than a delayed reply.
+
+Personalities can opt out with ``"response_cache": false`` in their preset.
+"""
+import asyncio
+import logging
+import os
+from typing import Hashable, Mapping
+
+from src import metrics
+from src.agent.intent import classify
+from src.config.snapshot import config_store
+from src.storage.base import local_today
+from src.storage.cache import MISSING, TTLCache
+from src.storage.engine import get_async_storage
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """Data-versioned reply cache with lookup counters per outcome."""
+
+    def __init__(self, maxsize: int = 512, ttl: float = 3600.0):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._stats = {"uncacheable": 0, "disabled": 0, "version_errors": 0, "version_timeouts": 0, "stores": 0}
+
+    async def key_for(
+        self, message: str, user_id: str, personality: Mapping, timeout: float | None = None
+    ) -> Hashable | None:
+        """Cache key for ``message``, or None when its reply must not be cached.
+
+        ``timeout`` bounds the data version read; if it runs out, the reply
+        is neither served from nor stored in the cache.
+        """
+        if not self._cache.enabled:
+            return None
+        if not personality.get("response_cache", True):
+            self._stats["disabled"] += 1
+            return None
+        intent = classify(message)
+        if intent is None:
+            self._stats["uncacheable"] += 1
+            return None
+        try:
+            version = await asyncio.wait_for(get_async_storage().get_data_version(user_id=user_id), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Data version lookup timed out after %.2fs; not caching this reply", timeout)
+            self._stats["version_timeouts"] += 1
+            return None
+        except Exception:
+            logger.warning("Data version lookup failed; not caching this reply", exc_info=True)
+            self._stats["version_errors"] += 1
+            return None
+        # Load every config doc first, so a lazy first load can't bump the version after keying
+        config_store.load()
+        return (intent, user_id, version, local_today().isoformat(), config_store.version)
+
+    def get(self, key: Hashable) -> str | None:
+        reply = self._cache.get(key, MISSING)
+        return None if reply is MISSING else reply
+
+    def set(self, key: Hashable, reply: str):
+        self._stats["stores"] += 1
+        self._cache.set(key, reply)
+
+    def clear(self):
+        self._cache.clear()
+        self._stats = {key: 0 for key in self._stats}
+
+    def stats(self) -> dict:
+        return {**self._cache.stats(), **self._stats}
+
+
+response_cache = ResponseCache(
+    maxsize=int(os.getenv("RESPONSE_CACHE_SIZE", "512")),
+    ttl=float(os.getenv("RESPONSE_CACHE_TTL", "3600")),
+)
+metrics.register("response_cache", response_cache.stats)
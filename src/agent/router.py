@@ -0,0 +1,163 @@
+"""Per-turn model routing.
+
+Each agent run picks a model tier from the "models" config doc::
+
+    {"tiers": {"fast": "gpt-4o-mini", "standard": "gpt-4o"},
+     "default_tier": "standard",
+     "turns": {"log": "fast", "smalltalk": "fast", "quick": "fast", "complex": "standard"},
+     "agents": {"checkin": "fast", "trigger-sms": "fast", "trigger-call": "standard"}}
+
+Coach turns are classified by classify_turn(), a local heuristic with no
+model call. Other agent kinds run one fixed kind of task each and map
+straight to a tier. The chosen model is passed as a RunConfig override, so
+built agents are shared across tiers.
+
+Latency and token usage are recorded per tier, so the routing table can be
+tuned from /metrics.
+"""
+import re
+import statistics
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Mapping
+
+from agents import RunConfig
+
+from src import metrics
+from src.agent.fastpath import parse
+from src.agent.intent import classify
+from src.agent.prompts import run_usage
+from src.config.loader import ConfigLoader
+
+DEFAULT_MODEL = "gpt-4o"
+
+TURNS = ("log", "smalltalk", "quick", "complex")
+
+_SMALLTALK = re.compile(
+    r"^(?:hi|hey|hello|yo|sup|thanks|thank you|thx|ty|ok|okay|k|cool|nice|lol|haha|great|awesome|"
+    r"good (?:morning|night)|gm|gn|bye|see ya|will do|got it|sounds good|you too)\b[\s!.,:)]*\w{0,12}[\s!.,:)]*$"
+)
+_LOG = re.compile(
+    r"\b(?:ran|run|walked|biked|swam|lifted|did|finished|worked out|ate|had|logged|skipped)\b.*\d"
+    r"|\b\d+\s*(?:k|km|mi|miles|min|mins|minutes|cal|calories|reps|sets)\b|\b\d+x\d+"
+)
+_COMPLEX = re.compile(
+    r"\b(?:plan|program|programme|routine|schedule|split|periodi[sz]|why|explain|compare|analy[sz]e|"
+    r"strategy|should i|help me|what if|recommend|adjust|macros? for|cut|bulk|injur\w*|plateau\w*)\b"
+)
+COMPLEX_WORDS = 40
+
+
+def classify_turn(message: str) -> str:
+    """Local guess at how much model a coach turn needs: one of TURNS."""
+    text = message.strip().lower()
+    words = len(text.split())
+    if parse(message) is not None or (words <= 20 and _LOG.search(text) and "?" not in text):
+        return "log"
+    if words <= 4 and _SMALLTALK.match(text):
+        return "smalltalk"
+    if words >= COMPLEX_WORDS or _COMPLEX.search(text):
+        return "complex"
+    if classify(message) is not None or words <= 15:
+        return "quick"
+    return "complex"
+
+
+@dataclass(frozen=True)
+class Route:
+    kind: str
+    turn: str
+    tier: str
+    model: str
+
+    def run_config(self) -> RunConfig:
+        return RunConfig(model=self.model)
+
+
+def resolve(config: Mapping, kind: str, turn: str) -> tuple[str, str]:
+    """(tier, model) for an agent kind and turn class under ``config``."""
+    tiers = config.get("tiers", {})
+    default_tier = config.get("default_tier", "standard")
+    if kind == "coach":
+        tier = config.get("turns", {}).get(turn, default_tier)
+    else:
+        tier = config.get("agents", {}).get(kind, default_tier)
+    if tier not in tiers:
+        tier = default_tier
+    return tier, tiers.get(tier, DEFAULT_MODEL)
+
+
+def default_model() -> str:
+    """Model agents are built with; runs override it with their route."""
+    config = ConfigLoader().get_models()
+    return config.get("tiers", {}).get(config.get("default_tier", "standard"), DEFAULT_MODEL)
+
+
+class TierStats:
+    """Runs, latency and token usage per model tier."""
+
+    def __init__(self, window: int = 500):
+        self.window = window
+        self._tiers: dict[str, dict] = {}
+        self._latencies: dict[str, deque[float]] = {}
+
+    def record(self, route: Route, seconds: float, result=None):
+        stats = self._tiers.setdefault(route.tier, {
+            "model": route.model, "runs": 0, "turns": {}, "total_ms": 0.0,
+            "requests": 0, "input_tokens": 0, "cached_tokens": 0, "output_tokens": 0,
+        })
+        stats["model"] = route.model
+        stats["runs"] += 1
+        stats["turns"][route.turn] = stats["turns"].get(route.turn, 0) + 1
+        stats["total_ms"] += seconds * 1000
+        self._latencies.setdefault(route.tier, deque(maxlen=self.window)).append(seconds * 1000)
+        usage = run_usage(result)
+        if usage is not None:
+            for name, count in usage.items():
+                stats[name] += count
+
+    def clear(self):
+        self._tiers.clear()
+        self._latencies.clear()
+
+    def stats(self) -> dict:
+        out = {}
+        for tier, stats in self._tiers.items():
+            latencies = sorted(self._latencies[tier])
+            out[tier] = {
+                **stats,
+                "turns": dict(stats["turns"]),
+                "avg_ms": stats["total_ms"] / stats["runs"],
+                "p50_ms": statistics.median(latencies),
+                "p95_ms": latencies[int(len(latencies) * 0.95)],
+                "avg_input_tokens": stats["input_tokens"] / stats["runs"],
+                "avg_output_tokens": stats["output_tokens"] / stats["runs"],
+            }
+        return out
+
+
+class ModelRouter:
+    """Picks the model for each run and records how each tier performs."""
+
+    def __init__(self):
+        self.tier_stats = TierStats()
+
+    def route(self, kind: str, message: str | None = None) -> Route:
+        turn = classify_turn(message) if kind == "coach" and message is not None else kind
+        tier, model = resolve(ConfigLoader().get_models(), kind, turn)
+        return Route(kind, turn, tier, model)
+
+    def record(self, route: Route, started: float, result=None):
+        """Record a run that started at ``started`` (time.perf_counter())."""
+        self.tier_stats.record(route, time.perf_counter() - started, result)
+
+    def clear(self):
+        self.tier_stats.clear()
+
+    def stats(self) -> dict:
+        return self.tier_stats.stats()
+
+
+model_router = ModelRouter()
+metrics.register("model_router", model_router.stats)
@@ -0,0 +1,83 @@
+"""Concurrent context-gathering stages with per-stage timeouts.
+
+Each stage is an async callable that produces one piece of context for a
+reply (memories, the agent, recent activity). Stages run concurrently; one
+that times out or raises yields its fallback value instead of holding up the
+rest. Timings are kept per stage and exposed at /metrics.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+from src import metrics
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Stage:
+    name: str
+    run: Callable[[], Awaitable[Any]]
+    timeout: float
+    fallback: Any = None
+
+
+@dataclass(frozen=True)
+class StageResult:
+    name: str
+    value: Any
+    seconds: float
+    status: str  # "ok", "timeout" or "error"
+
+
+class StageStats:
+    """Running counts and latencies per stage name."""
+
+    def __init__(self):
+        self._stages: dict[str, dict] = {}
+
+    def record(self, result: StageResult):
+        stats = self._stages.setdefault(
+            result.name, {"runs": 0, "ok": 0, "timeout": 0, "error": 0, "total_ms": 0.0, "max_ms": 0.0}
+        )
+        ms = result.seconds * 1000
+        stats["runs"] += 1
+        stats[result.status] += 1
+        stats["total_ms"] += ms
+        stats["max_ms"] = max(stats["max_ms"], ms)
+
+    def clear(self):
+        self._stages = {}
+
+    def stats(self) -> dict:
+        return {
+            name: {**stats, "avg_ms": stats["total_ms"] / stats["runs"]}
+            for name, stats in self._stages.items()
+        }
+
+
+stage_stats = StageStats()
+metrics.register("context_stages", stage_stats.stats)
+
+
+async def _run(stage: Stage) -> StageResult:
+    start = time.perf_counter()
+    try:
+        value, status = await asyncio.wait_for(stage.run(), timeout=stage.timeout), "ok"
+    except asyncio.TimeoutError:
+        logger.warning("Context stage %s timed out after %.2fs", stage.name, stage.timeout)
+        value, status = stage.fallback, "timeout"
+    except Exception:
+        logger.exception("Context stage %s failed", stage.name)
+        value, status = stage.fallback, "error"
+    result = StageResult(stage.name, value, time.perf_counter() - start, status)
+    stage_stats.record(result)
+    return result
+
+
+async def gather_stages(*stages: Stage) -> dict[str, StageResult]:
+    """Run stages concurrently; every stage yields a result, degraded or not."""
+    results = await asyncio.gather(*(_run(stage) for stage in stages))
+    return {result.name: result for result in results}
@@ -1,7 +1,19 @@
-"""Agent tools."""
-from src.agent.tools.fitness import log_workout, get_fitness_summary, get_last_workout
-from src.agent.tools.nutrition import log_meal, get_nutrition_summary
-from src.agent.tools.comms import send_sms, initiate_call
+"""Agent tools.
+
+Each tool has a sync version for ``chat()`` and an ``_async`` version for
+runs on the event loop; both are shown to the model under the same name.
+"""
+from src.agent.tools.fitness import (
+    log_workout,
+    get_fitness_summary,
+    get_last_workout,
+    log_workout_async,
+    get_fitness_summary_async,
+    get_last_workout_async,
+)
+from src.agent.tools.nutrition import log_meal, get_nutrition_summary, log_meal_async, get_nutrition_summary_async
+from src.agent.tools.comms import send_sms, initiate_call, send_sms_async, initiate_call_async
+from src.agent.tools.dashboard import get_dashboard, get_dashboard_async
 
 __all__ = [
     "log_workout",
@@ -9,6 +21,15 @@ __all__ = [
     "get_last_workout",
     "log_meal",
     "get_nutrition_summary",
+    "get_dashboard",
     "send_sms",
     "initiate_call",
+    "log_workout_async",
+    "get_fitness_summary_async",
+    "get_last_workout_async",
+    "log_meal_async",
+    "get_nutrition_summary_async",
+    "get_dashboard_async",
+    "send_sms_async",
+    "initiate_call_async",
 ]
@@ -1,9 +1,13 @@
 """Communication tools for the agent."""
+import asyncio
 import os
 
 from agents import function_tool
+from twilio.http.async_http_client import AsyncTwilioHttpClient
 from twilio.rest import Client
 
+from src.agent.context import async_twin
+
 
 def _get_twilio_client() -> Client:
     """Get configured Twilio client."""
@@ -13,21 +17,68 @@ def _get_twilio_client() -> Client:
     )
 
 
+# (account SID, auth token, event loop) and the async client built for them
+_async_client: tuple[tuple, Client] | None = None
+
+
+async def _get_async_twilio_client() -> Client:
+    """Shared Twilio client for coroutines, built on first use.
+
+    Its aiohttp session keeps connections to Twilio open between messages
+    and calls. The session belongs to the loop that opened it, so a client
+    is rebuilt when used from a different loop.
+    """
+    global _async_client
+    key = (os.getenv("TWILIO_ACCOUNT_SID"), os.getenv("TWILIO_AUTH_TOKEN"), asyncio.get_running_loop())
+    if _async_client is None or _async_client[0] != key:
+        await close_async_twilio_client()
+        _async_client = (key, Client(key[0], key[1], http_client=AsyncTwilioHttpClient()))
+    return _async_client[1]
+
+
+async def close_async_twilio_client():
+    """Close the shared async client's connections; called on application shutdown."""
+    global _async_client
+    if _async_client is not None and _async_client[0][2] is asyncio.get_running_loop():
+        await _async_client[1].http_client.close()
+    _async_client = None
+
+
+def deliver_sms(to: str, body: str) -> str:
+    """Send an SMS through the Twilio REST API and return its SID."""
+    msg = _get_twilio_client().messages.create(
+        body=body,
+        from_=os.getenv("TWILIO_PHONE_NUMBER"),
+        to=to,
+    )
+    return msg.sid
+
+
+async def deliver_sms_async(to: str, body: str) -> str:
+    """Send an SMS through the Twilio REST API without blocking the event loop."""
+    client = await _get_async_twilio_client()
+    msg = await client.messages.create_async(
+        body=body,
+        from_=os.getenv("TWILIO_PHONE_NUMBER"),
+        to=to,
+    )
+    return msg.sid
+
+
 def _send_sms(message: str) -> str:
     """Send an SMS message to the user.
 
     Args:
         message: The message to send
     """
-    client = _get_twilio_client()
+    sid = deliver_sms(os.getenv("USER_PHONE_NUMBER"), message)
+    return f"SMS sent successfully (SID: {sid})"
 
-    msg = client.messages.create(
-        body=message,
-        from_=os.getenv("TWILIO_PHONE_NUMBER"),
-        to=os.getenv("USER_PHONE_NUMBER"),
-    )
 
-    return f"SMS sent successfully (SID: {msg.sid})"
+@async_twin(_send_sms)
+async def _send_sms_async(message: str) -> str:
+    sid = await deliver_sms_async(os.getenv("USER_PHONE_NUMBER"), message)
+    return f"SMS sent successfully (SID: {sid})"
 
 
 def _initiate_call(reason: str) -> str:
@@ -50,6 +101,22 @@ def _initiate_call(reason: str) -> str:
     return f"Call initiated (SID: {call.sid})"
 
 
+@async_twin(_initiate_call)
+async def _initiate_call_async(reason: str) -> str:
+    base_url = os.getenv("BASE_URL", "https://your-domain.com")
+    client = await _get_async_twilio_client()
+    call = await client.calls.create_async(
+        to=os.getenv("USER_PHONE_NUMBER"),
+        from_=os.getenv("TWILIO_PHONE_NUMBER"),
+        url=f"{base_url}/webhook/voice/outbound?reason={reason}",
+    )
+
+    return f"Call initiated (SID: {call.sid})"
+
+
 # Create function tools for agent use
 send_sms = function_tool(_send_sms)
 initiate_call = function_tool(_initiate_call)
+
+send_sms_async = function_tool(_send_sms_async)
+initiate_call_async = function_tool(_initiate_call_async)
@@ -0,0 +1,56 @@
+"""Combined progress dashboard tool for the agent."""
+import asyncio
+
+from agents import function_tool
+
+from src.agent.context import async_twin, get_user_id, memoized
+from src.agent.tools.fitness import format_fitness_summary, format_last_workout
+from src.agent.tools.nutrition import format_nutrition_totals
+from src.storage.engine import get_async_storage, get_storage
+
+
+@memoized
+def _get_dashboard(days: int = 7) -> str:
+    """Get the user's workouts, today's nutrition, last workout and streak in one call.
+
+    Use this for progress questions instead of calling the separate summary tools.
+
+    Args:
+        days: Number of days of workouts to summarize (default: 7)
+    """
+    storage = get_storage()
+    user_id = get_user_id()
+    return _format_dashboard(
+        storage.get_daily_rollups(days=days, user_id=user_id),
+        storage.aggregate_meals(days=1, user_id=user_id),
+        storage.get_activity_state(user_id=user_id),
+        days,
+    )
+
+
+@memoized
+@async_twin(_get_dashboard)
+async def _get_dashboard_async(days: int = 7) -> str:
+    storage = get_async_storage()
+    user_id = get_user_id()
+    rollups, totals, activity = await asyncio.gather(
+        storage.get_daily_rollups(days=days, user_id=user_id),
+        storage.aggregate_meals(days=1, user_id=user_id),
+        storage.get_activity_state(user_id=user_id),
+    )
+    return _format_dashboard(rollups, totals, activity, days)
+
+
+def _format_dashboard(rollups: list[dict], totals: dict, activity: dict, days: int) -> str:
+    nutrition = format_nutrition_totals(totals, 1) if totals["count"] else ["No meals logged today."]
+    return "\n\n".join([
+        format_fitness_summary(rollups, days),
+        "\n".join(nutrition),
+        f"{format_last_workout(activity['last_workout_at'])} Current streak: {activity['streak_days']} days.",
+    ])
+
+
+# Create function tools for agent use
+get_dashboard = function_tool(_get_dashboard)
+
+get_dashboard_async = function_tool(_get_dashboard_async)
@@ -1,70 +1,99 @@
 """Fitness tracking tools for the agent."""
+from datetime import datetime
+
 from agents import function_tool
 
-from src.storage.firestore import FirestoreClient
+from src.agent.context import async_twin, forget_run_results, get_user_id, memoized
+from src.agent.fastpath import parse_workout
+from src.storage.base import sum_rollups
+from src.storage.engine import get_async_storage, get_storage
 
 
 def _log_workout(description: str) -> str:
     """Log a workout from a natural language description.
 
     Parse the description to extract workout type, duration, exercises,
-    and any notes. Store in Firestore.
+    and any notes. Store it in the configured storage engine.
 
     Args:
         description: Natural language workout description, e.g.,
             "Did push day - bench 185x5x3, incline dumbbell, triceps. 45 mins, felt strong"
     """
-    fs = FirestoreClient()
-
-    # Store with raw input - the LLM calling this tool should have already
-    # extracted what it can, but we preserve the original
-    doc_id = fs.log_workout(
-        workout_type="general",  # Could be enhanced with NLP extraction
-        duration_mins=0,
-        exercises=[],
-        notes=description,
-        raw_input=description,
-    )
+    storage = get_storage()
+    doc_id = storage.log_workout(**_workout_fields(description), user_id=get_user_id())
+    forget_run_results()
 
     return f"Workout logged successfully (ID: {doc_id}). Keep pushing!"
 
 
+@async_twin(_log_workout)
+async def _log_workout_async(description: str) -> str:
+    storage = get_async_storage()
+    doc_id = await storage.log_workout(**_workout_fields(description), user_id=get_user_id())
+    forget_run_results()
+
+    return f"Workout logged successfully (ID: {doc_id}). Keep pushing!"
+
+
+def _workout_fields(description: str) -> dict:
+    # Keep whatever structure the fast-path grammar can read; the original
+    # text is preserved either way
+    parsed = parse_workout(description)
+    return {
+        "workout_type": parsed.workout_type if parsed else "general",
+        "duration_mins": parsed.duration_mins if parsed else 0,
+        "exercises": list(parsed.exercises) if parsed else [],
+        "notes": description,
+        "raw_input": description,
+    }
+
+
+def format_fitness_summary(rollups: list[dict], days: int) -> str:
+    """Workout summary text from daily rollups, newest first."""
+    totals = sum_rollups(rollups)
+
+    if not totals["workout_count"]:
+        return f"No workouts logged in the past {days} days."
+
+    summary_lines = [
+        f"Workouts in the past {days} days ({totals['workout_count']} total, "
+        f"{totals['workout_minutes']} min):"
+    ]
+    for day in rollups:
+        if not day["workout_count"]:
+            continue
+        date_str = datetime.fromisoformat(day["date"]).strftime("%a %m/%d")
+        types = ", ".join(day["workout_types"]) or "workout"
+        summary_lines.append(
+            f"- {date_str}: {day['workout_count']}x {types} ({day['workout_minutes']} min)"
+        )
+
+    return "\n".join(summary_lines)
+
+
+@memoized
 def _get_fitness_summary(days: int = 7) -> str:
     """Get a summary of workouts from the past N days.
 
     Args:
         days: Number of days to look back (default: 7)
     """
-    fs = FirestoreClient()
-    workouts = fs.get_workouts(days=days)
+    storage = get_storage()
+    return format_fitness_summary(storage.get_daily_rollups(days=days, user_id=get_user_id()), days)
 
-    if not workouts:
-        return f"No workouts logged in the past {days} days."
-
-    summary_lines = [f"Workouts in the past {days} days ({len(workouts)} total):"]
-    for w in workouts:
-        workout_type = w.get("type", "workout")
-        duration = w.get("duration_mins", "?")
-        notes = w.get("notes", "")
-        timestamp = w.get("timestamp", "")
-        if timestamp:
-            date_str = timestamp.strftime("%a %m/%d") if hasattr(timestamp, 'strftime') else str(timestamp)[:10]
-        else:
-            date_str = "?"
-        summary_lines.append(f"- {date_str}: {workout_type} ({duration} min) - {notes[:50]}")
 
-    return "\n".join(summary_lines)
+@memoized
+@async_twin(_get_fitness_summary)
+async def _get_fitness_summary_async(days: int = 7) -> str:
+    storage = get_async_storage()
+    return format_fitness_summary(await storage.get_daily_rollups(days=days, user_id=get_user_id()), days)
 
 
-def _get_last_workout() -> str:
-    """Get information about the most recent workout."""
-    fs = FirestoreClient()
-    last_date = fs.get_last_workout_date()
-
+def format_last_workout(last_date) -> str:
+    """How long ago the last workout was."""
     if not last_date:
         return "No workouts logged yet."
 
-    from datetime import datetime
     if hasattr(last_date, 'timestamp'):
         days_ago = (datetime.now() - datetime.fromtimestamp(last_date.timestamp())).days
     else:
@@ -73,7 +102,25 @@ def _get_last_workout() -> str:
     return f"Last workout was {days_ago} days ago."
 
 
+@memoized
+def _get_last_workout() -> str:
+    """Get information about the most recent workout."""
+    storage = get_storage()
+    return format_last_workout(storage.get_last_workout_date(user_id=get_user_id()))
+
+
+@memoized
+@async_twin(_get_last_workout)
+async def _get_last_workout_async() -> str:
+    storage = get_async_storage()
+    return format_last_workout(await storage.get_last_workout_date(user_id=get_user_id()))
+
+
 # Create function tools for agent use
 log_workout = function_tool(_log_workout)
 get_fitness_summary = function_tool(_get_fitness_summary)
 get_last_workout = function_tool(_get_last_workout)
+
+log_workout_async = function_tool(_log_workout_async)
+get_fitness_summary_async = function_tool(_get_fitness_summary_async)
+get_last_workout_async = function_tool(_get_last_workout_async)
@@ -1,65 +1,101 @@
 """Nutrition tracking tools for the agent."""
+import asyncio
+
 from agents import function_tool
 
-from src.storage.firestore import FirestoreClient
+from src.agent.context import async_twin, forget_run_results, get_user_id, memoized
+from src.storage.engine import get_async_storage, get_storage
 
 
 def _log_meal(description: str, meal_type: str = "meal") -> str:
     """Log a meal from a natural language description.
 
-    Parse the description to estimate calories and macros. Store in Firestore.
+    Parse the description to estimate calories and macros. Store it in the configured storage engine.
 
     Args:
         description: Natural language meal description, e.g.,
             "Chipotle bowl with chicken, rice, beans, and guac"
         meal_type: Type of meal (breakfast, lunch, dinner, snack)
     """
-    fs = FirestoreClient()
+    storage = get_storage()
+    doc_id = storage.log_meal(**_meal_fields(description, meal_type), user_id=get_user_id())
+    forget_run_results()
+
+    return f"Meal logged successfully (ID: {doc_id}). I'll track your nutrition!"
 
-    # Store with placeholder values - in production, could use an API
-    # or have the LLM estimate before calling this tool
-    doc_id = fs.log_meal(
-        meal_type=meal_type,
-        calories=0,  # Placeholder - LLM should estimate
-        protein=0,
-        carbs=0,
-        fat=0,
-        description=description,
-        raw_input=description,
-    )
+
+@async_twin(_log_meal)
+async def _log_meal_async(description: str, meal_type: str = "meal") -> str:
+    storage = get_async_storage()
+    doc_id = await storage.log_meal(**_meal_fields(description, meal_type), user_id=get_user_id())
+    forget_run_results()
 
     return f"Meal logged successfully (ID: {doc_id}). I'll track your nutrition!"
 
 
+def _meal_fields(description: str, meal_type: str) -> dict:
+    # Store with placeholder values - in production, could use an API
+    # or have the LLM estimate before calling this tool
+    return {
+        "meal_type": meal_type,
+        "calories": 0,  # Placeholder - LLM should estimate
+        "protein": 0,
+        "carbs": 0,
+        "fat": 0,
+        "description": description,
+        "raw_input": description,
+    }
+
+
+def format_nutrition_totals(totals: dict, days: int) -> list[str]:
+    """Summary lines for meal totals over the past N days."""
+    return [
+        f"Nutrition summary for past {days} day(s):",
+        f"- Meals logged: {totals['count']}",
+        f"- Total calories: {totals['calories']}",
+        f"- Protein: {totals['protein']}g",
+        f"- Carbs: {totals['carbs']}g",
+        f"- Fat: {totals['fat']}g",
+    ]
+
+
+@memoized
 def _get_nutrition_summary(days: int = 1) -> str:
     """Get a summary of nutrition from the past N days.
 
     Args:
         days: Number of days to look back (default: 1 for today)
     """
-    fs = FirestoreClient()
-    meals = fs.get_meals(days=days)
+    storage = get_storage()
+    user_id = get_user_id()
+    totals = storage.aggregate_meals(days=days, user_id=user_id)
 
-    if not meals:
+    if not totals["count"]:
         return f"No meals logged in the past {days} day(s)."
 
-    total_calories = sum(m.get("calories", 0) for m in meals)
-    total_protein = sum(m.get("protein", 0) for m in meals)
-    total_carbs = sum(m.get("carbs", 0) for m in meals)
-    total_fat = sum(m.get("fat", 0) for m in meals)
+    # Only the meals we print are fetched as full documents
+    meals = storage.get_meals(days=days, limit=5, user_id=user_id)
+    return _format_nutrition_summary(totals, meals, days)
 
-    summary_lines = [
-        f"Nutrition summary for past {days} day(s):",
-        f"- Meals logged: {len(meals)}",
-        f"- Total calories: {total_calories}",
-        f"- Protein: {total_protein}g",
-        f"- Carbs: {total_carbs}g",
-        f"- Fat: {total_fat}g",
-        "",
-        "Recent meals:"
-    ]
 
-    for m in meals[:5]:
+@memoized
+@async_twin(_get_nutrition_summary)
+async def _get_nutrition_summary_async(days: int = 1) -> str:
+    storage = get_async_storage()
+    user_id = get_user_id()
+    totals, meals = await asyncio.gather(
+        storage.aggregate_meals(days=days, user_id=user_id),
+        storage.get_meals(days=days, limit=5, user_id=user_id),
+    )
+
+    if not totals["count"]:
+        return f"No meals logged in the past {days} day(s)."
+    return _format_nutrition_summary(totals, meals, days)
+
+
+def _format_nutrition_summary(totals: dict, meals: list[dict], days: int) -> str:
+    summary_lines = [*format_nutrition_totals(totals, days), "", "Recent meals:"]
+    for m in meals:
         desc = m.get("description", "Unknown")[:40]
         cals = m.get("calories", "?")
         summary_lines.append(f"- {desc} ({cals} cal)")
@@ -70,3 +106,6 @@ def _get_nutrition_summary(days: int = 1) -> str:
 # Create function tools for agent use
 log_meal = function_tool(_log_meal)
 get_nutrition_summary = function_tool(_get_nutrition_summary)
+
+log_meal_async = function_tool(_log_meal_async)
+get_nutrition_summary_async = function_tool(_get_nutrition_summary_async)
@@ -1,56 +1,44 @@
-"""Configuration loader from Firestore."""
-import json
+"""Configuration loader backed by the process-wide config snapshot."""
 import os
-from pathlib import Path
-from typing import Any
+from typing import Any, Mapping
 
-from src.storage.firestore import FirestoreClient
+from src.config.snapshot import config_store
 
 
 class ConfigLoader:
-    """Load and manage configuration from Firestore."""
+    """Read configuration from the process-wide config snapshot.
 
-    def __init__(self):
-        self.fs = FirestoreClient()
-        self._cache: dict[str, Any] = {}
+    Cheap to construct: every instance reads the same in-memory snapshot,
+    which is kept current by ``config_store``.
+    """
 
-    def _get_config(self, config_name: str) -> dict:
-        """Get a config document, with caching."""
-        if config_name in self._cache:
-            return self._cache[config_name]
+    def _get_config(self, config_name: str) -> Mapping[str, Any]:
+        """Get a config document from the snapshot, falling back to defaults."""
+        return config_store.get(config_name)
 
-        doc = self.fs.db.collection("config").document(config_name).get()
-        if doc.exists:
-            self._cache[config_name] = doc.to_dict()
-            return self._cache[config_name]
-
-        # Fall back to defaults
-        return self._load_default(config_name)
-
-    def _load_default(self, config_name: str) -> dict:
-        """Load default config from JSON file."""
-        defaults_path = Path(__file__).parent.parent.parent / "configs" / "defaults.json"
-        if defaults_path.exists():
-            with open(defaults_path) as f:
-                defaults = json.load(f)
-                return defaults.get(config_name, {})
-        return {}
-
-    def get_personality(self) -> dict:
+    def get_personality(self) -> Mapping[str, Any]:
         """Get the active personality config."""
         config = self._get_config("personality")
         active = config.get("active", "sarcastic-drill-sergeant")
         presets = config.get("presets", {})
         return presets.get(active, {})
 
-    def get_schedule(self) -> dict:
+    def get_schedule(self) -> Mapping[str, Any]:
         """Get schedule config."""
         return self._get_config("schedule")
 
-    def get_triggers(self) -> dict:
+    def get_triggers(self) -> Mapping[str, Any]:
         """Get trigger rules config."""
         return self._get_config("triggers")
 
+    def get_memory(self) -> Mapping[str, Any]:
+        """Get memory context budgets."""
+        return self._get_config("memory")
+
+    def get_models(self) -> Mapping[str, Any]:
+        """Get model tiers and routing."""
+        return self._get_config("models")
+
     def get_user(self) -> dict:
         """Get user config."""
         config = self._get_config("user")
@@ -61,6 +49,15 @@ class ConfigLoader:
             "timezone": os.getenv("USER_TIMEZONE") or config.get("timezone", "America/Los_Angeles"),
         }
 
+    @property
+    def version(self) -> int:
+        """Version of the current config snapshot."""
+        return config_store.version
+
     def clear_cache(self):
-        """Clear the config cache."""
-        self._cache = {}
+        """Reload the process-wide snapshot from storage.
+
+        Listeners keep running; only the application lifespan shuts the
+        store down.
+        """
+        config_store.reload()
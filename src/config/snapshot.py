@@ -0,0 +1,190 @@
+"""Process-wide, versioned config snapshot.
+
+Request handlers read config from an immutable snapshot held in memory, so a
+config lookup never touches storage. Config docs are loaded once (at startup
+or on first use) and the snapshot is swapped whenever one changes. Change
+notifications come from the storage engine's watch_config() listener, or
+from a background poll when the engine has no listeners.
+"""
+import json
+import logging
+import os
+import threading
+from dataclasses import dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Mapping
+
+from src import metrics
+from src.storage.engine import get_storage
+
+logger = logging.getLogger(__name__)
+
+CONFIG_NAMES = ("personality", "schedule", "triggers", "user", "memory", "models")
+
+DEFAULTS_PATH = Path(__file__).parent.parent.parent / "configs" / "defaults.json"
+
+EMPTY: Mapping[str, Any] = MappingProxyType({})
+
+
+def freeze(value: Any) -> Any:
+    """Read-only copy of a JSON-like value: dicts become mapping proxies, lists tuples."""
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+@lru_cache(maxsize=1)
+def load_defaults() -> Mapping[str, Any]:
+    """configs/defaults.json, parsed once per process."""
+    if DEFAULTS_PATH.exists():
+        with open(DEFAULTS_PATH) as f:
+            return freeze(json.load(f))
+    return EMPTY
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """An immutable set of config docs; ``version`` increases with every change."""
+
+    version: int = 0
+    docs: Mapping[str, Mapping[str, Any]] = field(default_factory=lambda: EMPTY)
+
+    def get(self, name: str) -> Mapping[str, Any] | None:
+        return self.docs.get(name)
+
+    def with_doc(self, name: str, data: Mapping[str, Any]) -> "ConfigSnapshot":
+        """Copy of this snapshot with one doc replaced."""
+        return ConfigSnapshot(self.version + 1, MappingProxyType({**self.docs, name: data}))
+
+
+class ConfigStore:
+    """Holds the current ConfigSnapshot and keeps it in sync with storage.
+
+    Reads are a single attribute load. Loads and swaps happen under a lock
+    and replace the snapshot wholesale, so readers never see a partial
+    update.
+    """
+
+    def __init__(self, poll_interval: float | None = None):
+        if poll_interval is None:
+            poll_interval = float(os.getenv("CONFIG_POLL_INTERVAL", "30"))
+        self.poll_interval = poll_interval
+        self._snapshot = ConfigSnapshot()
+        self._lock = threading.Lock()
+        self._watches: dict[str, Any] = {}
+        self._polled: set[str] = set()
+        self._poller: threading.Thread | None = None
+        self._stop = threading.Event()
+        self._stats = {"loads": 0, "swaps": 0, "polls": 0}
+
+    @property
+    def snapshot(self) -> ConfigSnapshot:
+        return self._snapshot
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    def get(self, name: str) -> Mapping[str, Any]:
+        """A config doc; only the first read of a name per process does I/O."""
+        doc = self._snapshot.get(name)
+        if doc is None:
+            doc = self._load(name)
+        return doc
+
+    def load(self, names: tuple[str, ...] = CONFIG_NAMES):
+        """Load and start watching ``names``, e.g. at startup."""
+        for name in names:
+            self.get(name)
+
+    def _read(self, name: str) -> Mapping[str, Any]:
+        self._stats["loads"] += 1
+        data = get_storage().get_config(name)
+        if data is None:
+            return load_defaults().get(name, EMPTY)
+        return freeze(data)
+
+    def _load(self, name: str) -> Mapping[str, Any]:
+        with self._lock:
+            doc = self._snapshot.get(name)
+            if doc is not None:
+                return doc
+            doc = self._read(name)
+            self._snapshot = self._snapshot.with_doc(name, doc)
+        self._watch(name)
+        return doc
+
+    def apply(self, name: str, data: dict | None):
+        """Swap in a new version of one doc, if it changed."""
+        doc = freeze(data) if data is not None else load_defaults().get(name, EMPTY)
+        with self._lock:
+            if self._snapshot.get(name) == doc:
+                return
+            self._snapshot = self._snapshot.with_doc(name, doc)
+            self._stats["swaps"] += 1
+        logger.info("Config %s changed; snapshot is now version %d", name, self._snapshot.version)
+
+    def reload(self):
+        """Re-read every loaded doc from storage now, keeping listeners running."""
+        for name in list(self._snapshot.docs):
+            self._stats["loads"] += 1
+            self.apply(name, get_storage().get_config(name))
+
+    def _watch(self, name: str):
+        """Listen for changes to ``name``, falling back to polling."""
+        try:
+            watch = get_storage().watch_config(name, lambda data: self.apply(name, data))
+        except Exception:
+            logger.exception("Config listener for %s failed to start; polling instead", name)
+            watch = None
+        with self._lock:
+            if watch is not None:
+                self._watches[name] = watch
+                return
+            self._polled.add(name)
+            if self._poller is None and self.poll_interval > 0:
+                self._poller = threading.Thread(target=self._poll, name="config-poll", daemon=True)
+                self._poller.start()
+
+    def _poll(self):
+        while not self._stop.wait(self.poll_interval):
+            for name in list(self._polled):
+                try:
+                    self._stats["polls"] += 1
+                    self.apply(name, get_storage().get_config(name))
+                except Exception:
+                    logger.exception("Config poll for %s failed", name)
+
+    def close(self):
+        """Stop listeners and the poller and forget the snapshot."""
+        self._stop.set()
+        with self._lock:
+            watches, self._watches = self._watches, {}
+            self._polled.clear()
+            self._snapshot = ConfigSnapshot()
+        for watch in watches.values():
+            try:
+                watch.unsubscribe()
+            except Exception:
+                logger.exception("Failed to stop config listener")
+        if self._poller is not None:
+            self._poller.join(timeout=1)
+            self._poller = None
+        self._stop = threading.Event()
+
+    def stats(self) -> dict:
+        return {
+            **self._stats,
+            "version": self._snapshot.version,
+            "docs": sorted(self._snapshot.docs),
+            "listeners": len(self._watches),
+            "polled": len(self._polled),
+        }
+
+
+config_store = ConfigStore()
+metrics.register("config", config_store.stats)
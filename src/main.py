@@ -2,23 +2,57 @@
 from dotenv import load_dotenv
 load_dotenv()
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 
+from src import metrics
+from src.agent.tools.comms import close_async_twilio_client
+from src.config.snapshot import config_store
+from src.storage.engine import shutdown_storage
+from src.storage.mem0_client import mem0_pool
+from src.storage.memory_persister import memory_persister
+from src.webhooks.deferred import sms_replies
 from src.webhooks.sms import router as sms_router
 from src.webhooks.voice import router as voice_router
 from src.scheduler.checkins import router as checkins_router
 from src.scheduler.triggers import router as triggers_router
+from src.scheduler.maintenance import router as maintenance_router
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Load config and start background writers; drain them on shutdown."""
+    await run_in_threadpool(config_store.load)
+    await memory_persister.start()
+    await sms_replies.start()
+    yield
+    await sms_replies.stop()
+    await memory_persister.stop()
+    config_store.close()
+    await run_in_threadpool(shutdown_storage)
+    await mem0_pool.aclose()
+    await close_async_twilio_client()
 
-app = FastAPI(title="Layz", description="Personal fitness accountability agent")
+
+app = FastAPI(title="Layz", description="Personal fitness accountability agent", lifespan=lifespan)
 
 # Include routers
 app.include_router(sms_router)
 app.include_router(voice_router)
 app.include_router(checkins_router)
 app.include_router(triggers_router)
+app.include_router(maintenance_router)
 
 
 @app.get("/health")
 async def health():
     """Health check endpoint."""
     return {"status": "healthy"}
+
+
+@app.get("/metrics")
+async def get_metrics():
+    """Runtime stats for caches, queues and other tunable components."""
+    return metrics.collect()
@@ -0,0 +1,19 @@
+"""Process-wide registry of component stats exposed at /metrics."""
+from typing import Callable
+
+_sources: dict[str, Callable[[], dict]] = {}
+
+
+def register(name: str, source: Callable[[], dict]):
+    """Register a callable that returns a stats dict for a component."""
+    _sources[name] = source
+
+
+def unregister(name: str):
+    """Remove a stats source."""
+    _sources.pop(name, None)
+
+
+def collect() -> dict:
+    """Snapshot every registered component's stats."""
+    return {name: source() for name, source in _sources.items()}
@@ -1,5 +1,6 @@
 """Scheduler modules."""
 from src.scheduler.checkins import router as checkins_router
+from src.scheduler.maintenance import router as maintenance_router
 from src.scheduler.triggers import router as triggers_router
 
-__all__ = ["checkins_router", "triggers_router"]
+__all__ = ["checkins_router", "maintenance_router", "triggers_router"]
@@ -1,29 +1,63 @@
 """Daily check-in scheduler."""
+import asyncio
+import time
+
 from fastapi import APIRouter
 from agents import Agent, Runner
 
-from src.agent.tools import send_sms
+from src.agent.tools import send_sms_async
+from src.agent import prompts
+from src.agent.context import user_id_from_phone
+from src.agent.prompts import prompt_cache_stats
+from src.agent.router import default_model, model_router
+from src.agent.factory import agent_builder, get_agent
+from src.agent.memory_packer import memory_context_async
 from src.config.loader import ConfigLoader
-from src.storage.firestore import FirestoreClient
+from src.storage.engine import get_async_storage
 from src.storage.memory import MemoryWrapper
 
 router = APIRouter()
 
+CHECKIN_TOOLS_DOC = """You will be given their recent activity and what you remember about them.
 
-@router.post("/cron/daily-checkin")
-async def daily_checkin():
-    """Triggered by Cloud Scheduler for daily check-ins."""
+Send them a brief, personalized check-in SMS. Be the personality described above.
+Use the send_sms tool to send the message."""
+
+
+@agent_builder("checkin")
+def create_checkin_agent() -> Agent:
+    """Check-in agent; the user's recent activity is passed in the run input."""
     config = ConfigLoader()
     personality = config.get_personality()
     user = config.get_user()
 
-    fs = FirestoreClient()
-    memory = MemoryWrapper(user_id=user.get("phone", "default").replace("+", ""))
+    return Agent(
+        name="CheckInAgent",
+        instructions=prompts.instructions(
+            personality,
+            f"You are doing a scheduled check-in with {user.get('name') or 'the user'}.",
+            CHECKIN_TOOLS_DOC,
+        ),
+        tools=[send_sms_async],
+        model=default_model(),
+    )
+
+
+@router.post("/cron/daily-checkin")
+async def daily_checkin():
+    """Triggered by Cloud Scheduler for daily check-ins."""
+    user = ConfigLoader().get_user()
+
+    storage = get_async_storage()
+    user_id = user_id_from_phone(user.get("phone"))
+    memory = MemoryWrapper(user_id=user_id)
 
     # Gather context
-    recent_workouts = fs.get_workouts(days=3)
-    recent_meals = fs.get_meals(days=1)
-    relevant_memories = memory.search("recent activity and mood", limit=10)
+    recent_workouts, recent_meals = await asyncio.gather(
+        storage.get_workouts(days=3, user_id=user_id),
+        storage.get_meals(days=1, user_id=user_id),
+    )
+    relevant_memories = await memory_context_async(memory, "recent activity and mood", "checkin")
 
     # Format context
     workout_summary = f"{len(recent_workouts)} workouts in last 3 days"
@@ -32,28 +66,15 @@ async def daily_checkin():
 
     meal_summary = f"{len(recent_meals)} meals logged today"
 
-    # Create check-in agent
-    agent = Agent(
-        name="CheckInAgent",
-        instructions=f"""
-{personality.get('prompt', 'You are a fitness coach.')}
-
-You are doing a scheduled check-in with {user.get('name', 'the user')}.
-
-Their recent activity:
-- Workouts: {workout_summary}
-- Nutrition: {meal_summary}
-
-What you remember about them:
-{memory.format_memories(relevant_memories)}
-
-Send them a brief, personalized check-in SMS. Be the personality described above.
-Use the send_sms tool to send the message.
-""",
-        tools=[send_sms],
-        model="gpt-4o",
-    )
-
-    result = Runner.run_sync(agent, "Send the daily check-in message.")
+    agent = get_agent("checkin", user_id)
+    route = model_router.route("checkin")
+    started = time.perf_counter()
+    result = await Runner.run(agent, prompts.run_input(
+        "Send the daily check-in message.",
+        relevant_memories,
+        {"workouts": workout_summary, "nutrition": meal_summary},
+    ), run_config=route.run_config())
+    model_router.record(route, started, result)
+    prompt_cache_stats.record("checkin", result)
 
     return {"status": "ok", "result": result.final_output}
@@ -0,0 +1,36 @@
+"""Storage maintenance jobs."""
+from fastapi import APIRouter
+from fastapi.concurrency import run_in_threadpool
+
+from src.agent.context import user_id_from_phone
+from src.config.loader import ConfigLoader
+from src.storage.engine import get_async_storage, get_storage
+
+router = APIRouter()
+
+
+@router.post("/cron/repair-activity-state")
+async def repair_activity_state():
+    """Rebuild the user's activity state doc from their log entries."""
+    user = ConfigLoader().get_user()
+    user_id = user_id_from_phone(user.get("phone"))
+
+    state = await get_async_storage().rebuild_activity_state(user_id=user_id)
+
+    return {
+        "status": "ok",
+        "user_id": user_id,
+        "streak_days": state["streak_days"],
+        "last_workout_day": state["last_workout_day"],
+    }
+
+
+@router.post("/cron/compact-logs")
+async def compact_logs():
+    """Fold the user's old log entries into monthly archives."""
+    user = ConfigLoader().get_user()
+    user_id = user_id_from_phone(user.get("phone"))
+
+    compacted = await run_in_threadpool(get_storage().compact_logs, user_id=user_id)
+
+    return {"status": "ok", "user_id": user_id, "compacted": compacted}
@@ -0,0 +1,141 @@
+"""Compiled trigger rules.
+
+Rules from ``config/triggers`` are compiled into a RulePlan: the set of facts
+the rules need is worked out up front, each fact is fetched once (all of them
+concurrently), and every rule's predicate is checked against that fact table.
+
+New event types plug in by registering the facts they need and a predicate::
+
+    @fact_provider("workouts_this_week")
+    async def workouts_this_week(storage, user_id):
+        return await storage.count_workouts(days=7, user_id=user_id)
+
+    @event_type("low_volume", "workouts_this_week")
+    def low_volume(rule, facts):
+        if facts["workouts_this_week"] < rule.get("min", 3):
+            return {"workouts_this_week": facts["workouts_this_week"]}
+"""
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Mapping
+
+logger = logging.getLogger(__name__)
+
+# fact name -> async provider(storage, user_id)
+FactProvider = Callable[[Any, str], Awaitable[Any]]
+FACT_PROVIDERS: dict[str, FactProvider] = {}
+
+# predicate(rule, facts) -> trigger context, or None if the rule doesn't fire
+Predicate = Callable[[Mapping, Mapping[str, Any]], dict | None]
+
+
+@dataclass(frozen=True)
+class EventType:
+    name: str
+    facts: tuple[str, ...]
+    predicate: Predicate
+
+
+EVENT_TYPES: dict[str, EventType] = {}
+
+
+def fact_provider(name: str):
+    """Register an async ``provider(storage, user_id)`` for a named fact."""
+    def register(provider: FactProvider) -> FactProvider:
+        FACT_PROVIDERS[name] = provider
+        return provider
+    return register
+
+
+def event_type(name: str, *facts: str):
+    """Register a rule event whose predicate reads the given facts."""
+    def register(predicate: Predicate) -> Predicate:
+        EVENT_TYPES[name] = EventType(name, facts, predicate)
+        return predicate
+    return register
+
+
+@dataclass(frozen=True)
+class RulePlan:
+    """Rules paired with their event types, plus the facts they need."""
+
+    rules: tuple[tuple[Mapping, EventType], ...]
+    facts: tuple[str, ...]
+
+    async def fetch_facts(self, storage, user_id: str) -> dict[str, Any]:
+        """Fetch every needed fact once, concurrently."""
+        values = await asyncio.gather(*(FACT_PROVIDERS[name](storage, user_id) for name in self.facts))
+        return dict(zip(self.facts, values))
+
+    def evaluate(self, facts: Mapping[str, Any]) -> list[dict]:
+        """Triggers (rule plus context) for every rule whose predicate holds."""
+        triggered = []
+        for rule, event in self.rules:
+            context = event.predicate(rule, facts)
+            if context is not None:
+                triggered.append({"rule": rule, "context": context})
+        return triggered
+
+    async def run(self, storage, user_id: str) -> list[dict]:
+        return self.evaluate(await self.fetch_facts(storage, user_id))
+
+
+def compile_rules(rules) -> RulePlan:
+    """Compile trigger rules into a plan; rules with unknown events are skipped."""
+    compiled = []
+    facts: dict[str, None] = {}
+    for rule in rules:
+        event = EVENT_TYPES.get(rule.get("event"))
+        if event is None:
+            logger.warning("Skipping trigger rule with unknown event %r", rule.get("event"))
+            continue
+        compiled.append((rule, event))
+        facts.update(dict.fromkeys(event.facts))
+    return RulePlan(tuple(compiled), tuple(facts))
+
+
+_compiled: tuple[int, RulePlan] | None = None
+
+
+def plan_for(rules, version: int) -> RulePlan:
+    """The compiled plan for a config version, recompiled only when it changes."""
+    global _compiled
+    if _compiled is None or _compiled[0] != version:
+        _compiled = (version, compile_rules(rules))
+    return _compiled[1]
+
+
+# Built-in facts and events
+
+@fact_provider("days_since_workout")
+async def days_since_workout(storage, user_id: str) -> int:
+    last_workout = await storage.get_last_workout_date(user_id=user_id)
+    if not last_workout:
+        return 999  # No workouts ever
+    if hasattr(last_workout, 'timestamp'):
+        last_workout = datetime.fromtimestamp(last_workout.timestamp())
+    return (datetime.now() - last_workout).days
+
+
+@fact_provider("calories_today")
+async def calories_today(storage, user_id: str) -> int:
+    return (await storage.get_daily_rollups(days=1, user_id=user_id))[0]["calories"]
+
+
+@event_type("no_workout", "days_since_workout")
+def no_workout(rule: Mapping, facts: Mapping[str, Any]) -> dict | None:
+    days_since = facts["days_since_workout"]
+    if days_since >= rule.get("days", 2):
+        return {"days_since_workout": days_since}
+    return None
+
+
+@event_type("calorie_deficit", "calories_today")
+def calorie_deficit(rule: Mapping, facts: Mapping[str, Any]) -> dict | None:
+    total_cals = facts["calories_today"]
+    deficit = rule.get("target", 2000) - total_cals
+    if deficit > rule.get("threshold", 500):
+        return {"calorie_deficit": deficit, "total_today": total_cals}
+    return None
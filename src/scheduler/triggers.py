@@ -1,11 +1,19 @@
 """Event-based trigger checker."""
-from datetime import datetime, timedelta
+import time
+
 from fastapi import APIRouter
 from agents import Agent, Runner
 
-from src.agent.tools import send_sms, initiate_call
+from src.agent.tools import send_sms_async, initiate_call_async
+from src.agent import prompts
+from src.agent.context import user_id_from_phone
+from src.agent.prompts import prompt_cache_stats
+from src.agent.router import default_model, model_router
+from src.agent.factory import agent_builder, get_agent
+from src.agent.memory_packer import memory_context_async
 from src.config.loader import ConfigLoader
-from src.storage.firestore import FirestoreClient
+from src.scheduler.rules import plan_for
+from src.storage.engine import get_async_storage
 from src.storage.memory import MemoryWrapper
 
 router = APIRouter()
@@ -15,82 +23,66 @@ router = APIRouter()
 async def check_triggers():
     """Check and execute event-based triggers."""
     config = ConfigLoader()
+    # Read the version first so a concurrent swap forces a recompile next run
+    config_version = config.version
     triggers_config = config.get_triggers()
-    personality = config.get_personality()
     user = config.get_user()
 
-    fs = FirestoreClient()
-    memory = MemoryWrapper(user_id=user.get("phone", "default").replace("+", ""))
-
-    triggered = []
-
-    for rule in triggers_config.get("rules", []):
-        event = rule.get("event")
-
-        if event == "no_workout":
-            last_workout = fs.get_last_workout_date()
-            if last_workout:
-                if hasattr(last_workout, 'timestamp'):
-                    last_dt = datetime.fromtimestamp(last_workout.timestamp())
-                else:
-                    last_dt = last_workout
-                days_since = (datetime.now() - last_dt).days
-            else:
-                days_since = 999  # No workouts ever
-
-            if days_since >= rule.get("days", 2):
-                triggered.append({
-                    "rule": rule,
-                    "context": {"days_since_workout": days_since}
-                })
-
-        elif event == "calorie_deficit":
-            meals = fs.get_meals(days=1)
-            total_cals = sum(m.get("calories", 0) for m in meals)
-            target = 2000  # Could be configurable
-            deficit = target - total_cals
-
-            if deficit > rule.get("threshold", 500):
-                triggered.append({
-                    "rule": rule,
-                    "context": {"calorie_deficit": deficit, "total_today": total_cals}
-                })
+    storage = get_async_storage()
+    user_id = user_id_from_phone(user.get("phone"))
+    memory = MemoryWrapper(user_id=user_id)
+
+    # Each fact the rules need is fetched once, however many rules use it
+    plan = plan_for(triggers_config.get("rules", []), config_version)
+    triggered = await plan.run(storage, user_id)
 
     # Execute triggered actions
     for trigger in triggered:
-        await execute_trigger(trigger, personality, user, memory)
+        await execute_trigger(trigger, memory)
 
     return {"status": "ok", "triggers_fired": len(triggered)}
 
 
-async def execute_trigger(trigger: dict, personality: dict, user: dict, memory: MemoryWrapper):
-    """Execute a triggered action."""
-    rule = trigger["rule"]
-    context = trigger["context"]
-    action = rule.get("action", "sms")
-
-    relevant_memories = memory.search(str(context), limit=10)
-
-    tools = [send_sms] if action == "sms" else [initiate_call]
+def _trigger_agent(action: str) -> Agent:
+    """Trigger agent for an action; the trigger itself is passed in the run input."""
+    config = ConfigLoader()
+    do = "Send them an SMS" if action == "sms" else "Call them"
 
-    agent = Agent(
+    return Agent(
         name="TriggerAgent",
-        instructions=f"""
-{personality.get('prompt', 'You are a fitness coach.')}
+        instructions=prompts.instructions(
+            config.get_personality(),
+            f"A trigger has been activated for {config.get_user().get('name') or 'the user'}.",
+            f"""You will be given the trigger, its context and what you remember about them.
+
+{do} about this.
+Be the personality described above. Be direct but motivating.""",
+        ),
+        tools=[send_sms_async] if action == "sms" else [initiate_call_async],
+        model=default_model(),
+    )
 
-A trigger has been activated for {user.get('name', 'the user')}.
 
-Trigger: {rule.get('event')}
-Context: {context}
+agent_builder("trigger-sms")(lambda: _trigger_agent("sms"))
+agent_builder("trigger-call")(lambda: _trigger_agent("call"))
 
-What you remember about them:
-{memory.format_memories(relevant_memories)}
 
-{"Send them an SMS" if action == "sms" else "Call them"} about this.
-Be the personality described above. Be direct but motivating.
-""",
-        tools=tools,
-        model="gpt-4o",
-    )
+async def execute_trigger(trigger: dict, memory: MemoryWrapper):
+    """Execute a triggered action."""
+    rule = trigger["rule"]
+    context = trigger["context"]
+    action = rule.get("action", "sms")
 
-    Runner.run_sync(agent, f"Execute the {action} for this trigger.")
+    relevant_memories = await memory_context_async(memory, str(context), "trigger")
+
+    kind = "trigger-sms" if action == "sms" else "trigger-call"
+    agent = get_agent(kind, memory.user_id)
+    route = model_router.route(kind)
+    started = time.perf_counter()
+    result = await Runner.run(agent, prompts.run_input(
+        f"Execute the {action} for this trigger.",
+        relevant_memories,
+        {"trigger": rule.get("event"), **context},
+    ), run_config=route.run_config())
+    model_router.record(route, started, result)
+    prompt_cache_stats.record(kind, result)
@@ -1,5 +1,19 @@
-"""Storage layer for Firestore and Mem0."""
-from src.storage.firestore import FirestoreClient
+"""Storage layer: pluggable structured storage engines and Mem0."""
+from src.storage.base import AsyncStorageAdapter, StorageBackend
+from src.storage.engine import get_async_storage, get_storage
+from src.storage.firestore import AsyncFirestoreClient, FirestoreClient
+from src.storage.inmemory import InMemoryStorage
 from src.storage.memory import MemoryWrapper
+from src.storage.sqlite import SQLiteStorage
 
-__all__ = ["FirestoreClient", "MemoryWrapper"]
+__all__ = [
+    "AsyncFirestoreClient",
+    "AsyncStorageAdapter",
+    "FirestoreClient",
+    "InMemoryStorage",
+    "MemoryWrapper",
+    "SQLiteStorage",
+    "StorageBackend",
+    "get_async_storage",
+    "get_storage",
+]
@@ -0,0 +1,118 @@
+"""Column-packed monthly archives for cold log entries.
+
+Entries older than ``LOG_COMPACTION_AGE_DAYS`` are folded into one document
+per user, kind and month::
+
+    users/{user_id}/archives/{kind}-{YYYY-MM}
+
+Each archive stores its entries as parallel arrays (one per column), so a
+month of history is a single read however many entries it holds.
+"""
+import json
+import os
+from datetime import datetime, timedelta, timezone
+
+from src.storage.base import user_timezone
+
+# Columns kept per kind. raw_input is dropped: archives serve summaries, and
+# the original message text is the bulk of an entry's size.
+ARCHIVE_COLUMNS = {
+    "workouts": ("id", "timestamp", "type", "duration_mins", "exercises", "notes"),
+    "meals": ("id", "timestamp", "meal_type", "calories", "protein", "carbs", "fat", "description"),
+}
+
+# Firestore arrays can't hold arrays, so list-valued columns are stored as JSON
+JSON_COLUMNS = ("exercises",)
+
+
+def compaction_age_days() -> int:
+    """Entries older than this many days belong in the cold tier."""
+    return int(os.getenv("LOG_COMPACTION_AGE_DAYS", "90"))
+
+
+def archive_boundary(age_days: int | None = None) -> datetime:
+    """Entries with a timestamp before this are compacted."""
+    if age_days is None:
+        age_days = compaction_age_days()
+    return datetime.now(timezone.utc) - timedelta(days=age_days)
+
+
+def month_key(timestamp: datetime) -> str:
+    """YYYY-MM of a timestamp in the user's timezone."""
+    return timestamp.astimezone(user_timezone()).strftime("%Y-%m")
+
+
+def archive_id(kind: str, month: str) -> str:
+    return f"{kind}-{month}"
+
+
+def month_keys_between(start: datetime, end: datetime) -> list[str]:
+    """Month keys from ``start`` to ``end`` inclusive, oldest first."""
+    tz = user_timezone()
+    year, month = start.astimezone(tz).year, start.astimezone(tz).month
+    last = month_key(end)
+    keys = []
+    while True:
+        key = f"{year:04d}-{month:02d}"
+        keys.append(key)
+        if key >= last:
+            return keys
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def archive_months(days: int, age_days: int | None = None) -> list[str]:
+    """Archive months a ``days``-long window reaches into, or [] if it is all hot."""
+    if age_days is None:
+        age_days = compaction_age_days()
+    if days <= age_days:
+        return []
+    now = datetime.now(timezone.utc)
+    return month_keys_between(now - timedelta(days=days), now - timedelta(days=age_days))
+
+
+def pack_entries(kind: str, month: str, entries: list[dict], existing: dict | None = None) -> dict:
+    """Archive doc holding ``entries`` merged into ``existing``, oldest first.
+
+    Entries already in the archive (by id) are skipped, so re-running a
+    compaction page after a partial failure is harmless.
+    """
+    rows = unpack_archive(kind, existing) if existing else []
+    seen = {row["id"] for row in rows}
+    for entry in entries:
+        if entry["id"] not in seen:
+            rows.append(entry)
+            seen.add(entry["id"])
+    rows.sort(key=lambda row: row["timestamp"])
+
+    columns = {}
+    for column in ARCHIVE_COLUMNS[kind]:
+        values = [row.get(column) for row in rows]
+        if column in JSON_COLUMNS:
+            values = [json.dumps(value or []) for value in values]
+        columns[column] = values
+    return {"kind": kind, "month": month, "count": len(rows), "columns": columns}
+
+
+def unpack_archive(kind: str, data: dict | None, since: datetime | None = None) -> list[dict]:
+    """Entry dicts from an archive doc, oldest first, optionally from ``since`` on."""
+    if not data:
+        return []
+    columns = data.get("columns") or {}
+    names = [column for column in ARCHIVE_COLUMNS[kind] if column in columns]
+    rows = []
+    for values in zip(*(columns[column] for column in names)):
+        row = dict(zip(names, values))
+        for column in JSON_COLUMNS:
+            if column in row:
+                row[column] = json.loads(row[column] or "[]")
+        if since is None or row["timestamp"] >= since:
+            rows.append(row)
+    return rows
+
+
+def merge_entries(hot: list[dict], cold: list[dict], limit: int | None = None) -> list[dict]:
+    """Hot and archived entries as one newest-first list, deduplicated by id."""
+    seen = {entry["id"] for entry in hot}
+    merged = hot + [entry for entry in cold if entry["id"] not in seen]
+    merged.sort(key=lambda entry: entry["timestamp"], reverse=True)
+    return merged[:limit] if limit else merged
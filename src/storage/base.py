@@ -0,0 +1,287 @@
+"""Storage interface shared by the Firestore, SQLite and in-memory engines."""
+import asyncio
+import copy
+import os
+from abc import ABC, abstractmethod
+from datetime import date, datetime, timedelta
+from zoneinfo import ZoneInfo
+
+DEFAULT_USER_ID = "default"
+
+ROLLUP_FIELDS = {
+    "workout_count": 0,
+    "workout_minutes": 0,
+    "workout_types": [],
+    "meal_count": 0,
+    "calories": 0,
+    "protein": 0,
+    "carbs": 0,
+    "fat": 0,
+}
+
+
+MEAL_TOTAL_FIELDS = ("calories", "protein", "carbs", "fat")
+
+
+def meal_totals(meals) -> dict:
+    """Meal count and macro totals for an iterable of meal dicts."""
+    totals = {"count": 0, **{field: 0 for field in MEAL_TOTAL_FIELDS}}
+    for meal in meals:
+        totals["count"] += 1
+        for field in MEAL_TOTAL_FIELDS:
+            totals[field] += meal.get(field, 0) or 0
+    return totals
+
+
+def user_timezone() -> ZoneInfo:
+    """The user's timezone, used to decide which day a log belongs to."""
+    return ZoneInfo(os.getenv("USER_TIMEZONE") or "America/Los_Angeles")
+
+
+def local_today() -> date:
+    """Today's date in the user's timezone, used to bucket rollups."""
+    return datetime.now(user_timezone()).date()
+
+
+def rollup_day_keys(days: int) -> list[str]:
+    """Day keys for the last N calendar days including today, newest first."""
+    today = local_today()
+    return [(today - timedelta(days=offset)).isoformat() for offset in range(max(days, 1))]
+
+
+def empty_rollup(day_key: str) -> dict:
+    """A zero-filled daily rollup."""
+    return {"date": day_key, **ROLLUP_FIELDS, "workout_types": []}
+
+
+def sum_rollups(rollups: list[dict]) -> dict:
+    """Total the numeric fields of a list of daily rollups."""
+    totals = {k: 0 for k, v in ROLLUP_FIELDS.items() if not isinstance(v, list)}
+    for rollup in rollups:
+        for key in totals:
+            totals[key] += rollup.get(key, 0) or 0
+    return totals
+
+
+# How far back streaks are rebuilt from rollups
+STREAK_LOOKBACK_DAYS = 366
+
+TODAY_FIELDS = ("workout_count", "workout_minutes", "meal_count", *MEAL_TOTAL_FIELDS)
+
+
+def _previous_day(day_key: str) -> str:
+    return (date.fromisoformat(day_key) - timedelta(days=1)).isoformat()
+
+
+def empty_activity_state() -> dict:
+    """Activity state for a user with no logs."""
+    return {
+        "last_workout_at": None,
+        "last_meal_at": None,
+        "last_workout_day": None,
+        "streak_days": 0,
+        "today": {"date": None, **{field: 0 for field in TODAY_FIELDS}},
+        # Bumped by every log; keys caches of answers derived from the logs
+        "data_version": 0,
+    }
+
+
+def advance_activity_state(state: dict | None, kind: str, day_key: str, values: dict, now: datetime) -> dict:
+    """Project the activity state after logging one workout or meal on ``day_key``."""
+    state = copy.deepcopy(state) if state else empty_activity_state()
+    today = state.get("today") or {}
+    if today.get("date") != day_key:
+        today = {"date": day_key, **{field: 0 for field in TODAY_FIELDS}}
+    for field, amount in values.items():
+        today[field] = (today.get(field) or 0) + amount
+    state["today"] = today
+    state["data_version"] = (state.get("data_version") or 0) + 1
+
+    if kind == "workout":
+        state["last_workout_at"] = now
+        last_day = state.get("last_workout_day")
+        if last_day != day_key:
+            continued = last_day == _previous_day(day_key)
+            state["streak_days"] = (state.get("streak_days") or 0) + 1 if continued else 1
+            state["last_workout_day"] = day_key
+    else:
+        state["last_meal_at"] = now
+    return state
+
+
+def current_activity(state: dict | None, today_key: str) -> dict:
+    """The stored state as of today: stale totals zeroed and broken streaks reset."""
+    state = copy.deepcopy(state) if state else empty_activity_state()
+    if (state.get("today") or {}).get("date") != today_key:
+        state["today"] = {"date": today_key, **{field: 0 for field in TODAY_FIELDS}}
+    if state.get("last_workout_day") not in (today_key, _previous_day(today_key)):
+        state["streak_days"] = 0
+    return state
+
+
+def build_activity_state(
+    rollups: list[dict], last_workout_at: datetime | None, last_meal_at: datetime | None
+) -> dict:
+    """Rebuild an activity state from daily rollups (newest first) and last-log times."""
+    state = empty_activity_state()
+    state["last_workout_at"] = last_workout_at
+    state["last_meal_at"] = last_meal_at
+    if rollups:
+        state["today"] = {"date": rollups[0]["date"], **{field: rollups[0].get(field, 0) for field in TODAY_FIELDS}}
+    active_days = [rollup["date"] for rollup in rollups if rollup.get("workout_count")]
+    if active_days:
+        state["last_workout_day"] = active_days[0]
+    elif last_workout_at is not None:
+        state["last_workout_day"] = last_workout_at.astimezone(user_timezone()).date().isoformat()
+
+    streak = 0
+    # A streak is still alive if the last workout was yesterday
+    start = 1 if rollups and not rollups[0].get("workout_count") else 0
+    for rollup in rollups[start:]:
+        if not rollup.get("workout_count"):
+            break
+        streak += 1
+    state["streak_days"] = streak
+    return state
+
+
+class StorageBackend(ABC):
+    """Structured storage for logs and config documents.
+
+    Timestamps returned by the read methods are timezone-aware datetimes.
+    """
+
+    @abstractmethod
+    def log_workout(
+        self,
+        workout_type: str,
+        duration_mins: int,
+        exercises: list[dict] | None = None,
+        notes: str | None = None,
+        raw_input: str | None = None,
+        user_id: str = DEFAULT_USER_ID,
+    ) -> str:
+        """Log a workout and return its ID."""
+
+    @abstractmethod
+    def log_meal(
+        self,
+        meal_type: str,
+        calories: int,
+        protein: int,
+        carbs: int,
+        fat: int,
+        description: str,
+        raw_input: str | None = None,
+        user_id: str = DEFAULT_USER_ID,
+    ) -> str:
+        """Log a meal and return its ID."""
+
+    @abstractmethod
+    def get_workouts(self, days: int = 7, user_id: str = DEFAULT_USER_ID) -> list[dict]:
+        """Get workouts from the past N days, newest first."""
+
+    @abstractmethod
+    def get_meals(
+        self, days: int = 1, limit: int | None = None, user_id: str = DEFAULT_USER_ID
+    ) -> list[dict]:
+        """Get meals from the past N days, newest first."""
+
+    @abstractmethod
+    def get_last_workout_date(self, user_id: str = DEFAULT_USER_ID) -> datetime | None:
+        """Get the timestamp of the most recent workout."""
+
+    @abstractmethod
+    def get_daily_rollups(self, days: int = 7, user_id: str = DEFAULT_USER_ID) -> list[dict]:
+        """Get daily rollups for the last N calendar days, newest first."""
+
+    def aggregate_meals(self, days: int = 1, user_id: str = DEFAULT_USER_ID) -> dict:
+        """Meal count and calorie/macro totals for the past N days.
+
+        Engines override this with a native aggregation; the default folds
+        get_meals() locally.
+        """
+        return meal_totals(self.get_meals(days=days, user_id=user_id))
+
+    def count_workouts(self, days: int = 7, user_id: str = DEFAULT_USER_ID) -> int:
+        """Number of workouts in the past N days."""
+        return len(self.get_workouts(days=days, user_id=user_id))
+
+    def get_activity_state(self, user_id: str = DEFAULT_USER_ID) -> dict:
+        """Last workout/meal times, current streak and today's totals.
+
+        Engines that keep a materialized state doc override this with a
+        point read; the default derives it from rollups.
+        """
+        rollups = self.get_daily_rollups(days=STREAK_LOOKBACK_DAYS, user_id=user_id)
+        last_meals = self.get_meals(days=STREAK_LOOKBACK_DAYS, limit=1, user_id=user_id)
+        state = build_activity_state(
+            rollups,
+            self.get_last_workout_date(user_id=user_id),
+            last_meals[0]["timestamp"] if last_meals else None,
+        )
+        return current_activity(state, local_today().isoformat())
+
+    def rebuild_activity_state(self, user_id: str = DEFAULT_USER_ID) -> dict:
+        """Recompute any materialized activity state from the log entries."""
+        return self.get_activity_state(user_id=user_id)
+
+    def get_data_version(self, user_id: str = DEFAULT_USER_ID) -> str:
+        """Opaque token that changes whenever the user logs a workout or meal.
+
+        Engines with a materialized activity doc return its log counter; the
+        default fingerprints the newest entries.
+        """
+        last_meals = self.get_meals(days=STREAK_LOOKBACK_DAYS, limit=1, user_id=user_id)
+        last_meal = last_meals[0]["timestamp"] if last_meals else None
+        return f"{self.get_last_workout_date(user_id=user_id)}|{last_meal}"
+
+    def compact_logs(self, user_id: str = DEFAULT_USER_ID) -> dict:
+        """Move old entries into a cold tier; returns entries compacted per kind.
+
+        Local engines answer long windows from an index, so by default there
+        is nothing to compact.
+        """
+        return {"workouts": 0, "meals": 0}
+
+    @abstractmethod
+    def get_config(self, name: str) -> dict | None:
+        """Get a config document, or None if it does not exist."""
+
+    def watch_config(self, name: str, callback):
+        """Call ``callback(data)`` whenever config doc ``name`` changes.
+
+        Returns a handle with ``unsubscribe()``, or None if the engine can't
+        push changes, in which case callers poll get_config instead.
+        """
+        return None
+
+    @abstractmethod
+    def set_config(self, name: str, data: dict):
+        """Create or replace a config document."""
+
+    def close(self):
+        """Release resources and flush pending writes."""
+
+
+class AsyncStorageAdapter:
+    """Async view of a sync StorageBackend that runs calls in worker threads.
+
+    Gives engines without a native async client the same awaitable surface
+    as AsyncFirestoreClient.
+    """
+
+    def __init__(self, backend: StorageBackend):
+        self.backend = backend
+
+    def __getattr__(self, name: str):
+        method = getattr(self.backend, name)
+        if not callable(method):
+            return method
+
+        async def call(*args, **kwargs):
+            return await asyncio.to_thread(method, *args, **kwargs)
+
+        call.__name__ = name
+        call.__doc__ = method.__doc__
+        return call
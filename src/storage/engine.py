@@ -0,0 +1,58 @@
+"""Select the storage engine for this process.
+
+``STORAGE_BACKEND`` picks the engine: ``firestore`` (default), ``sqlite``
+(file at ``SQLITE_PATH``) or ``memory``.
+"""
+import os
+
+from src.storage.base import AsyncStorageAdapter, StorageBackend
+from src.storage.firestore import AsyncFirestoreClient, FirestoreClient, shutdown_storage as _shutdown_firestore
+
+BACKENDS = ("firestore", "sqlite", "memory")
+
+_local_backend: StorageBackend | None = None
+
+
+def backend_name() -> str:
+    """The configured storage engine name."""
+    name = os.getenv("STORAGE_BACKEND", "firestore").lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown STORAGE_BACKEND {name!r}; expected one of {', '.join(BACKENDS)}")
+    return name
+
+
+def _get_local_backend(name: str) -> StorageBackend:
+    global _local_backend
+    if _local_backend is None:
+        if name == "sqlite":
+            from src.storage.sqlite import SQLiteStorage
+            _local_backend = SQLiteStorage()
+        else:
+            from src.storage.inmemory import InMemoryStorage
+            _local_backend = InMemoryStorage()
+    return _local_backend
+
+
+def get_storage() -> StorageBackend:
+    """The process-wide storage engine."""
+    name = backend_name()
+    if name == "firestore":
+        return FirestoreClient()
+    return _get_local_backend(name)
+
+
+def get_async_storage():
+    """Awaitable storage for coroutines: the native async client or a thread adapter."""
+    name = backend_name()
+    if name == "firestore":
+        return AsyncFirestoreClient()
+    return AsyncStorageAdapter(_get_local_backend(name))
+
+
+def shutdown_storage():
+    """Flush and close storage engines; called on application shutdown."""
+    global _local_backend
+    _shutdown_firestore()
+    if _local_backend is not None:
+        _local_backend.close()
+        _local_backend = None
@@ -1,13 +1,400 @@
 """Firestore client for structured data storage."""
+import asyncio
 import os
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Any
 
 import firebase_admin
-from firebase_admin import credentials, firestore
+from firebase_admin import credentials, firestore, firestore_async
+from google.api_core.exceptions import GoogleAPICallError
+from google.cloud.firestore_v1 import async_transactional, transactional
 
+from src import metrics
+from src.storage.archive import (
+    ARCHIVE_COLUMNS,
+    archive_boundary,
+    archive_id,
+    archive_months,
+    merge_entries,
+    month_key,
+    pack_entries,
+    unpack_archive,
+)
+from src.storage.base import (
+    DEFAULT_USER_ID,
+    MEAL_TOTAL_FIELDS,
+    ROLLUP_FIELDS,
+    STREAK_LOOKBACK_DAYS,
+    StorageBackend,
+    advance_activity_state,
+    build_activity_state,
+    current_activity,
+    empty_rollup,
+    local_today,
+    meal_totals,
+    rollup_day_keys,
+)
+from src.storage.cache import MISSING, TTLCache
+from src.storage.writebehind import Write, WriteBehindQueue, add_to_batch
 
-class FirestoreClient:
+# Process-wide read-through cache shared by the sync and async clients.
+# Keys are query shapes: ("workouts", user_id, days),
+# ("meals", user_id, days, limit), ("last_workout", user_id),
+# ("workout_count", user_id, days), ("meal_totals", user_id, days),
+# ("rollup", user_id, day_key) and ("activity", user_id). The activity entry
+# holds the stored state doc, or None when the user has no doc yet.
+query_cache = TTLCache(
+    maxsize=int(os.getenv("FIRESTORE_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("FIRESTORE_CACHE_TTL", "60")),
+)
+metrics.register("firestore_query_cache", query_cache.stats)
+
+# Old entries compacted per batch; each page also rewrites at most a few
+# archive docs, keeping the batch well under Firestore's 500-write limit.
+COMPACTION_PAGE_SIZE = 200
+
+# Raised when the backend (e.g. an older emulator) can't run aggregation
+# queries; callers fall back to streaming a field mask.
+AGGREGATION_ERRORS = (AttributeError, NotImplementedError, GoogleAPICallError)
+
+
+def _initialize_app():
+    """Initialize the default Firebase app once per process."""
+    if not firebase_admin._apps:
+        cred_path = os.getenv("FIREBASE_SERVICE_ACCOUNT")
+        if cred_path and os.path.exists(cred_path):
+            cred = credentials.Certificate(cred_path)
+            firebase_admin.initialize_app(cred)
+        else:
+            # Use Application Default Credentials
+            firebase_admin.initialize_app()
+
+
+def _workout_rollup_update(day_key: str, workout_type: str, duration_mins: int) -> dict:
+    """Merge payload that folds one workout into its daily rollup."""
+    return {
+        "date": day_key,
+        "workout_count": firestore.Increment(1),
+        "workout_minutes": firestore.Increment(duration_mins or 0),
+        "workout_types": firestore.ArrayUnion([workout_type]),
+    }
+
+
+def _meal_rollup_update(day_key: str, calories: int, protein: int, carbs: int, fat: int) -> dict:
+    """Merge payload that folds one meal into its daily rollup."""
+    return {
+        "date": day_key,
+        "meal_count": firestore.Increment(1),
+        "calories": firestore.Increment(calories or 0),
+        "protein": firestore.Increment(protein or 0),
+        "carbs": firestore.Increment(carbs or 0),
+        "fat": firestore.Increment(fat or 0),
+    }
+
+
+def _rollup_from_snapshot(day_key: str, snapshot) -> dict:
+    """Daily rollup dict for a snapshot, zero-filled when the day has no logs."""
+    data = snapshot.to_dict() if snapshot is not None and snapshot.exists else None
+    rollup = empty_rollup(day_key)
+    if isinstance(data, dict):
+        rollup.update({k: data[k] for k in ROLLUP_FIELDS if k in data})
+    return rollup
+
+
+def _activity_from_snapshot(snapshot) -> dict | None:
+    """Stored activity state for a snapshot, or None when the doc is missing."""
+    data = snapshot.to_dict() if snapshot is not None and snapshot.exists else None
+    return data if isinstance(data, dict) else None
+
+
+def _write_behind_enabled() -> bool:
+    """Whether logs are staged in a WriteBehindQueue (FIRESTORE_WRITE_BEHIND)."""
+    return os.getenv("FIRESTORE_WRITE_BEHIND", "").lower() in ("1", "true", "yes")
+
+
+def _activity_increments(kind: str, day_key: str, values: dict) -> dict:
+    """Blind merge payload for a log on a day the stored doc already shows.
+
+    Only increments and timestamps, so it needs no read and concurrent logs
+    all land.
+    """
+    update = {
+        "today": {"date": day_key, **{field: firestore.Increment(amount) for field, amount in values.items()}},
+        "data_version": firestore.Increment(1),
+    }
+    update["last_workout_at" if kind == "workout" else "last_meal_at"] = firestore.SERVER_TIMESTAMP
+    return update
+
+
+def _activity_update(previous: dict | None, projected: dict, kind: str, day_key: str, values: dict) -> dict:
+    """Merge payload that moves the stored activity doc to ``projected``.
+
+    ``previous`` must be read in the same transaction as this write. Today's
+    totals are incremented in place while the day is unchanged; a new day
+    resets them.
+    """
+    update = _activity_increments(kind, day_key, values)
+    if ((previous or {}).get("today") or {}).get("date") != day_key:
+        update["today"] = projected["today"]
+    update["streak_days"] = projected["streak_days"]
+    if kind == "workout":
+        update["last_workout_day"] = projected["last_workout_day"]
+    return update
+
+
+def _needs_transaction(cached: dict | None, kind: str, day_key: str) -> bool:
+    """Whether a log must read the activity doc: a new day, or a new workout day.
+
+    Decided from the cached state, which is safe because the stored day only
+    moves forward: if the cache already shows ``day_key``, so does the doc.
+    The values written never come from the cache.
+    """
+    if cached is None or (cached.get("today") or {}).get("date") != day_key:
+        return True
+    return kind == "workout" and cached.get("last_workout_day") != day_key
+
+
+def _workout_activity(duration_mins: int) -> dict:
+    return {"workout_count": 1, "workout_minutes": duration_mins or 0}
+
+
+def _meal_activity(calories: int, protein: int, carbs: int, fat: int) -> dict:
+    return {"meal_count": 1, "calories": calories or 0, "protein": protein or 0, "carbs": carbs or 0, "fat": fat or 0}
+
+
+def _add_meal_totals(totals: dict, extra: dict) -> dict:
+    return {key: totals[key] + extra[key] for key in totals}
+
+
+def _since(days: int) -> datetime:
+    return datetime.now(timezone.utc) - timedelta(days=days)
+
+
+def _invalidate_workout_queries(user_id: str, day_key: str):
+    """Drop cached queries a new workout makes stale."""
+    query_cache.invalidate(
+        lambda key: (key[0] in ("workouts", "last_workout", "workout_count") and key[1] == user_id)
+        or key == ("rollup", user_id, day_key)
+    )
+
+
+def _invalidate_meal_queries(user_id: str, day_key: str):
+    """Drop cached queries a new meal makes stale."""
+    query_cache.invalidate(
+        lambda key: (key[0] in ("meals", "meal_totals") and key[1] == user_id)
+        or key == ("rollup", user_id, day_key)
+    )
+
+
+def _aggregation_values(results) -> dict:
+    """Flatten aggregation query results into {alias: value}."""
+    return {agg.alias: agg.value for result in results for agg in result}
+
+
+def _meal_totals_from_aggregation(results) -> dict:
+    values = _aggregation_values(results)
+    return {
+        "count": int(values.get("count") or 0),
+        **{field: int(values.get(field) or 0) for field in MEAL_TOTAL_FIELDS},
+    }
+
+
+class _FirestoreSchema:
+    """Document paths, queries and write payloads shared by both clients.
+
+    Logs are partitioned per user::
+
+        users/{user_id}/workouts/{entry}
+        users/{user_id}/meals/{entry}
+        users/{user_id}/rollups/{YYYY-MM-DD}
+        users/{user_id}/state/activity
+        users/{user_id}/archives/{workouts|meals}-{YYYY-MM}
+
+    The activity doc holds the last workout/meal times, the current streak
+    and today's totals. A log on a day the doc already shows is a blind
+    batch of the entry, its rollup and increments to the activity doc, so
+    logs batch and don't contend. The first log of a day (or of a workout
+    day) reads the doc and writes in one transaction, so the rollover and
+    streak are computed from the stored state, not a stale copy.
+    """
+
+    def _user(self, user_id: str):
+        return self.db.collection("users").document(user_id)
+
+    def _workouts(self, user_id: str):
+        return self._user(user_id).collection("workouts")
+
+    def _meals(self, user_id: str):
+        return self._user(user_id).collection("meals")
+
+    def _rollup_ref(self, user_id: str, day_key: str):
+        """Reference to the daily rollup doc for a user's day."""
+        return self._user(user_id).collection("rollups").document(day_key)
+
+    def _activity_ref(self, user_id: str):
+        """Reference to a user's activity state doc."""
+        return self._user(user_id).collection("state").document("activity")
+
+    def _archive_ref(self, user_id: str, kind: str, month: str):
+        """Reference to a user's packed archive of ``kind`` entries for a month."""
+        return self._user(user_id).collection("archives").document(archive_id(kind, month))
+
+    def _archive_refs(self, user_id: str, kind: str, days: int) -> list:
+        """Archive docs a ``days``-long window reaches into."""
+        return [self._archive_ref(user_id, kind, month) for month in archive_months(days)]
+
+    def _cold_entries_query(self, user_id: str, kind: str, boundary: datetime):
+        """Oldest entries of ``kind`` logged before ``boundary``."""
+        return (
+            self._user(user_id).collection(kind)
+            .where("timestamp", "<", boundary)
+            .order_by("timestamp")
+            .limit(COMPACTION_PAGE_SIZE)
+        )
+
+    def _activity_write(
+        self, user_id: str, previous: dict | None, kind: str, day_key: str, values: dict
+    ) -> tuple[dict, Write]:
+        """Projected activity state plus the write that stores it."""
+        projected = advance_activity_state(previous, kind, day_key, values, datetime.now(timezone.utc))
+        update = _activity_update(previous, projected, kind, day_key, values)
+        return projected, (self._activity_ref(user_id), update, True)
+
+    def _blind_log(
+        self, user_id: str, cached: dict, kind: str, day_key: str, values: dict, writes: list[Write]
+    ) -> tuple[dict, list[Write]]:
+        """Projected activity state plus the blind writes for a log on an unchanged day."""
+        projected = advance_activity_state(cached, kind, day_key, values, datetime.now(timezone.utc))
+        update = _activity_increments(kind, day_key, values)
+        return projected, [*writes, (self._activity_ref(user_id), update, True)]
+
+    def _rebuilt_state(self, day_keys: list[str], rollups: dict, last_workout: list, last_meal: list, previous) -> dict:
+        """Activity state rebuilt from rollup snapshots and the newest entries."""
+        state = build_activity_state(
+            [_rollup_from_snapshot(key, rollups.get(key)) for key in day_keys],
+            last_workout[0].to_dict().get("timestamp") if last_workout else None,
+            last_meal[0].to_dict().get("timestamp") if last_meal else None,
+        )
+        state["data_version"] = ((_activity_from_snapshot(previous) or {}).get("data_version") or 0) + 1
+        return state
+
+    def _log_transaction(self, user_id: str, kind: str, day_key: str, values: dict, writes: list[Write]):
+        """Transaction body for one log: read the activity doc, then write everything.
+
+        Returns the activity state the transaction stored.
+        """
+        def log(transaction, snapshot) -> dict:
+            activity, activity_write = self._activity_write(
+                user_id, _activity_from_snapshot(snapshot), kind, day_key, values
+            )
+            add_to_batch(transaction, [*writes, activity_write])
+            return activity
+        return log
+
+    def _workouts_query(self, user_id: str, days: int):
+        cutoff = datetime.now() - timedelta(days=days)
+        return (
+            self._workouts(user_id)
+            .where("timestamp", ">=", cutoff)
+            .order_by("timestamp", direction=firestore.Query.DESCENDING)
+        )
+
+    def _meals_query(self, user_id: str, days: int, limit: int | None):
+        cutoff = datetime.now() - timedelta(days=days)
+        query = (
+            self._meals(user_id)
+            .where("timestamp", ">=", cutoff)
+            .order_by("timestamp", direction=firestore.Query.DESCENDING)
+        )
+        if limit:
+            query = query.limit(limit)
+        return query
+
+    def _meal_totals_aggregation(self, query):
+        """Server-side count plus calorie/macro sums over a meals query."""
+        aggregation = query.count(alias="count")
+        for field in MEAL_TOTAL_FIELDS:
+            aggregation = aggregation.sum(field, alias=field)
+        return aggregation
+
+    def _last_workout_query(self, user_id: str):
+        return (
+            self._workouts(user_id)
+            .order_by("timestamp", direction=firestore.Query.DESCENDING)
+            .limit(1)
+        )
+
+    def _last_meal_query(self, user_id: str):
+        return (
+            self._meals(user_id)
+            .order_by("timestamp", direction=firestore.Query.DESCENDING)
+            .limit(1)
+        )
+
+    def _workout_writes(
+        self,
+        user_id: str,
+        day_key: str,
+        workout_type: str,
+        duration_mins: int,
+        exercises: list[dict] | None,
+        notes: str | None,
+        raw_input: str | None,
+    ) -> tuple[Any, list[Write]]:
+        """Entry ref plus the writes that log a workout and update its rollup."""
+        entry_ref = self._workouts(user_id).document()
+        return entry_ref, [
+            (entry_ref, {
+                "user_id": user_id,
+                "timestamp": firestore.SERVER_TIMESTAMP,
+                "type": workout_type,
+                "duration_mins": duration_mins,
+                "exercises": exercises or [],
+                "notes": notes,
+                "raw_input": raw_input,
+            }, False),
+            (
+                self._rollup_ref(user_id, day_key),
+                _workout_rollup_update(day_key, workout_type, duration_mins),
+                True,
+            ),
+        ]
+
+    def _meal_writes(
+        self,
+        user_id: str,
+        day_key: str,
+        meal_type: str,
+        calories: int,
+        protein: int,
+        carbs: int,
+        fat: int,
+        description: str,
+        raw_input: str | None,
+    ) -> tuple[Any, list[Write]]:
+        """Entry ref plus the writes that log a meal and update its rollup."""
+        entry_ref = self._meals(user_id).document()
+        return entry_ref, [
+            (entry_ref, {
+                "user_id": user_id,
+                "timestamp": firestore.SERVER_TIMESTAMP,
+                "meal_type": meal_type,
+                "calories": calories,
+                "protein": protein,
+                "carbs": carbs,
+                "fat": fat,
+                "description": description,
+                "raw_input": raw_input,
+            }, False),
+            (
+                self._rollup_ref(user_id, day_key),
+                _meal_rollup_update(day_key, calories, protein, carbs, fat),
+                True,
+            ),
+        ]
+
+
+class FirestoreClient(_FirestoreSchema, StorageBackend):
     """Client for Firestore operations."""
 
     _instance = None
@@ -25,16 +412,58 @@ class FirestoreClient:
 
     def _initialize_firebase(self):
         """Initialize Firebase Admin SDK."""
-        if not firebase_admin._apps:
-            cred_path = os.getenv("FIREBASE_SERVICE_ACCOUNT")
-            if cred_path and os.path.exists(cred_path):
-                cred = credentials.Certificate(cred_path)
-                firebase_admin.initialize_app(cred)
+        _initialize_app()
+        self.db = firestore.client()
+        self.write_behind = None
+        if _write_behind_enabled():
+            self.write_behind = WriteBehindQueue(
+                self.db,
+                batch_size=int(os.getenv("FIRESTORE_WRITE_BEHIND_BATCH_SIZE", "50")),
+                flush_interval=float(os.getenv("FIRESTORE_WRITE_BEHIND_FLUSH_INTERVAL", "1.0")),
+                max_queue=int(os.getenv("FIRESTORE_WRITE_BEHIND_MAX_QUEUE", "1000")),
+            )
+            metrics.register("firestore_write_behind", self.write_behind.stats)
+
+    def _log(self, user_id: str, kind: str, day_key: str, values: dict, writes: list[Write]):
+        """Commit a log and its activity update, or stage them when write-behind is on."""
+        key = ("activity", user_id)
+        cached = query_cache.get(key)
+        if not _needs_transaction(cached, kind, day_key):
+            activity, group = self._blind_log(user_id, cached, kind, day_key, values, writes)
+            if self.write_behind:
+                self.write_behind.stage(group)
             else:
-                # Use Application Default Credentials
-                firebase_admin.initialize_app()
+                batch = self.db.batch()
+                add_to_batch(batch, group)
+                batch.commit()
+            query_cache.set(key, activity)
+            return
 
-        self.db = firestore.client()
+        log = self._log_transaction(user_id, kind, day_key, values, writes)
+        activity_ref = self._activity_ref(user_id)
+
+        @transactional
+        def run(transaction) -> dict:
+            return log(transaction, activity_ref.get(transaction=transaction))
+
+        if self.write_behind:
+            # Forget the state until the staged transaction stores the new one
+            query_cache.invalidate(lambda cached_key: cached_key == key)
+            self.write_behind.stage(lambda db: query_cache.set(key, run(db.transaction())))
+            return
+        query_cache.set(key, run(self.db.transaction()))
+
+    def _flush_pending(self):
+        """Make staged writes visible before reading."""
+        if self.write_behind and self.write_behind.pending():
+            self.write_behind.flush()
+
+    def close(self):
+        """Flush and stop the write-behind queue, if any."""
+        if self.write_behind:
+            self.write_behind.close()
+            metrics.unregister("firestore_write_behind")
+            self.write_behind = None
 
     def log_workout(
         self,
@@ -43,17 +472,16 @@ class FirestoreClient:
         exercises: list[dict] | None = None,
         notes: str | None = None,
         raw_input: str | None = None,
+        user_id: str = DEFAULT_USER_ID,
     ) -> str:
-        """Log a workout to Firestore."""
-        doc_ref = self.db.collection("logs").document("workouts").collection("entries").add({
-            "timestamp": firestore.SERVER_TIMESTAMP,
-            "type": workout_type,
-            "duration_mins": duration_mins,
-            "exercises": exercises or [],
-            "notes": notes,
-            "raw_input": raw_input,
-        })
-        return doc_ref[1].id
+        """Log a workout to Firestore and fold it into today's rollup."""
+        day_key = local_today().isoformat()
+        entry_ref, writes = self._workout_writes(
+            user_id, day_key, workout_type, duration_mins, exercises, notes, raw_input
+        )
+        self._log(user_id, "workout", day_key, _workout_activity(duration_mins), writes)
+        _invalidate_workout_queries(user_id, day_key)
+        return entry_ref.id
 
     def log_meal(
         self,
@@ -64,54 +492,538 @@ class FirestoreClient:
         fat: int,
         description: str,
         raw_input: str | None = None,
+        user_id: str = DEFAULT_USER_ID,
     ) -> str:
-        """Log a meal to Firestore."""
-        doc_ref = self.db.collection("logs").document("nutrition").collection("entries").add({
-            "timestamp": firestore.SERVER_TIMESTAMP,
-            "meal_type": meal_type,
-            "calories": calories,
-            "protein": protein,
-            "carbs": carbs,
-            "fat": fat,
-            "description": description,
-            "raw_input": raw_input,
-        })
-        return doc_ref[1].id
-
-    def get_workouts(self, days: int = 7) -> list[dict]:
+        """Log a meal to Firestore and fold it into today's rollup."""
+        day_key = local_today().isoformat()
+        entry_ref, writes = self._meal_writes(
+            user_id, day_key, meal_type, calories, protein, carbs, fat, description, raw_input
+        )
+        self._log(user_id, "meal", day_key, _meal_activity(calories, protein, carbs, fat), writes)
+        _invalidate_meal_queries(user_id, day_key)
+        return entry_ref.id
+
+    def get_workouts(self, days: int = 7, user_id: str = DEFAULT_USER_ID) -> list[dict]:
         """Get workouts from the past N days."""
-        cutoff = datetime.now() - timedelta(days=days)
-        query = (
-            self.db.collection("logs")
-            .document("workouts")
-            .collection("entries")
-            .where("timestamp", ">=", cutoff)
-            .order_by("timestamp", direction=firestore.Query.DESCENDING)
+        key = ("workouts", user_id, days)
+        workouts = query_cache.get(key, MISSING)
+        if workouts is MISSING:
+            self._flush_pending()
+            workouts = [{"id": doc.id, **doc.to_dict()} for doc in self._workouts_query(user_id, days).stream()]
+            archived = self._archived(user_id, "workouts", days)
+            if archived:
+                workouts = merge_entries(workouts, archived)
+            query_cache.set(key, workouts)
+        return workouts
+
+    def get_meals(
+        self, days: int = 1, limit: int | None = None, user_id: str = DEFAULT_USER_ID
+    ) -> list[dict]:
+        """Get meals from the past N days, newest first."""
+        key = ("meals", user_id, days, limit)
+        meals = query_cache.get(key, MISSING)
+        if meals is MISSING:
+            self._flush_pending()
+            meals = [{"id": doc.id, **doc.to_dict()} for doc in self._meals_query(user_id, days, limit).stream()]
+            archived = self._archived(user_id, "meals", days)
+            if archived:
+                meals = merge_entries(meals, archived, limit)
+            query_cache.set(key, meals)
+        return meals
+
+    def _activity_doc(self, user_id: str) -> dict | None:
+        """The stored activity state: a cache hit or one point read."""
+        key = ("activity", user_id)
+        state = query_cache.get(key, MISSING)
+        if state is MISSING:
+            self._flush_pending()
+            state = _activity_from_snapshot(self._activity_ref(user_id).get())
+            query_cache.set(key, state)
+        return state
+
+    def get_activity_state(self, user_id: str = DEFAULT_USER_ID) -> dict:
+        """Last workout/meal times, current streak and today's totals.
+
+        Users logged before the activity doc existed get it rebuilt on
+        first read.
+        """
+        state = self._activity_doc(user_id)
+        if state is None:
+            return self.rebuild_activity_state(user_id=user_id)
+        return current_activity(state, local_today().isoformat())
+
+    def rebuild_activity_state(self, user_id: str = DEFAULT_USER_ID) -> dict:
+        """Recompute the activity doc from the daily rollups and newest entries.
+
+        Used by the repair job when the doc drifts, e.g. after a failed
+        write or a manual edit of the entries. Reads and write share a
+        transaction, so a log that lands meanwhile retries the rebuild
+        instead of being overwritten.
+        """
+        self._flush_pending()
+        query_cache.invalidate(lambda key: key[0] == "rollup" and key[1] == user_id)
+        day_keys = rollup_day_keys(STREAK_LOOKBACK_DAYS)
+        activity_ref = self._activity_ref(user_id)
+
+        @transactional
+        def rebuild(transaction) -> dict:
+            rollups = {
+                snapshot.id: snapshot
+                for snapshot in self.db.get_all(
+                    [self._rollup_ref(user_id, key) for key in day_keys], transaction=transaction
+                )
+            }
+            state = self._rebuilt_state(
+                day_keys,
+                rollups,
+                list(self._last_workout_query(user_id).stream(transaction=transaction)),
+                list(self._last_meal_query(user_id).stream(transaction=transaction)),
+                activity_ref.get(transaction=transaction),
+            )
+            transaction.set(activity_ref, state)
+            return state
+
+        state = rebuild(self.db.transaction())
+        query_cache.set(("activity", user_id), state)
+        query_cache.set(("last_workout", user_id), state["last_workout_at"])
+        return current_activity(state, local_today().isoformat())
+
+    def get_data_version(self, user_id: str = DEFAULT_USER_ID) -> str:
+        """The activity doc's log counter.
+
+        Always a point read: another instance may have logged since the doc
+        was cached here.
+        """
+        self._flush_pending()
+        state = _activity_from_snapshot(self._activity_ref(user_id).get())
+        query_cache.set(("activity", user_id), state)
+        if state is None:
+            self.rebuild_activity_state(user_id=user_id)
+            state = self._activity_doc(user_id)
+        return str(state.get("data_version", 0))
+
+    def get_last_workout_date(self, user_id: str = DEFAULT_USER_ID) -> datetime | None:
+        """Get the date of the most recent workout.
+
+        Reads the activity doc; the ordered query only runs for users who
+        don't have one yet.
+        """
+        state = self._activity_doc(user_id)
+        if state is not None:
+            return state.get("last_workout_at")
+        key = ("last_workout", user_id)
+        last = query_cache.get(key, MISSING)
+        if last is MISSING:
+            docs = list(self._last_workout_query(user_id).stream())
+            last = docs[0].to_dict().get("timestamp") if docs else None
+            query_cache.set(key, last)
+        return last
+
+    def get_daily_rollups(self, days: int = 7, user_id: str = DEFAULT_USER_ID) -> list[dict]:
+        """Get daily rollups for the last N calendar days, newest first.
+
+        Reads one small doc per uncached day in a single batched get,
+        regardless of how many entries were logged in the window.
+        """
+        day_keys = rollup_day_keys(days)
+        rollups = {key: query_cache.get(("rollup", user_id, key)) for key in day_keys}
+        missing = [key for key, rollup in rollups.items() if rollup is None]
+        if missing:
+            self._flush_pending()
+            snapshots = {
+                snapshot.id: snapshot
+                for snapshot in self.db.get_all([self._rollup_ref(user_id, key) for key in missing])
+            }
+            for key in missing:
+                rollups[key] = _rollup_from_snapshot(key, snapshots.get(key))
+                query_cache.set(("rollup", user_id, key), rollups[key])
+        return [rollups[key] for key in day_keys]
+
+    def aggregate_meals(self, days: int = 1, user_id: str = DEFAULT_USER_ID) -> dict:
+        """Meal count and calorie/macro totals via a Firestore aggregation query.
+
+        Nothing but the aggregate values leaves the server. If aggregation is
+        unavailable, streams only the numeric fields instead of full docs.
+        """
+        key = ("meal_totals", user_id, days)
+        totals = query_cache.get(key, MISSING)
+        if totals is MISSING:
+            self._flush_pending()
+            query = self._meals_query(user_id, days, None)
+            try:
+                totals = _meal_totals_from_aggregation(self._meal_totals_aggregation(query).get())
+            except AGGREGATION_ERRORS:
+                totals = meal_totals(doc.to_dict() for doc in query.select(MEAL_TOTAL_FIELDS).stream())
+            archived = self._archived(user_id, "meals", days)
+            if archived:
+                totals = _add_meal_totals(totals, meal_totals(archived))
+            query_cache.set(key, totals)
+        return totals
+
+    def count_workouts(self, days: int = 7, user_id: str = DEFAULT_USER_ID) -> int:
+        """Number of workouts in the past N days via a count aggregation."""
+        key = ("workout_count", user_id, days)
+        count = query_cache.get(key, MISSING)
+        if count is MISSING:
+            self._flush_pending()
+            query = self._workouts_query(user_id, days)
+            try:
+                count = int(_aggregation_values(query.count(alias="count").get()).get("count") or 0)
+            except AGGREGATION_ERRORS:
+                count = sum(1 for _ in query.select([]).stream())
+            count += len(self._archived(user_id, "workouts", days))
+            query_cache.set(key, count)
+        return count
+
+    def _archived(self, user_id: str, kind: str, days: int) -> list[dict]:
+        """Archived entries of ``kind`` from the past N days, in one batched get."""
+        refs = self._archive_refs(user_id, kind, days)
+        if not refs:
+            return []
+        since = _since(days)
+        return [
+            row
+            for snapshot in self.db.get_all(refs)
+            if snapshot.exists
+            for row in unpack_archive(kind, snapshot.to_dict(), since)
+        ]
+
+    def compact_logs(self, user_id: str = DEFAULT_USER_ID) -> dict:
+        """Fold entries older than LOG_COMPACTION_AGE_DAYS into monthly archives.
+
+        Works a page at a time; each page's archive updates and entry deletes
+        commit in one batch, so an interrupted run can simply be re-run.
+        Returns the number of entries compacted per kind.
+        """
+        self._flush_pending()
+        boundary = archive_boundary()
+        compacted = {}
+        for kind in ARCHIVE_COLUMNS:
+            compacted[kind] = 0
+            while True:
+                docs = list(self._cold_entries_query(user_id, kind, boundary).stream())
+                if not docs:
+                    break
+                by_month = {}
+                for doc in docs:
+                    entry = {"id": doc.id, **doc.to_dict()}
+                    by_month.setdefault(month_key(entry["timestamp"]), []).append(entry)
+                refs = {month: self._archive_ref(user_id, kind, month) for month in by_month}
+                existing = {
+                    snapshot.id: snapshot.to_dict()
+                    for snapshot in self.db.get_all(list(refs.values()))
+                    if snapshot.exists
+                }
+                batch = self.db.batch()
+                for month, entries in by_month.items():
+                    batch.set(refs[month], pack_entries(kind, month, entries, existing.get(archive_id(kind, month))))
+                for doc in docs:
+                    batch.delete(doc.reference)
+                batch.commit()
+                compacted[kind] += len(docs)
+                if len(docs) < COMPACTION_PAGE_SIZE:
+                    break
+        if any(compacted.values()):
+            query_cache.invalidate(
+                lambda key: key[0] in ("workouts", "meals", "meal_totals", "workout_count", "last_workout")
+                and key[1] == user_id
+            )
+        return compacted
+
+    def get_config(self, name: str) -> dict | None:
+        """Get a config document from the config collection."""
+        doc = self.db.collection("config").document(name).get()
+        return doc.to_dict() if doc.exists else None
+
+    def set_config(self, name: str, data: dict):
+        """Create or replace a config document."""
+        self.db.collection("config").document(name).set(data)
+
+    def watch_config(self, name: str, callback):
+        """Push config doc changes to ``callback`` via a snapshot listener."""
+        def on_snapshot(snapshots, changes, read_time):
+            for snapshot in snapshots:
+                callback(snapshot.to_dict() if snapshot.exists else None)
+
+        return self.db.collection("config").document(name).on_snapshot(on_snapshot)
+
+
+class AsyncFirestoreClient(_FirestoreSchema):
+    """Async twin of FirestoreClient backed by the Firestore AsyncClient.
+
+    Use this from request handlers and other coroutines so Firestore round
+    trips yield to the event loop instead of blocking it.
+    """
+
+    _instance = None
+    _initialized = False
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not AsyncFirestoreClient._initialized:
+            self._initialize_firebase()
+            AsyncFirestoreClient._initialized = True
+
+    def _initialize_firebase(self):
+        """Initialize Firebase Admin SDK."""
+        _initialize_app()
+        self.db = firestore_async.client()
+
+    async def _flush_pending(self):
+        """Make writes staged by the sync client's write-behind queue visible before reading."""
+        write_behind = FirestoreClient._instance.write_behind if FirestoreClient._initialized else None
+        if write_behind and write_behind.pending():
+            await asyncio.to_thread(write_behind.flush)
+
+    async def _log(self, user_id: str, kind: str, day_key: str, values: dict, writes: list[Write]):
+        """Commit a log and its activity update."""
+        key = ("activity", user_id)
+        cached = query_cache.get(key)
+        if not _needs_transaction(cached, kind, day_key):
+            activity, group = self._blind_log(user_id, cached, kind, day_key, values, writes)
+            batch = self.db.batch()
+            add_to_batch(batch, group)
+            await batch.commit()
+            query_cache.set(key, activity)
+            return
+
+        log = self._log_transaction(user_id, kind, day_key, values, writes)
+        activity_ref = self._activity_ref(user_id)
+
+        @async_transactional
+        async def run(transaction) -> dict:
+            return log(transaction, await activity_ref.get(transaction=transaction))
+
+        query_cache.set(key, await run(self.db.transaction()))
+
+    async def log_workout(
+        self,
+        workout_type: str,
+        duration_mins: int,
+        exercises: list[dict] | None = None,
+        notes: str | None = None,
+        raw_input: str | None = None,
+        user_id: str = DEFAULT_USER_ID,
+    ) -> str:
+        """Log a workout to Firestore and fold it into today's rollup.
+
+        With write-behind on, the log is staged in the sync client's queue
+        instead, so replies don't wait on the commit.
+        """
+        if _write_behind_enabled():
+            return await asyncio.to_thread(
+                FirestoreClient().log_workout, workout_type, duration_mins, exercises, notes, raw_input, user_id
+            )
+        day_key = local_today().isoformat()
+        entry_ref, writes = self._workout_writes(
+            user_id, day_key, workout_type, duration_mins, exercises, notes, raw_input
         )
-        return [{"id": doc.id, **doc.to_dict()} for doc in query.stream()]
+        await self._log(user_id, "workout", day_key, _workout_activity(duration_mins), writes)
+        _invalidate_workout_queries(user_id, day_key)
+        return entry_ref.id
 
-    def get_meals(self, days: int = 1) -> list[dict]:
-        """Get meals from the past N days."""
-        cutoff = datetime.now() - timedelta(days=days)
-        query = (
-            self.db.collection("logs")
-            .document("nutrition")
-            .collection("entries")
-            .where("timestamp", ">=", cutoff)
-            .order_by("timestamp", direction=firestore.Query.DESCENDING)
+    async def log_meal(
+        self,
+        meal_type: str,
+        calories: int,
+        protein: int,
+        carbs: int,
+        fat: int,
+        description: str,
+        raw_input: str | None = None,
+        user_id: str = DEFAULT_USER_ID,
+    ) -> str:
+        """Log a meal to Firestore and fold it into today's rollup.
+
+        With write-behind on, the log is staged in the sync client's queue
+        instead, so replies don't wait on the commit.
+        """
+        if _write_behind_enabled():
+            return await asyncio.to_thread(
+                FirestoreClient().log_meal, meal_type, calories, protein, carbs, fat, description, raw_input, user_id
+            )
+        day_key = local_today().isoformat()
+        entry_ref, writes = self._meal_writes(
+            user_id, day_key, meal_type, calories, protein, carbs, fat, description, raw_input
         )
-        return [{"id": doc.id, **doc.to_dict()} for doc in query.stream()]
+        await self._log(user_id, "meal", day_key, _meal_activity(calories, protein, carbs, fat), writes)
+        _invalidate_meal_queries(user_id, day_key)
+        return entry_ref.id
+
+    async def get_workouts(self, days: int = 7, user_id: str = DEFAULT_USER_ID) -> list[dict]:
+        """Get workouts from the past N days."""
+        key = ("workouts", user_id, days)
+        workouts = query_cache.get(key, MISSING)
+        if workouts is MISSING:
+            await self._flush_pending()
+            workouts = [{"id": doc.id, **doc.to_dict()} async for doc in self._workouts_query(user_id, days).stream()]
+            archived = await self._archived(user_id, "workouts", days)
+            if archived:
+                workouts = merge_entries(workouts, archived)
+            query_cache.set(key, workouts)
+        return workouts
+
+    async def get_meals(
+        self, days: int = 1, limit: int | None = None, user_id: str = DEFAULT_USER_ID
+    ) -> list[dict]:
+        """Get meals from the past N days, newest first."""
+        key = ("meals", user_id, days, limit)
+        meals = query_cache.get(key, MISSING)
+        if meals is MISSING:
+            await self._flush_pending()
+            meals = [{"id": doc.id, **doc.to_dict()} async for doc in self._meals_query(user_id, days, limit).stream()]
+            archived = await self._archived(user_id, "meals", days)
+            if archived:
+                meals = merge_entries(meals, archived, limit)
+            query_cache.set(key, meals)
+        return meals
+
+    async def _activity_doc(self, user_id: str) -> dict | None:
+        """The stored activity state: a cache hit or one point read."""
+        key = ("activity", user_id)
+        state = query_cache.get(key, MISSING)
+        if state is MISSING:
+            await self._flush_pending()
+            state = _activity_from_snapshot(await self._activity_ref(user_id).get())
+            query_cache.set(key, state)
+        return state
+
+    async def get_activity_state(self, user_id: str = DEFAULT_USER_ID) -> dict:
+        """Last workout/meal times, current streak and today's totals."""
+        state = await self._activity_doc(user_id)
+        if state is None:
+            return await self.rebuild_activity_state(user_id=user_id)
+        return current_activity(state, local_today().isoformat())
+
+    async def rebuild_activity_state(self, user_id: str = DEFAULT_USER_ID) -> dict:
+        """Recompute the activity doc from the daily rollups and newest entries, in one transaction."""
+        await self._flush_pending()
+        query_cache.invalidate(lambda key: key[0] == "rollup" and key[1] == user_id)
+        day_keys = rollup_day_keys(STREAK_LOOKBACK_DAYS)
+        activity_ref = self._activity_ref(user_id)
+
+        @async_transactional
+        async def rebuild(transaction) -> dict:
+            rollups = {
+                snapshot.id: snapshot
+                async for snapshot in self.db.get_all(
+                    [self._rollup_ref(user_id, key) for key in day_keys], transaction=transaction
+                )
+            }
+            state = self._rebuilt_state(
+                day_keys,
+                rollups,
+                [doc async for doc in self._last_workout_query(user_id).stream(transaction=transaction)],
+                [doc async for doc in self._last_meal_query(user_id).stream(transaction=transaction)],
+                await activity_ref.get(transaction=transaction),
+            )
+            transaction.set(activity_ref, state)
+            return state
+
+        state = await rebuild(self.db.transaction())
+        query_cache.set(("activity", user_id), state)
+        query_cache.set(("last_workout", user_id), state["last_workout_at"])
+        return current_activity(state, local_today().isoformat())
+
+    async def get_data_version(self, user_id: str = DEFAULT_USER_ID) -> str:
+        """The activity doc's log counter, from a point read after any staged logs land."""
+        await self._flush_pending()
+        state = _activity_from_snapshot(await self._activity_ref(user_id).get())
+        query_cache.set(("activity", user_id), state)
+        if state is None:
+            await self.rebuild_activity_state(user_id=user_id)
+            state = await self._activity_doc(user_id)
+        return str(state.get("data_version", 0))
 
-    def get_last_workout_date(self) -> datetime | None:
+    async def get_last_workout_date(self, user_id: str = DEFAULT_USER_ID) -> datetime | None:
         """Get the date of the most recent workout."""
-        query = (
-            self.db.collection("logs")
-            .document("workouts")
-            .collection("entries")
-            .order_by("timestamp", direction=firestore.Query.DESCENDING)
-            .limit(1)
-        )
-        docs = list(query.stream())
-        if docs:
-            return docs[0].to_dict().get("timestamp")
-        return None
+        state = await self._activity_doc(user_id)
+        if state is not None:
+            return state.get("last_workout_at")
+        key = ("last_workout", user_id)
+        last = query_cache.get(key, MISSING)
+        if last is MISSING:
+            docs = [doc async for doc in self._last_workout_query(user_id).stream()]
+            last = docs[0].to_dict().get("timestamp") if docs else None
+            query_cache.set(key, last)
+        return last
+
+    async def get_daily_rollups(self, days: int = 7, user_id: str = DEFAULT_USER_ID) -> list[dict]:
+        """Get daily rollups for the last N calendar days, newest first."""
+        day_keys = rollup_day_keys(days)
+        rollups = {key: query_cache.get(("rollup", user_id, key)) for key in day_keys}
+        missing = [key for key, rollup in rollups.items() if rollup is None]
+        if missing:
+            await self._flush_pending()
+            snapshots = {
+                snapshot.id: snapshot
+                async for snapshot in self.db.get_all([self._rollup_ref(user_id, key) for key in missing])
+            }
+            for key in missing:
+                rollups[key] = _rollup_from_snapshot(key, snapshots.get(key))
+                query_cache.set(("rollup", user_id, key), rollups[key])
+        return [rollups[key] for key in day_keys]
+
+    async def aggregate_meals(self, days: int = 1, user_id: str = DEFAULT_USER_ID) -> dict:
+        """Meal count and calorie/macro totals via a Firestore aggregation query."""
+        key = ("meal_totals", user_id, days)
+        totals = query_cache.get(key, MISSING)
+        if totals is MISSING:
+            await self._flush_pending()
+            query = self._meals_query(user_id, days, None)
+            try:
+                totals = _meal_totals_from_aggregation(await self._meal_totals_aggregation(query).get())
+            except AGGREGATION_ERRORS:
+                totals = meal_totals([doc.to_dict() async for doc in query.select(MEAL_TOTAL_FIELDS).stream()])
+            archived = await self._archived(user_id, "meals", days)
+            if archived:
+                totals = _add_meal_totals(totals, meal_totals(archived))
+            query_cache.set(key, totals)
+        return totals
+
+    async def count_workouts(self, days: int = 7, user_id: str = DEFAULT_USER_ID) -> int:
+        """Number of workouts in the past N days via a count aggregation."""
+        key = ("workout_count", user_id, days)
+        count = query_cache.get(key, MISSING)
+        if count is MISSING:
+            await self._flush_pending()
+            query = self._workouts_query(user_id, days)
+            try:
+                count = int(_aggregation_values(await query.count(alias="count").get()).get("count") or 0)
+            except AGGREGATION_ERRORS:
+                count = len([doc async for doc in query.select([]).stream()])
+            count += len(await self._archived(user_id, "workouts", days))
+            query_cache.set(key, count)
+        return count
+
+    async def _archived(self, user_id: str, kind: str, days: int) -> list[dict]:
+        """Archived entries of ``kind`` from the past N days, in one batched get."""
+        refs = self._archive_refs(user_id, kind, days)
+        if not refs:
+            return []
+        since = _since(days)
+        return [
+            row
+            async for snapshot in self.db.get_all(refs)
+            if snapshot.exists
+            for row in unpack_archive(kind, snapshot.to_dict(), since)
+        ]
+
+    async def get_config(self, name: str) -> dict | None:
+        """Get a config document from the config collection."""
+        doc = await self.db.collection("config").document(name).get()
+        return doc.to_dict() if doc.exists else None
+
+    async def set_config(self, name: str, data: dict):
+        """Create or replace a config document."""
+        await self.db.collection("config").document(name).set(data)
+
+
+def shutdown_storage():
+    """Flush pending Firestore writes; called on application shutdown."""
+    if FirestoreClient._initialized:
+        FirestoreClient().close()
@@ -0,0 +1,131 @@
+"""In-memory storage engine for tests and benchmarks."""
+import copy
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from src.storage.base import (
+    DEFAULT_USER_ID,
+    StorageBackend,
+    empty_rollup,
+    local_today,
+    rollup_day_keys,
+)
+
+
+class InMemoryStorage(StorageBackend):
+    """StorageBackend that keeps everything in process memory."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._workouts: dict[str, list[dict]] = {}
+        self._meals: dict[str, list[dict]] = {}
+        self._config: dict[str, dict] = {}
+
+    def _append(self, table: dict[str, list[dict]], user_id: str, entry: dict) -> str:
+        entry_id = uuid.uuid4().hex
+        with self._lock:
+            table.setdefault(user_id, []).append({
+                "id": entry_id,
+                "timestamp": datetime.now(timezone.utc),
+                "day": local_today().isoformat(),
+                **entry,
+            })
+        return entry_id
+
+    def _recent(self, table: dict[str, list[dict]], user_id: str, days: int) -> list[dict]:
+        cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+        with self._lock:
+            entries = [e for e in table.get(user_id, []) if e["timestamp"] >= cutoff]
+        return [
+            {k: v for k, v in copy.deepcopy(e).items() if k != "day"}
+            for e in sorted(entries, key=lambda e: e["timestamp"], reverse=True)
+        ]
+
+    def log_workout(
+        self,
+        workout_type: str,
+        duration_mins: int,
+        exercises: list[dict] | None = None,
+        notes: str | None = None,
+        raw_input: str | None = None,
+        user_id: str = DEFAULT_USER_ID,
+    ) -> str:
+        """Log a workout."""
+        return self._append(self._workouts, user_id, {
+            "type": workout_type,
+            "duration_mins": duration_mins or 0,
+            "exercises": exercises or [],
+            "notes": notes,
+            "raw_input": raw_input,
+        })
+
+    def log_meal(
+        self,
+        meal_type: str,
+        calories: int,
+        protein: int,
+        carbs: int,
+        fat: int,
+        description: str,
+        raw_input: str | None = None,
+        user_id: str = DEFAULT_USER_ID,
+    ) -> str:
+        """Log a meal."""
+        return self._append(self._meals, user_id, {
+            "meal_type": meal_type,
+            "calories": calories or 0,
+            "protein": protein or 0,
+            "carbs": carbs or 0,
+            "fat": fat or 0,
+            "description": description,
+            "raw_input": raw_input,
+        })
+
+    def get_workouts(self, days: int = 7, user_id: str = DEFAULT_USER_ID) -> list[dict]:
+        """Get workouts from the past N days, newest first."""
+        return self._recent(self._workouts, user_id, days)
+
+    def get_meals(
+        self, days: int = 1, limit: int | None = None, user_id: str = DEFAULT_USER_ID
+    ) -> list[dict]:
+        """Get meals from the past N days, newest first."""
+        meals = self._recent(self._meals, user_id, days)
+        return meals[:limit] if limit else meals
+
+    def get_last_workout_date(self, user_id: str = DEFAULT_USER_ID) -> datetime | None:
+        """Get the timestamp of the most recent workout."""
+        with self._lock:
+            timestamps = [e["timestamp"] for e in self._workouts.get(user_id, [])]
+        return max(timestamps, default=None)
+
+    def get_daily_rollups(self, days: int = 7, user_id: str = DEFAULT_USER_ID) -> list[dict]:
+        """Fold entries into daily totals for the last N calendar days."""
+        day_keys = rollup_day_keys(days)
+        rollups = {key: empty_rollup(key) for key in day_keys}
+        with self._lock:
+            for workout in self._workouts.get(user_id, []):
+                rollup = rollups.get(workout["day"])
+                if rollup is not None:
+                    rollup["workout_count"] += 1
+                    rollup["workout_minutes"] += workout["duration_mins"]
+                    if workout["type"] not in rollup["workout_types"]:
+                        rollup["workout_types"].append(workout["type"])
+            for meal in self._meals.get(user_id, []):
+                rollup = rollups.get(meal["day"])
+                if rollup is not None:
+                    rollup["meal_count"] += 1
+                    for field in ("calories", "protein", "carbs", "fat"):
+                        rollup[field] += meal[field]
+        return [rollups[key] for key in day_keys]
+
+    def get_config(self, name: str) -> dict | None:
+        """Get a config document."""
+        with self._lock:
+            config = self._config.get(name)
+        return copy.deepcopy(config) if config is not None else None
+
+    def set_config(self, name: str, data: dict):
+        """Create or replace a config document."""
+        with self._lock:
+            self._config[name] = copy.deepcopy(data)
@@ -0,0 +1,190 @@
+"""Process-wide, connection-pooled Mem0 clients.
+
+Building a Mem0 client opens a new HTTP connection pool and makes a ping
+request to validate the API key, so MemoryWrapper instances share one
+client per process instead of building their own. The sync client serves
+threads (chat(), the memory persister, index syncs); the async client
+serves coroutines and is rebuilt when used from a different event loop,
+since its connections belong to the loop that opened them.
+
+``MEM0_POOL_SIZE`` caps the connections each client keeps open. New
+connections versus requests are counted from httpx's connection tracing and
+reported under ``mem0_pool`` at ``/metrics``.
+"""
+import asyncio
+import logging
+import os
+import threading
+
+import httpx
+from mem0 import AsyncMemoryClient, MemoryClient
+
+from src import metrics
+
+logger = logging.getLogger(__name__)
+
+_CONNECTED = "connection.connect_tcp.complete"
+
+
+class PoolStats:
+    """Clients built, requests sent and connections opened, per client kind."""
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._kinds = {kind: {"clients": 0, "requests": 0, "connections": 0} for kind in ("sync", "async")}
+
+    def record_client(self, kind: str):
+        self._kinds[kind]["clients"] += 1
+
+    def record_request(self, kind: str):
+        self._kinds[kind]["requests"] += 1
+
+    def record_connection(self, kind: str):
+        self._kinds[kind]["connections"] += 1
+
+    def stats(self) -> dict:
+        out = {}
+        for kind, counts in self._kinds.items():
+            reused = max(counts["requests"] - counts["connections"], 0)
+            out[kind] = {
+                **counts,
+                "reused": reused,
+                "reuse_ratio": reused / counts["requests"] if counts["requests"] else 0.0,
+            }
+        return out
+
+
+class Mem0Pool:
+    """Lazily built Mem0 clients shared by the whole process."""
+
+    def __init__(self, pool_size: int = 10, timeout: float = 30.0):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.pool_stats = PoolStats()
+        self._lock = threading.Lock()
+        self._client: MemoryClient | None = None
+        self._client_key: tuple | None = None
+        self._async_client: AsyncMemoryClient | None = None
+        self._async_key: tuple | None = None
+
+    @staticmethod
+    def settings() -> tuple[str, str | None] | None:
+        """(api key, host) from the environment, or None when Mem0 isn't configured."""
+        api_key = os.getenv("MEM0_API_KEY")
+        return (api_key, os.getenv("MEM0_HOST") or None) if api_key else None
+
+    def _limits(self) -> httpx.Limits:
+        return httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size)
+
+    def _http_client(self) -> httpx.Client:
+        def trace(name: str, info: dict):
+            if name == _CONNECTED:
+                self.pool_stats.record_connection("sync")
+
+        def on_request(request: httpx.Request):
+            self.pool_stats.record_request("sync")
+            request.extensions["trace"] = trace
+
+        return httpx.Client(limits=self._limits(), timeout=self.timeout, event_hooks={"request": [on_request]})
+
+    def _async_http_client(self) -> httpx.AsyncClient:
+        async def trace(name: str, info: dict):
+            if name == _CONNECTED:
+                self.pool_stats.record_connection("async")
+
+        async def on_request(request: httpx.Request):
+            self.pool_stats.record_request("async")
+            request.extensions["trace"] = trace
+
+        return httpx.AsyncClient(limits=self._limits(), timeout=self.timeout, event_hooks={"request": [on_request]})
+
+    def client(self) -> MemoryClient | None:
+        """The shared sync client, or None without MEM0_API_KEY."""
+        settings = self.settings()
+        if settings is None:
+            return None
+        if self._client is not None and self._client_key == settings:
+            return self._client
+        with self._lock:
+            if self._client is None or self._client_key != settings:
+                api_key, host = settings
+                http_client = self._http_client()
+                try:
+                    client = MemoryClient(api_key=api_key, host=host, client=http_client)
+                except Exception:
+                    http_client.close()
+                    raise
+                self._close_sync()
+                self._client, self._client_key = client, settings
+                self.pool_stats.record_client("sync")
+        return self._client
+
+    async def async_client(self) -> AsyncMemoryClient | None:
+        """The shared async client for the running loop, or None without MEM0_API_KEY."""
+        settings = self.settings()
+        if settings is None:
+            return None
+        key = (*settings, asyncio.get_running_loop())
+        if self._async_client is not None and self._async_key == key:
+            return self._async_client
+
+        api_key, host = settings
+        http_client = self._async_http_client()
+        try:
+            # The constructor validates the API key with a blocking request
+            client = await asyncio.to_thread(AsyncMemoryClient, api_key=api_key, host=host, client=http_client)
+        except Exception:
+            await http_client.aclose()
+            raise
+        if self._async_key == key:
+            # Another coroutine built one while this one waited
+            await http_client.aclose()
+            return self._async_client
+        if self._async_key is not None and self._async_key[2] is key[2]:
+            await self._aclose_async()
+        self._async_client, self._async_key = client, key
+        self.pool_stats.record_client("async")
+        return client
+
+    def _close_sync(self):
+        if self._client is not None:
+            try:
+                self._client.client.close()
+            except Exception:
+                logger.exception("Failed to close Mem0 client")
+        self._client = self._client_key = None
+
+    async def _aclose_async(self):
+        if self._async_client is not None:
+            try:
+                await self._async_client.async_client.aclose()
+            except Exception:
+                logger.exception("Failed to close async Mem0 client")
+        self._async_client = self._async_key = None
+
+    async def aclose(self):
+        """Close both clients' connections; called on application shutdown."""
+        with self._lock:
+            self._close_sync()
+        if self._async_key is not None and self._async_key[2] is asyncio.get_running_loop():
+            await self._aclose_async()
+        self._async_client = self._async_key = None
+
+    def clear(self):
+        """Forget the clients without closing them (tests)."""
+        with self._lock:
+            self._client = self._client_key = None
+            self._async_client = self._async_key = None
+        self.pool_stats.clear()
+
+    def stats(self) -> dict:
+        return {"pool_size": self.pool_size, **self.pool_stats.stats()}
+
+
+mem0_pool = Mem0Pool(
+    pool_size=int(os.getenv("MEM0_POOL_SIZE", "10")),
+    timeout=float(os.getenv("MEM0_TIMEOUT", "30")),
+)
+metrics.register("mem0_pool", mem0_pool.stats)
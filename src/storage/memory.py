@@ -1,57 +1,137 @@
 """Mem0 memory wrapper for semantic memory."""
-import os
+import asyncio
+from dataclasses import dataclass
 from typing import Any
 
-from mem0 import MemoryClient
+from src.storage.mem0_client import mem0_pool
+from src.storage.memory_cache import memory_search_cache
+from src.storage.memory_index import memory_indexes
+
+
+@dataclass(frozen=True)
+class ScoredMemory:
+    """A memory with its search relevance (None when Mem0 didn't score it)."""
+
+    text: str
+    score: float | None = None
+
+
+def _scored(results: Any) -> list[ScoredMemory]:
+    if not results:
+        return []
+
+    # Handle both list response (new API) and dict response (old API)
+    if isinstance(results, list):
+        items = [mem for mem in results if isinstance(mem, dict)]
+    elif isinstance(results, dict) and results.get("results"):
+        items = results["results"]
+    else:
+        return []
+    return [ScoredMemory(mem.get("memory", ""), mem.get("score")) for mem in items]
 
 
 class MemoryWrapper:
-    """Wrapper around Mem0 for agent memory."""
+    """Wrapper around Mem0 for agent memory.
+
+    Wrappers are cheap: they share the process-wide pooled Mem0 clients, and
+    the sync client is only built on first use. Coroutines search with the
+    ``*_async`` methods.
+    """
 
     def __init__(self, user_id: str):
         self.user_id = user_id
-        api_key = os.getenv("MEM0_API_KEY")
-        if api_key:
-            self.client = MemoryClient(api_key=api_key)
-        else:
-            # For testing without API key
-            self.client = None
+
+    @property
+    def client(self):
+        """The shared sync Mem0 client, or None without MEM0_API_KEY (e.g. in tests)."""
+        return mem0_pool.client()
 
     def search(self, query: str, limit: int = 10) -> list[str]:
         """Search for relevant memories."""
-        if not self.client:
+        return [mem.text for mem in self.search_scored(query, limit=limit)]
+
+    def search_scored(self, query: str, limit: int = 10) -> list[ScoredMemory]:
+        """Search for relevant memories, keeping their relevance scores.
+
+        Answered from the search cache, then the local memory index when it
+        has synced, else by Mem0.
+        """
+        client = self.client
+        if not client:
             return []
 
-        results = self.client.search(query, user_id=self.user_id, limit=limit)
-        if not results:
+        key = memory_search_cache.key_for(self.user_id, query, limit)
+        cached = memory_search_cache.get(key)
+        if cached is not None:
+            return cached
+
+        found = memory_indexes.search(client, self.user_id, query, limit) if memory_indexes.enabled else None
+        if found is not None:
+            results = [ScoredMemory(text, score) for text, score in found]
+        else:
+            results = _scored(client.search(query, user_id=self.user_id, limit=limit))
+        memory_search_cache.set(key, results)
+        return results
+
+    async def search_async(self, query: str, limit: int = 10) -> list[str]:
+        """Async version of search."""
+        return [mem.text for mem in await self.search_scored_async(query, limit=limit)]
+
+    async def search_scored_async(self, query: str, limit: int = 10) -> list[ScoredMemory]:
+        """Async version of search_scored.
+
+        Never waits on an index sync: until the index is ready it syncs in
+        the background and the search goes to Mem0 on the async client. The
+        index lookup loads from disk and embeds the query, so it runs in a
+        worker thread.
+        """
+        if mem0_pool.settings() is None:
             return []
 
-        # Handle both list response (new API) and dict response (old API)
-        if isinstance(results, list):
-            return [mem.get("memory", "") for mem in results if isinstance(mem, dict)]
-        elif isinstance(results, dict) and results.get("results"):
-            return [mem["memory"] for mem in results["results"]]
-        return []
+        key = memory_search_cache.key_for(self.user_id, query, limit)
+        cached = memory_search_cache.get(key)
+        if cached is not None:
+            return cached
+
+        found = None
+        if memory_indexes.enabled:
+            found = await asyncio.to_thread(
+                memory_indexes.search, None, self.user_id, query, limit, wait_for_sync=False
+            )
+        if found is not None:
+            results = [ScoredMemory(text, score) for text, score in found]
+        else:
+            client = await mem0_pool.async_client()
+            results = _scored(await client.search(query, user_id=self.user_id, limit=limit))
+        memory_search_cache.set(key, results)
+        return results
 
     def add(self, content: str, metadata: dict[str, Any] | None = None):
         """Add a memory."""
-        if not self.client:
+        client = self.client
+        if not client:
             return
 
-        self.client.add(
+        client.add(
             [{"role": "user", "content": content}],
             user_id=self.user_id,
             metadata=metadata,
         )
+        memory_indexes.mark_stale(self.user_id)
+        memory_search_cache.bump(self.user_id)
 
     def add_conversation(self, messages: list[dict], metadata: dict[str, Any] | None = None):
         """Add a full conversation to memory."""
-        if not self.client:
+        client = self.client
+        if not client:
             return
 
-        self.client.add(messages, user_id=self.user_id, metadata=metadata)
+        client.add(messages, user_id=self.user_id, metadata=metadata)
+        memory_indexes.mark_stale(self.user_id)
+        memory_search_cache.bump(self.user_id)
 
-    def format_memories(self, memories: list[str]) -> str:
+    @staticmethod
+    def format_memories(memories: list[str]) -> str:
         """Format memories for injection into prompts."""
         if not memories:
             return "No relevant memories."
@@ -0,0 +1,78 @@
+"""Cache of memory search results.
+
+Check-ins, calls and triggers search with the same few queries ("recent
+activity and mood", ...) again and again, usually with no new memories in
+between. Results are cached under (user, normalized query, limit, memory
+version). The memory version is a per-user counter bumped by every write
+through MemoryWrapper and by every index sync that changes the user's
+memories, so a change invalidates the user's cached searches without
+touching the cache.
+
+Versions live in this process only; memories written by another instance
+(or extracted by Mem0 after the write returned) show up when the TTL runs
+out or the memory index syncs them.
+"""
+import os
+import re
+import threading
+from collections import defaultdict
+from typing import Hashable
+
+from src import metrics
+from src.storage.cache import MISSING, TTLCache
+
+_SPACE = re.compile(r"\s+")
+
+
+def normalize_query(query: str) -> str:
+    """Case- and whitespace-insensitive form of a search query."""
+    return _SPACE.sub(" ", query.lower()).strip(" \t\n?!.,")
+
+
+class MemorySearchCache:
+    """Version-keyed TTL + LRU cache of memory search results."""
+
+    def __init__(self, maxsize: int = 256, ttl: float = 300.0):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self._versions: defaultdict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self._stats = {"bumps": 0}
+
+    @property
+    def enabled(self) -> bool:
+        return self._cache.enabled
+
+    def version(self, user_id: str) -> int:
+        return self._versions[user_id]
+
+    def bump(self, user_id: str):
+        """Invalidate the user's cached searches after their memories changed."""
+        with self._lock:
+            self._versions[user_id] += 1
+            self._stats["bumps"] += 1
+
+    def key_for(self, user_id: str, query: str, limit: int) -> Hashable:
+        return (user_id, normalize_query(query), limit, self._versions[user_id])
+
+    def get(self, key: Hashable) -> list | None:
+        found = self._cache.get(key, MISSING)
+        return None if found is MISSING else list(found)
+
+    def set(self, key: Hashable, results: list):
+        self._cache.set(key, tuple(results))
+
+    def clear(self):
+        self._cache.clear()
+        with self._lock:
+            self._versions.clear()
+            self._stats = {key: 0 for key in self._stats}
+
+    def stats(self) -> dict:
+        return {**self._cache.stats(), **self._stats}
+
+
+memory_search_cache = MemorySearchCache(
+    maxsize=int(os.getenv("MEMORY_SEARCH_CACHE_SIZE", "256")),
+    ttl=float(os.getenv("MEMORY_SEARCH_CACHE_TTL", "300")),
+)
+metrics.register("memory_search_cache", memory_search_cache.stats)
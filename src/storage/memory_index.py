@@ -0,0 +1,430 @@
+"""Local per-user vector index over Mem0 memories.
+
+Memory search runs on every SMS, check-in, trigger and voice call, and one
+user's memory set is small. Each user's memories are embedded into a NumPy
+matrix, and search() answers with a cosine top-k over it instead of a remote
+Mem0 search. Mem0 stays the source of truth: memories are written there,
+and the index syncs from it.
+
+Syncing:
+
+- The first search for a user (or one after a failed start) does a full
+  sync, inline for sync callers and in the background for async ones.
+  Until one succeeds, MemoryWrapper falls back to Mem0 search.
+- After that, searches answer from the index and, once it is older than
+  ``sync_interval``, kick off a background sync. Incremental syncs fetch
+  memories updated since the newest one seen; every ``full_sync_interval``
+  a full sync also drops memories deleted in Mem0.
+- Writes through MemoryWrapper mark the user's index stale, so the next
+  search starts a sync.
+
+Indexes are saved to ``MEMORY_INDEX_DIR`` (one .npz per user) when it is set,
+so a restart serves searches from disk while it catches up.
+
+The index is opt-in (``MEMORY_INDEX_ENABLED=true``); without it searches go
+to Mem0. The embedder is pluggable: ``MEMORY_EMBEDDER=openai`` (default)
+uses the OpenAI embeddings API, at one embedding call per search;
+``hashing`` is a deterministic offline feature-hashing embedder for tests
+and benchmarks. It only matches words, not meaning, so don't use it in
+production.
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Protocol
+
+import numpy as np
+
+from src import metrics
+from src.storage.mem0_client import mem0_pool
+from src.storage.memory_cache import memory_search_cache
+
+logger = logging.getLogger(__name__)
+
+
+class Embedder(Protocol):
+    """Turns texts into unit-length vectors of a fixed size."""
+
+    name: str
+    dim: int
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        """A (len(texts), dim) float32 matrix of unit-length rows."""
+        ...
+
+
+_WORD = re.compile(r"[a-z0-9]+")
+_SUFFIXES = ("ing", "ed", "es", "s")
+STOPWORDS = frozenset(
+    "a an and are as at be but by do does for from had has have he her his how i i'm if in is it its "
+    "me my of on or our she so that the their them they this to user was we were what when which who "
+    "will with you your".split()
+)
+
+
+def _stem(word: str) -> str:
+    for suffix in _SUFFIXES:
+        if len(word) > len(suffix) + 2 and word.endswith(suffix):
+            return word[: -len(suffix)]
+    return word
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+class HashingEmbedder:
+    """Deterministic offline embedder: hashed word stems and character trigrams.
+
+    Lexical rather than semantic, so "prefers morning runs" matches "morning
+    workouts" on "morning" but not "run" on "jog". Good enough for a small,
+    personal memory set, and free of model calls.
+    """
+
+    name = "hashing"
+
+    def __init__(self, dim: int = 512, trigram_weight: float = 0.5):
+        self.dim = dim
+        self.trigram_weight = trigram_weight
+
+    def _features(self, text: str) -> list[tuple[str, float]]:
+        words = [_stem(w) for w in _WORD.findall(text.lower()) if w not in STOPWORDS]
+        features = [(f"w:{w}", 1.0) for w in words]
+        for w in words:
+            padded = f"#{w}#"
+            features.extend((f"c:{padded[i:i + 3]}", self.trigram_weight) for i in range(len(padded) - 2))
+        return features
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        matrix = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for feature, weight in self._features(text):
+                digest = hashlib.blake2b(feature.encode(), digest_size=8).digest()
+                bucket = int.from_bytes(digest[:4], "little") % self.dim
+                sign = 1.0 if digest[4] & 1 else -1.0
+                matrix[row, bucket] += sign * weight
+        return _normalize_rows(matrix)
+
+
+class OpenAIEmbedder:
+    """Embeddings from the OpenAI API."""
+
+    def __init__(self, model: str = "text-embedding-3-small", dim: int = 512):
+        from openai import OpenAI
+
+        self.name = f"openai:{model}:{dim}"
+        self.model = model
+        self.dim = dim
+        self._client = OpenAI()
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        response = self._client.embeddings.create(model=self.model, input=texts, dimensions=self.dim)
+        matrix = np.array([item.embedding for item in response.data], dtype=np.float32)
+        return _normalize_rows(matrix)
+
+
+def get_embedder() -> Embedder:
+    """The embedder named by MEMORY_EMBEDDER."""
+    kind = os.getenv("MEMORY_EMBEDDER", "openai").lower()
+    if kind == "openai":
+        return OpenAIEmbedder(model=os.getenv("MEMORY_EMBEDDING_MODEL", "text-embedding-3-small"))
+    if kind != "hashing":
+        raise ValueError(f"Unknown MEMORY_EMBEDDER: {kind}")
+    return HashingEmbedder()
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    ids: tuple[str, ...] = ()
+    texts: tuple[str, ...] = ()
+    vectors: np.ndarray = field(default_factory=lambda: np.zeros((0, 0), dtype=np.float32))
+
+
+class MemoryIndex:
+    """One user's memories and their embeddings.
+
+    Searches read an immutable snapshot, so they never wait on a sync;
+    upsert() and retain() build a new snapshot and swap it in.
+    """
+
+    def __init__(self, embedder: Embedder):
+        self.embedder = embedder
+        self.cursor: str | None = None  # newest updated_at seen
+        self._snapshot = _Snapshot(vectors=np.zeros((0, embedder.dim), dtype=np.float32))
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._snapshot.ids)
+
+    @property
+    def ids(self) -> tuple[str, ...]:
+        return self._snapshot.ids
+
+    def search(self, query: str, limit: int = 10) -> list[tuple[str, float]]:
+        """(text, cosine similarity) of the ``limit`` closest memories, best first."""
+        snapshot = self._snapshot
+        count = len(snapshot.ids)
+        if not count or limit <= 0 or not query.strip():
+            return []
+        scores = snapshot.vectors @ self.embedder.embed([query])[0]
+        k = min(limit, count)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(snapshot.texts[i], float(scores[i])) for i in top]
+
+    def upsert(self, memories: list[dict]) -> int:
+        """Add or replace memories given as {"id", "memory", "updated_at"} dicts; returns how many changed."""
+        memories = [m for m in memories if m.get("id") and m.get("memory")]
+        if not memories:
+            return 0
+        with self._lock:
+            current = self._snapshot
+            stamps = [str(m["updated_at"]) for m in memories if m.get("updated_at")]
+            if stamps:
+                self.cursor = max([self.cursor or "", *stamps])
+            texts_by_id = dict(zip(current.ids, current.texts))
+            incoming = {str(m["id"]): m for m in memories if texts_by_id.get(str(m["id"])) != m["memory"]}
+            if not incoming:
+                return 0
+            keep = [i for i, memory_id in enumerate(current.ids) if memory_id not in incoming]
+            new_ids = list(incoming)
+            texts = [incoming[memory_id]["memory"] for memory_id in new_ids]
+            self._snapshot = _Snapshot(
+                ids=tuple(current.ids[i] for i in keep) + tuple(new_ids),
+                texts=tuple(current.texts[i] for i in keep) + tuple(texts),
+                vectors=np.vstack([current.vectors[keep], self.embedder.embed(texts)]),
+            )
+            return len(incoming)
+
+    def retain(self, ids: set[str]) -> int:
+        """Drop every memory whose id isn't in ``ids``; returns how many were dropped."""
+        with self._lock:
+            current = self._snapshot
+            keep = [i for i, memory_id in enumerate(current.ids) if memory_id in ids]
+            if len(keep) == len(current.ids):
+                return 0
+            self._snapshot = _Snapshot(
+                ids=tuple(current.ids[i] for i in keep),
+                texts=tuple(current.texts[i] for i in keep),
+                vectors=current.vectors[keep],
+            )
+            return len(current.ids) - len(keep)
+
+    def save(self, path: Path):
+        snapshot = self._snapshot
+        meta = {"embedder": self.embedder.name, "dim": self.embedder.dim, "cursor": self.cursor,
+                "ids": list(snapshot.ids), "texts": list(snapshot.texts)}
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp.npz")
+        np.savez(tmp, vectors=snapshot.vectors, meta=np.array(json.dumps(meta)))
+        tmp.replace(path)
+
+    @classmethod
+    def load(cls, path: Path, embedder: Embedder) -> "MemoryIndex | None":
+        """The index saved at ``path``, or None if missing or built by another embedder."""
+        try:
+            with np.load(path) as data:
+                meta = json.loads(str(data["meta"]))
+                vectors = data["vectors"].astype(np.float32)
+        except (OSError, ValueError, KeyError):
+            return None
+        if meta.get("embedder") != embedder.name or meta.get("dim") != embedder.dim:
+            return None
+        index = cls(embedder)
+        index.cursor = meta.get("cursor")
+        index._snapshot = _Snapshot(tuple(meta["ids"]), tuple(meta["texts"]), vectors)
+        return index
+
+
+def fetch_memories(client: Any, user_id: str, since: str | None = None, page_size: int = 200) -> list[dict]:
+    """All of a user's memories in Mem0, or those updated at or after ``since``."""
+    filters: dict = {"user_id": user_id}
+    if since:
+        filters = {"AND": [{"user_id": user_id}, {"updated_at": {"gte": since}}]}
+    memories: list[dict] = []
+    page = 1
+    while True:
+        response = client.get_all(filters=filters, page=page, page_size=page_size)
+        if isinstance(response, list):
+            return memories + [m for m in response if isinstance(m, dict)]
+        if not isinstance(response, dict) or not isinstance(response.get("results"), list):
+            raise ValueError(f"Unexpected Mem0 get_all response: {type(response).__name__}")
+        memories.extend(m for m in response["results"] if isinstance(m, dict))
+        if not response.get("next") or not response["results"]:
+            return memories
+        page += 1
+
+
+@dataclass
+class _UserIndex:
+    index: MemoryIndex
+    ready: bool = False  # has served data from a sync or from disk
+    synced_at: float = 0.0
+    full_synced_at: float = 0.0
+    failed_at: float | None = None
+    syncing: bool = False
+
+
+class MemoryIndexes:
+    """Per-user memory indexes, synced from Mem0."""
+
+    def __init__(
+        self,
+        directory: str | None = None,
+        sync_interval: float = 60.0,
+        full_sync_interval: float = 3600.0,
+        retry_interval: float = 30.0,
+        enabled: bool = False,
+    ):
+        self.directory = Path(directory) if directory else None
+        self.sync_interval = sync_interval
+        self.full_sync_interval = full_sync_interval
+        self.retry_interval = retry_interval
+        self.enabled = enabled
+        self._embedder: Embedder | None = None
+        self._users: dict[str, _UserIndex] = {}
+        self._lock = threading.Lock()
+        self._stats = {"searches": 0, "fallbacks": 0, "syncs": 0, "full_syncs": 0, "sync_errors": 0,
+                       "synced_memories": 0, "search_us_total": 0.0}
+
+    @property
+    def embedder(self) -> Embedder:
+        if self._embedder is None:
+            self._embedder = get_embedder()
+        return self._embedder
+
+    def _path(self, user_id: str) -> Path | None:
+        return self.directory / f"{user_id}.npz" if self.directory else None
+
+    def _entry(self, user_id: str) -> _UserIndex:
+        with self._lock:
+            entry = self._users.get(user_id)
+            if entry is None:
+                path = self._path(user_id)
+                index = MemoryIndex.load(path, self.embedder) if path else None
+                entry = _UserIndex(index or MemoryIndex(self.embedder), ready=index is not None)
+                self._users[user_id] = entry
+            return entry
+
+    def search(
+        self, client: Any, user_id: str, query: str, limit: int = 10, wait_for_sync: bool = True,
+    ) -> list[tuple[str, float]] | None:
+        """Top-k memories from the local index, or None if it can't answer yet.
+
+        ``client`` is the sync Mem0 client to sync with (the shared one if
+        None). With ``wait_for_sync=False`` a first sync runs in the
+        background instead of inline.
+        """
+        entry = self._entry(user_id)
+        now = time.monotonic()
+        if not entry.ready:
+            if entry.failed_at is not None and now - entry.failed_at < self.retry_interval:
+                self._stats["fallbacks"] += 1
+                return None
+            if not wait_for_sync:
+                self._sync_in_background(client, user_id)
+                self._stats["fallbacks"] += 1
+                return None
+            if not self.sync(client, user_id, full=True):
+                self._stats["fallbacks"] += 1
+                return None
+        elif now - entry.synced_at >= self.sync_interval:
+            self._sync_in_background(client, user_id)
+
+        start = time.perf_counter()
+        found = entry.index.search(query, limit)
+        self._stats["searches"] += 1
+        self._stats["search_us_total"] += (time.perf_counter() - start) * 1e6
+        return found
+
+    def sync(self, client: Any, user_id: str, full: bool = False) -> bool:
+        """Pull new and changed memories from Mem0; a full sync also drops deleted ones."""
+        entry = self._entry(user_id)
+        now = time.monotonic()
+        full = full or not entry.ready or now - entry.full_synced_at >= self.full_sync_interval
+        try:
+            client = client if client is not None else mem0_pool.client()
+            if client is None:
+                raise ValueError("Mem0 is not configured")
+            memories = fetch_memories(client, user_id, since=None if full else entry.index.cursor)
+            changed = entry.index.upsert(memories)
+            if full:
+                changed += entry.index.retain({str(m["id"]) for m in memories if m.get("id")})
+        except Exception:
+            entry.failed_at = now
+            self._stats["sync_errors"] += 1
+            logger.exception("Memory index sync failed for %s", user_id)
+            return False
+
+        if changed:
+            memory_search_cache.bump(user_id)
+        entry.ready = True
+        entry.failed_at = None
+        entry.synced_at = now
+        if full:
+            entry.full_synced_at = now
+            self._stats["full_syncs"] += 1
+        self._stats["syncs"] += 1
+        self._stats["synced_memories"] += len(memories)
+        path = self._path(user_id)
+        if path:
+            try:
+                entry.index.save(path)
+            except OSError:
+                logger.exception("Failed to save memory index for %s", user_id)
+        return True
+
+    def _sync_in_background(self, client: Any, user_id: str):
+        entry = self._entry(user_id)
+        with self._lock:
+            if entry.syncing:
+                return
+            entry.syncing = True
+
+        def run():
+            try:
+                self.sync(client, user_id)
+            finally:
+                entry.syncing = False
+
+        threading.Thread(target=run, name=f"memory-index-sync-{user_id}", daemon=True).start()
+
+    def mark_stale(self, user_id: str):
+        """Sync the user's index on its next search (after a write to Mem0)."""
+        entry = self._users.get(user_id)
+        if entry is not None:
+            entry.synced_at = 0.0
+
+    def clear(self):
+        with self._lock:
+            self._users.clear()
+            self._embedder = None
+        for name in self._stats:
+            self._stats[name] = 0
+
+    def stats(self) -> dict:
+        searches = self._stats["searches"]
+        return {
+            **{name: value for name, value in self._stats.items() if name != "search_us_total"},
+            "users": len(self._users),
+            "memories": sum(len(entry.index) for entry in self._users.values()),
+            "avg_search_us": self._stats["search_us_total"] / searches if searches else 0.0,
+        }
+
+
+memory_indexes = MemoryIndexes(
+    directory=os.getenv("MEMORY_INDEX_DIR") or None,
+    sync_interval=float(os.getenv("MEMORY_INDEX_SYNC_INTERVAL", "60")),
+    full_sync_interval=float(os.getenv("MEMORY_INDEX_FULL_SYNC_INTERVAL", "3600")),
+    enabled=os.getenv("MEMORY_INDEX_ENABLED", "false").lower() in ("1", "true", "yes"),
+)
+metrics.register("memory_index", memory_indexes.stats)
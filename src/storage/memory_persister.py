@@ -0,0 +1,168 @@
+"""Background persistence of conversation turns to Mem0."""
+import asyncio
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Any
+
+from src import metrics
+from src.storage.memory import MemoryWrapper
+
+logger = logging.getLogger(__name__)
+
+# One conversation turn: (messages, metadata)
+Turn = tuple[list[dict], dict[str, Any] | None]
+
+
+class MemoryPersister:
+    """Write conversation turns to Mem0 off the reply path.
+
+    Runs as an asyncio task for the lifetime of the app. Turns are queued per
+    user and written in batches: consecutive turns with the same metadata go
+    to Mem0 as one add() call. Failed writes are retried with exponential
+    backoff, and stop() drains whatever is still queued. When the persister
+    isn't running (scripts, tests, the sync chat path outside the app, or
+    after stop()), persist() writes right away: inline on a plain thread, or
+    in a worker thread when called from an event loop, so the loop never
+    waits on Mem0.
+    """
+
+    def __init__(
+        self,
+        batch_size: int = 20,
+        flush_interval: float = 0.5,
+        max_retries: int = 3,
+        retry_backoff: float = 0.5,
+        drain_timeout: float = 10.0,
+    ):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        self.drain_timeout = drain_timeout
+
+        self._pending: dict[str, list[Turn]] = defaultdict(list)
+        self._lock = threading.Lock()
+        self._memories: dict[str, MemoryWrapper] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._wake: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._direct_writes: set[asyncio.Task] = set()
+        self._closing = False
+        # queued/written/failed count messages; batches count Mem0 add() calls
+        self._stats = {"queued": 0, "written": 0, "batches": 0, "retries": 0, "failed": 0}
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._closing
+
+    async def start(self):
+        """Start the background worker on the running event loop."""
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        self._closing = False
+        self._task = asyncio.create_task(self._run(), name="memory-persister")
+
+    async def stop(self):
+        """Write everything still queued, then stop the worker."""
+        if self._task is None:
+            return
+        self._closing = True
+        self._wake.set()
+        try:
+            await asyncio.wait_for(self._drain(), timeout=self.drain_timeout)
+        except asyncio.TimeoutError:
+            logger.error("Gave up draining %d queued memory turns on shutdown", self.pending())
+        self._task = None
+
+    async def _drain(self):
+        await self._task
+        await self.flush()
+
+    def persist(self, user_id: str, messages: list[dict], metadata: dict[str, Any] | None = None):
+        """Queue a conversation turn for ``user_id``; safe to call from any thread."""
+        if not self.running:
+            self._write_now(user_id, messages, metadata)
+            return
+        with self._lock:
+            self._pending[user_id].append((messages, metadata))
+            self._stats["queued"] += len(messages)
+            full = sum(len(turns) for turns in self._pending.values()) >= self.batch_size
+        if full:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def _write_now(self, user_id: str, messages: list[dict], metadata: dict[str, Any] | None):
+        """Write a turn without the worker, off the event loop if there is one."""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self._write(user_id, messages, metadata)
+            return
+        task = loop.create_task(asyncio.to_thread(self._write, user_id, messages, metadata))
+        self._direct_writes.add(task)
+        task.add_done_callback(self._direct_writes.discard)
+
+    def pending(self) -> int:
+        """Number of queued turns."""
+        with self._lock:
+            return sum(len(turns) for turns in self._pending.values())
+
+    async def _run(self):
+        while not self._closing:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def flush(self):
+        """Write all queued turns, one batch per user, concurrently.
+
+        Also waits for turns persist() handed straight to a worker thread.
+        """
+        with self._lock:
+            batches, self._pending = self._pending, defaultdict(list)
+        await asyncio.gather(
+            *(asyncio.to_thread(self._write_turns, user_id, turns) for user_id, turns in batches.items()),
+            *list(self._direct_writes),
+        )
+
+    def _write_turns(self, user_id: str, turns: list[Turn]):
+        groups: list[Turn] = []
+        for messages, metadata in turns:
+            if groups and groups[-1][1] == metadata:
+                groups[-1][0].extend(messages)
+            else:
+                groups.append((list(messages), metadata))
+        for messages, metadata in groups:
+            self._write(user_id, messages, metadata)
+
+    def _memory(self, user_id: str) -> MemoryWrapper:
+        memory = self._memories.get(user_id)
+        if memory is None:
+            memory = self._memories[user_id] = MemoryWrapper(user_id=user_id)
+        return memory
+
+    def _write(self, user_id: str, messages: list[dict], metadata: dict[str, Any] | None):
+        for attempt in range(self.max_retries + 1):
+            try:
+                self._memory(user_id).add_conversation(messages, metadata=metadata)
+                self._stats["batches"] += 1
+                self._stats["written"] += len(messages)
+                return
+            except Exception:
+                if attempt == self.max_retries:
+                    self._stats["failed"] += len(messages)
+                    logger.exception("Dropping %d memory messages for %s after %d attempts", len(messages), user_id, attempt + 1)
+                    return
+                self._stats["retries"] += 1
+                time.sleep(self.retry_backoff * 2 ** attempt)
+
+    def stats(self) -> dict:
+        return {**self._stats, "pending": self.pending(), "running": self.running}
+
+
+memory_persister = MemoryPersister()
+metrics.register("memory_persister", memory_persister.stats)
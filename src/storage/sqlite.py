@@ -0,0 +1,235 @@
+"""Embedded SQLite storage engine for local runs, load tests and single-box deployments."""
+import json
+import os
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from src.storage.base import (
+    DEFAULT_USER_ID,
+    MEAL_TOTAL_FIELDS,
+    StorageBackend,
+    empty_rollup,
+    local_today,
+    rollup_day_keys,
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS workouts (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    day TEXT NOT NULL,
+    type TEXT NOT NULL,
+    duration_mins INTEGER NOT NULL DEFAULT 0,
+    exercises TEXT NOT NULL DEFAULT '[]',
+    notes TEXT,
+    raw_input TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_workouts_user_ts ON workouts (user_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_workouts_user_day ON workouts (user_id, day);
+
+CREATE TABLE IF NOT EXISTS meals (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    timestamp REAL NOT NULL,
+    day TEXT NOT NULL,
+    meal_type TEXT NOT NULL,
+    calories INTEGER NOT NULL DEFAULT 0,
+    protein INTEGER NOT NULL DEFAULT 0,
+    carbs INTEGER NOT NULL DEFAULT 0,
+    fat INTEGER NOT NULL DEFAULT 0,
+    description TEXT,
+    raw_input TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_meals_user_ts ON meals (user_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_meals_user_day ON meals (user_id, day);
+
+CREATE TABLE IF NOT EXISTS config (
+    name TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+"""
+
+
+def _now() -> float:
+    return datetime.now(timezone.utc).timestamp()
+
+
+def _cutoff(days: int) -> float:
+    return (datetime.now(timezone.utc) - timedelta(days=days)).timestamp()
+
+
+def _to_datetime(timestamp: float) -> datetime:
+    return datetime.fromtimestamp(timestamp, timezone.utc)
+
+
+class SQLiteStorage(StorageBackend):
+    """StorageBackend on a single SQLite file in WAL mode.
+
+    One connection is shared across threads and serialized with a lock;
+    WAL keeps readers in other processes from blocking on writes.
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path or os.getenv("SQLITE_PATH", "layz.db")
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        with self._lock:
+            if self.path != ":memory:":
+                self.conn.execute("PRAGMA journal_mode=WAL")
+            self.conn.execute("PRAGMA synchronous=NORMAL")
+            self.conn.executescript(SCHEMA)
+
+    def log_workout(
+        self,
+        workout_type: str,
+        duration_mins: int,
+        exercises: list[dict] | None = None,
+        notes: str | None = None,
+        raw_input: str | None = None,
+        user_id: str = DEFAULT_USER_ID,
+    ) -> str:
+        """Log a workout."""
+        entry_id = uuid.uuid4().hex
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO workouts (id, user_id, timestamp, day, type, duration_mins, exercises, notes, raw_input)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    entry_id, user_id, _now(), local_today().isoformat(), workout_type,
+                    duration_mins or 0, json.dumps(exercises or []), notes, raw_input,
+                ),
+            )
+        return entry_id
+
+    def log_meal(
+        self,
+        meal_type: str,
+        calories: int,
+        protein: int,
+        carbs: int,
+        fat: int,
+        description: str,
+        raw_input: str | None = None,
+        user_id: str = DEFAULT_USER_ID,
+    ) -> str:
+        """Log a meal."""
+        entry_id = uuid.uuid4().hex
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO meals (id, user_id, timestamp, day, meal_type, calories, protein, carbs, fat,"
+                " description, raw_input) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    entry_id, user_id, _now(), local_today().isoformat(), meal_type,
+                    calories or 0, protein or 0, carbs or 0, fat or 0, description, raw_input,
+                ),
+            )
+        return entry_id
+
+    def get_workouts(self, days: int = 7, user_id: str = DEFAULT_USER_ID) -> list[dict]:
+        """Get workouts from the past N days, newest first."""
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT id, timestamp, type, duration_mins, exercises, notes, raw_input FROM workouts"
+                " WHERE user_id = ? AND timestamp >= ? ORDER BY timestamp DESC",
+                (user_id, _cutoff(days)),
+            ).fetchall()
+        return [
+            {
+                **dict(row),
+                "timestamp": _to_datetime(row["timestamp"]),
+                "exercises": json.loads(row["exercises"]),
+            }
+            for row in rows
+        ]
+
+    def get_meals(
+        self, days: int = 1, limit: int | None = None, user_id: str = DEFAULT_USER_ID
+    ) -> list[dict]:
+        """Get meals from the past N days, newest first."""
+        sql = (
+            "SELECT id, timestamp, meal_type, calories, protein, carbs, fat, description, raw_input"
+            " FROM meals WHERE user_id = ? AND timestamp >= ? ORDER BY timestamp DESC"
+        )
+        params: tuple = (user_id, _cutoff(days))
+        if limit:
+            sql += " LIMIT ?"
+            params += (limit,)
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        return [{**dict(row), "timestamp": _to_datetime(row["timestamp"])} for row in rows]
+
+    def get_last_workout_date(self, user_id: str = DEFAULT_USER_ID) -> datetime | None:
+        """Get the timestamp of the most recent workout."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT MAX(timestamp) FROM workouts WHERE user_id = ?", (user_id,)
+            ).fetchone()
+        return _to_datetime(row[0]) if row[0] is not None else None
+
+    def get_daily_rollups(self, days: int = 7, user_id: str = DEFAULT_USER_ID) -> list[dict]:
+        """Aggregate daily totals with indexed GROUP BY queries."""
+        day_keys = rollup_day_keys(days)
+        rollups = {key: empty_rollup(key) for key in day_keys}
+        placeholders = ", ".join("?" for _ in day_keys)
+        with self._lock:
+            workout_rows = self.conn.execute(
+                "SELECT day, COUNT(*), TOTAL(duration_mins), json_group_array(DISTINCT type)"
+                f" FROM workouts WHERE user_id = ? AND day IN ({placeholders}) GROUP BY day",
+                (user_id, *day_keys),
+            ).fetchall()
+            meal_rows = self.conn.execute(
+                "SELECT day, COUNT(*), TOTAL(calories), TOTAL(protein), TOTAL(carbs), TOTAL(fat)"
+                f" FROM meals WHERE user_id = ? AND day IN ({placeholders}) GROUP BY day",
+                (user_id, *day_keys),
+            ).fetchall()
+        for day, count, minutes, types in workout_rows:
+            rollups[day].update(
+                workout_count=count, workout_minutes=int(minutes), workout_types=json.loads(types)
+            )
+        for day, count, calories, protein, carbs, fat in meal_rows:
+            rollups[day].update(
+                meal_count=count, calories=int(calories), protein=int(protein),
+                carbs=int(carbs), fat=int(fat),
+            )
+        return [rollups[key] for key in day_keys]
+
+    def aggregate_meals(self, days: int = 1, user_id: str = DEFAULT_USER_ID) -> dict:
+        """Meal count and calorie/macro totals with one indexed aggregate query."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT COUNT(*), TOTAL(calories), TOTAL(protein), TOTAL(carbs), TOTAL(fat)"
+                " FROM meals WHERE user_id = ? AND timestamp >= ?",
+                (user_id, _cutoff(days)),
+            ).fetchone()
+        return {"count": row[0], **{field: int(value) for field, value in zip(MEAL_TOTAL_FIELDS, row[1:])}}
+
+    def count_workouts(self, days: int = 7, user_id: str = DEFAULT_USER_ID) -> int:
+        """Number of workouts in the past N days."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT COUNT(*) FROM workouts WHERE user_id = ? AND timestamp >= ?",
+                (user_id, _cutoff(days)),
+            ).fetchone()
+        return row[0]
+
+    def get_config(self, name: str) -> dict | None:
+        """Get a config document."""
+        with self._lock:
+            row = self.conn.execute("SELECT data FROM config WHERE name = ?", (name,)).fetchone()
+        return json.loads(row["data"]) if row else None
+
+    def set_config(self, name: str, data: dict):
+        """Create or replace a config document."""
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO config (name, data) VALUES (?, ?)", (name, json.dumps(data))
+            )
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self.conn.close()
@@ -0,0 +1,169 @@
+"""Write-behind queue that batches Firestore writes off the request path."""
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable
+
+logger = logging.getLogger(__name__)
+
+# Firestore rejects batches with more than 500 writes.
+MAX_BATCH_WRITES = 500
+
+# One staged write: (document reference, data, merge)
+Write = tuple[Any, dict, bool]
+
+# A group that must read before it writes, run as its own transaction: fn(db)
+Transactional = Callable[[Any], Any]
+
+
+def add_to_batch(batch, writes: list[Write]):
+    """Add a group of staged writes to a Firestore WriteBatch."""
+    for ref, data, merge in writes:
+        if merge:
+            batch.set(ref, data, merge=True)
+        else:
+            batch.set(ref, data)
+
+
+class WriteBehindQueue:
+    """Stage writes in memory and commit them in WriteBatches.
+
+    Each call to stage() is a group of writes that must land together (an
+    entry, its rollup and the activity increments), so groups are never
+    split across batches. A background thread commits when the queue reaches
+    ``batch_size`` groups or ``flush_interval`` seconds have passed. When
+    ``max_queue`` groups are pending, the caller flushes inline, so producers
+    slow down to the speed of Firestore instead of growing the queue without
+    bound.
+
+    A group can also be a callable that runs its own transaction, for the
+    rare log that must read before it writes (the first of a day). It is
+    committed on its own, in queue order, with the same retries.
+    """
+
+    def __init__(
+        self,
+        db,
+        batch_size: int = 50,
+        flush_interval: float = 1.0,
+        max_queue: int = 1000,
+        max_retries: int = 3,
+        retry_backoff: float = 0.2,
+    ):
+        self.db = db
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue = max_queue
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+
+        self._pending: deque[list[Write] | Transactional] = deque()
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._closed = False
+        self._stats = {"queued": 0, "flushed": 0, "failed": 0, "retries": 0, "batches": 0}
+
+        self._thread = threading.Thread(target=self._run, name="firestore-write-behind", daemon=True)
+        self._thread.start()
+
+    def stage(self, writes: list[Write] | Transactional):
+        """Queue a group of writes, or a transaction, to be committed atomically."""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("WriteBehindQueue is closed")
+            full = len(self._pending) >= self.max_queue
+        if full:
+            # Backpressure: pay for a flush now rather than queue unboundedly
+            self.flush()
+        with self._cond:
+            self._pending.append(writes)
+            self._stats["queued"] += 1
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify()
+
+    def flush(self):
+        """Commit everything currently queued."""
+        with self._flush_lock:
+            while True:
+                groups = self._take_batch()
+                if not groups:
+                    return
+                self._commit(groups)
+
+    def close(self):
+        """Stop the background thread and flush what is left."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        self.flush()
+
+    def pending(self) -> int:
+        """Number of write groups waiting to be committed."""
+        with self._cond:
+            return len(self._pending)
+
+    def stats(self) -> dict:
+        """Durability counters plus the current queue depth."""
+        with self._cond:
+            return {**self._stats, "pending": len(self._pending)}
+
+    def _take_batch(self) -> list[list[Write]] | Transactional:
+        """Pop as many whole groups as fit in one WriteBatch, or one transaction."""
+        groups = []
+        size = 0
+        with self._cond:
+            if self._pending and callable(self._pending[0]):
+                return self._pending.popleft()
+            while (
+                self._pending
+                and not callable(self._pending[0])
+                and size + len(self._pending[0]) <= MAX_BATCH_WRITES
+            ):
+                group = self._pending.popleft()
+                groups.append(group)
+                size += len(group)
+            if not groups and self._pending and not callable(self._pending[0]):
+                # A single oversized group still goes out on its own
+                groups.append(self._pending.popleft())
+        return groups
+
+    def _commit(self, groups: list[list[Write]] | Transactional):
+        """Commit groups in one batch, or run one transaction, retrying with exponential backoff."""
+        count = 1 if callable(groups) else len(groups)
+        for attempt in range(self.max_retries + 1):
+            try:
+                if callable(groups):
+                    groups(self.db)
+                else:
+                    batch = self.db.batch()
+                    for group in groups:
+                        add_to_batch(batch, group)
+                    batch.commit()
+            except Exception:
+                if attempt == self.max_retries:
+                    logger.exception("Dropping %d staged writes after %d retries", count, attempt)
+                    with self._cond:
+                        self._stats["failed"] += count
+                    return
+                with self._cond:
+                    self._stats["retries"] += 1
+                time.sleep(self.retry_backoff * (2 ** attempt))
+            else:
+                with self._cond:
+                    self._stats["flushed"] += count
+                    self._stats["batches"] += 1
+                return
+
+    def _run(self):
+        """Background loop: flush on size or time thresholds."""
+        while True:
+            with self._cond:
+                if not self._closed and len(self._pending) < self.batch_size:
+                    self._cond.wait(self.flush_interval)
+                if self._closed:
+                    return
+            self.flush()
@@ -0,0 +1,174 @@
+"""Deferred SMS replies sent through the Twilio REST API.
+
+Twilio gives up on a webhook after 15 seconds, and a reply that misses the
+deadline is lost. When a reply is expected to take longer than
+``SMS_REPLY_BUDGET`` seconds (by a running estimate), or is still running
+when the budget runs out, the webhook acks with empty TwiML and the reply is
+texted back once it is ready. Fast-path logs and cached answers are always
+answered inline; only agent runs are deferred.
+"""
+import asyncio
+import logging
+import os
+import statistics
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+
+from src import metrics
+from src.agent.tools.comms import deliver_sms_async
+
+logger = logging.getLogger(__name__)
+
+MakeReply = Callable[[], Awaitable[str]]
+
+
+@dataclass(frozen=True)
+class _Job:
+    make_reply: MakeReply
+    to: str
+    received: float
+    started: float | None = None  # when the handler began, if before a worker picked it up
+
+
+class DeferredReplies:
+    """Background workers that produce replies and text them back.
+
+    ``estimate`` is an exponential moving average of handler times, excluding
+    any wait for a worker, so a backlog can't hold it over budget. Handlers
+    defer up front while it is over budget, and hand over runs that overrun
+    the budget via adopt().
+    """
+
+    def __init__(self, budget: float = 10.0, workers: int = 4, alpha: float = 0.2, drain_timeout: float = 20.0):
+        self.budget = budget
+        self.workers = workers
+        self.alpha = alpha
+        self.drain_timeout = drain_timeout
+
+        self.estimate: float | None = None
+        self._queue: asyncio.Queue | None = None
+        self._workers: list[asyncio.Task] = []
+        self._background: set[asyncio.Task] = set()
+        self._latencies: deque[float] = deque(maxlen=500)
+        self._in_flight = 0
+        self._stats = {
+            "inline": 0,
+            "deferred_by_estimate": 0,
+            "deferred_by_elapsed": 0,
+            "delivered": 0,
+            "failed": 0,
+        }
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    def record(self, seconds: float):
+        """Fold one reply time into the estimate."""
+        if self.estimate is None:
+            self.estimate = seconds
+        else:
+            self.estimate = self.alpha * seconds + (1 - self.alpha) * self.estimate
+
+    def should_defer(self) -> bool:
+        return self.estimate is not None and self.estimate > self.budget
+
+    def replied_inline(self, seconds: float):
+        self._stats["inline"] += 1
+        self.record(seconds)
+
+    async def start(self):
+        self._queue = asyncio.Queue()
+        self._workers = [
+            asyncio.create_task(self._work(), name=f"sms-reply-{i}") for i in range(self.workers)
+        ]
+
+    async def stop(self):
+        """Finish queued and in-flight replies, then stop the workers."""
+        if not self.running:
+            return
+        try:
+            await asyncio.wait_for(self._drain(), timeout=self.drain_timeout)
+        except asyncio.TimeoutError:
+            logger.error("Gave up on %d deferred SMS replies on shutdown", self.depth())
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def _drain(self):
+        await self._queue.join()
+        if self._background:
+            await asyncio.gather(*self._background, return_exceptions=True)
+
+    def defer(self, make_reply: MakeReply, to: str, received: float):
+        """Produce the reply in the background and text it to ``to``."""
+        self._stats["deferred_by_estimate"] += 1
+        job = _Job(make_reply, to, received)
+        if self.running:
+            self._queue.put_nowait(job)
+        else:
+            self._track(asyncio.create_task(self._run(job)))
+
+    def adopt(self, reply: asyncio.Task, to: str, received: float):
+        """Text the result of an already-running reply once it finishes."""
+        self._stats["deferred_by_elapsed"] += 1
+
+        async def finish() -> str:
+            return await reply
+
+        # The handler has been running since the webhook arrived
+        self._track(asyncio.create_task(self._run(_Job(finish, to, received, started=received))))
+
+    def _track(self, task: asyncio.Task):
+        self._in_flight += 1
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _work(self):
+        while True:
+            job = await self._queue.get()
+            self._in_flight += 1
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: _Job):
+        started = job.started if job.started is not None else time.monotonic()
+        try:
+            reply = await job.make_reply()
+            self.record(time.monotonic() - started)
+            await deliver_sms_async(job.to, reply)
+        except Exception:
+            self._stats["failed"] += 1
+            logger.exception("Failed to deliver deferred SMS reply")
+            return
+        finally:
+            self._in_flight -= 1
+        self._stats["delivered"] += 1
+        self._latencies.append(time.monotonic() - job.received)
+
+    def depth(self) -> int:
+        """Replies waiting for a worker or still running."""
+        return (self._queue.qsize() if self._queue else 0) + self._in_flight
+
+    def stats(self) -> dict:
+        latencies = sorted(self._latencies)
+        return {
+            **self._stats,
+            "queue_depth": self.depth(),
+            "estimate_s": self.estimate,
+            "budget_s": self.budget,
+            "delivery_p50_s": statistics.median(latencies) if latencies else None,
+            "delivery_p95_s": latencies[int(len(latencies) * 0.95)] if latencies else None,
+        }
+
+
+sms_replies = DeferredReplies(
+    budget=float(os.getenv("SMS_REPLY_BUDGET", "10")),
+    workers=int(os.getenv("SMS_REPLY_WORKERS", "4")),
+)
+metrics.register("sms_replies", sms_replies.stats)
@@ -1,20 +1,49 @@
 """SMS webhook handler for Twilio."""
+import asyncio
+import time
+
 from fastapi import APIRouter, Form
 from twilio.twiml.messaging_response import MessagingResponse
 
-from src.agent.coach import chat_async
+from src.agent.coach import agent_reply, chat_async, quick_reply
+from src.agent.context import user_id_from_phone
+from src.config.loader import ConfigLoader
+from src.webhooks.deferred import sms_replies
 
 router = APIRouter()
 
 
 @router.post("/webhook/sms")
 async def handle_sms(Body: str = Form(...), From: str = Form(...)):
-    """Handle incoming SMS from Twilio."""
+    """Handle incoming SMS from Twilio.
+
+    Replies inline when the agent finishes within the reply budget. Otherwise
+    acks with empty TwiML and texts the reply once it is ready. Fast-path logs
+    and cached answers are answered inline even while replies are deferred.
+    """
+    received = time.monotonic()
     # Use phone number as user_id for simplicity
-    user_id = From.replace("+", "")
+    user_id = user_id_from_phone(From)
+
+    def make_reply():
+        return chat_async(Body, user_id=user_id)
 
-    # Get response from agent
-    agent_response = await chat_async(Body, user_id=user_id)
+    if sms_replies.should_defer():
+        # Logs and cached answers never need the agent, so only its runs are deferred
+        personality = ConfigLoader().get_personality()
+        agent_response, cache_key = await quick_reply(Body, user_id, personality)
+        if agent_response is None:
+            sms_replies.defer(lambda: agent_reply(Body, user_id, personality, cache_key), From, received)
+            return str(MessagingResponse())
+    else:
+        # Get response from agent
+        reply = asyncio.ensure_future(make_reply())
+        try:
+            agent_response = await asyncio.wait_for(asyncio.shield(reply), timeout=sms_replies.budget)
+        except asyncio.TimeoutError:
+            sms_replies.adopt(reply, From, received)
+            return str(MessagingResponse())
+    sms_replies.replied_inline(time.monotonic() - received)
 
     # Format as TwiML response
     response = MessagingResponse()
@@ -6,8 +6,12 @@ import os
 from fastapi import APIRouter, WebSocket, WebSocketDisconnect, Request
 from twilio.twiml.voice_response import VoiceResponse, Connect
 
+from src.agent import prompts
+from src.agent.context import user_id_from_phone
+from src.agent.memory_packer import memory_context_async
 from src.config.loader import ConfigLoader
 from src.storage.memory import MemoryWrapper
+from src.storage.memory_persister import memory_persister
 
 router = APIRouter()
 
@@ -58,19 +62,17 @@ async def media_stream(websocket: WebSocket):
     user = config.get_user()
 
     # Load memories for context
-    memory = MemoryWrapper(user_id=user.get("phone", "default").replace("+", ""))
-    relevant_memories = memory.search("fitness coaching conversation", limit=20)
-
-    instructions = f"""
-{personality.get('prompt', 'You are a helpful fitness coach.')}
-
-You are on a voice call with {user.get('name', 'the user')}.
-
-What you remember about them:
-{memory.format_memories(relevant_memories)}
-
-Keep responses conversational and concise - this is a phone call.
-"""
+    user_id = user_id_from_phone(user.get("phone"))
+    memory = MemoryWrapper(user_id=user_id)
+    relevant_memories = await memory_context_async(memory, "fitness coaching conversation", "voice")
+
+    # Memories go last so the stable personality/user prefix is shared across calls
+    instructions = prompts.assemble(
+        personality=personality.get('prompt', 'You are a helpful fitness coach.'),
+        user=f"You are on a voice call with {user.get('name') or 'the user'}.",
+        tools="Keep responses conversational and concise - this is a phone call.",
+        memories=memory.format_memories(relevant_memories),
+    )
 
     transcript_parts = []
 
@@ -102,7 +104,8 @@ Keep responses conversational and concise - this is a phone call.
         # Store conversation transcript in memory
         if transcript_parts:
             transcript = "\n".join(transcript_parts)
-            memory.add(
-                f"Voice conversation:\n{transcript}",
-                metadata={"type": "voice_call"}
+            memory_persister.persist(
+                user_id,
+                [{"role": "user", "content": f"Voice conversation:\n{transcript}"}],
+                metadata={"type": "voice_call"},
             )
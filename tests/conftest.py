@@ -0,0 +1,40 @@
+"""Shared fixtures."""
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def clear_process_caches():
+    """Clear process-wide caches so mocked data never leaks between tests."""
+    import src.agent.tools.comms as comms
+    import src.storage.engine as engine
+    from src.agent.context import tool_stats
+    from src.agent.factory import agent_factory
+    from src.agent.fastpath import fastpath_stats
+    from src.agent.memory_packer import packer_stats
+    from src.agent.prompts import prompt_cache_stats
+    from src.agent.response_cache import response_cache
+    from src.agent.router import model_router
+    from src.config.snapshot import config_store
+    from src.storage.firestore import query_cache
+    from src.storage.mem0_client import mem0_pool
+    from src.storage.memory_cache import memory_search_cache
+    from src.storage.memory_index import memory_indexes
+    from src.storage.memory_persister import memory_persister
+    query_cache.clear()
+    config_store.close()
+    yield
+    query_cache.clear()
+    config_store.close()
+    agent_factory.clear()
+    prompt_cache_stats.clear()
+    packer_stats.clear()
+    fastpath_stats.clear()
+    response_cache.clear()
+    model_router.clear()
+    tool_stats.clear()
+    memory_persister._memories.clear()
+    memory_indexes.clear()
+    mem0_pool.clear()
+    memory_search_cache.clear()
+    engine._local_backend = None
+    comms._async_client = None
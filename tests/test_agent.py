@@ -50,7 +50,7 @@ def test_chat_with_memory():
     """Test chat function integrates memory."""
     with patch("src.storage.firestore.firebase_admin") as mock_firebase:
         with patch("src.storage.firestore.firestore") as mock_firestore:
-            with patch("src.storage.memory.MemoryClient") as mock_mem0:
+            with patch("src.storage.mem0_client.MemoryClient") as mock_mem0:
                 with patch("src.agent.coach.Runner") as mock_runner:
                     mock_firebase._apps = []
                     mock_db = MagicMock()
@@ -90,3 +90,64 @@ def test_chat_with_memory():
 
                         assert response == "Time to work out!"
                         mock_runner.run_sync.assert_called_once()
+
+
+def test_agents_reused_until_config_changes():
+    """Test agents are built once per config version and user."""
+    import os
+    with patch.dict(os.environ, {"STORAGE_BACKEND": "memory"}):
+        from src.agent.coach import create_fitness_coach  # noqa: F401 - registers the builder
+        from src.agent.factory import agent_factory, get_agent
+        from src.config.snapshot import config_store
+
+        agent = get_agent("coach", "keith")
+        assert get_agent("coach", "keith") is agent
+        assert get_agent("coach", "someone-else") is not agent
+        assert agent_factory.stats()["builds"] == 2
+
+        config_store.apply("personality", {
+            "active": "test", "presets": {"test": {"prompt": "You are a calm coach"}},
+        })
+        rebuilt = get_agent("coach", "keith")
+
+        assert rebuilt is not agent
+        assert "calm coach" in rebuilt.instructions
+        stats = agent_factory.stats()
+        assert stats["builds_by_kind"] == {"coach": 3}
+        assert stats["hits"] == 1
+        assert stats["size"] == 1
+
+
+@pytest.mark.asyncio
+async def test_chat_async_degrades_slow_context_stage():
+    """Test a slow memory search is cut off and the reply still goes out with other context."""
+    import asyncio
+    import os
+    from unittest.mock import AsyncMock
+
+    async def slow_search(self, query, limit=10):
+        await asyncio.sleep(0.3)
+        return ["never used"]
+
+    with patch.dict(os.environ, {"STORAGE_BACKEND": "memory"}), \
+            patch("src.agent.coach.MEMORY_TIMEOUT", 0.05), \
+            patch("src.storage.memory.MemoryWrapper.search_scored_async", slow_search), \
+            patch("src.agent.coach.Runner") as mock_runner:
+        mock_runner.run = AsyncMock(return_value=MagicMock(final_output="Go lift."))
+
+        from src.agent.coach import chat_async
+        from src.agent.stages import stage_stats
+        from src.storage.engine import get_storage
+        stage_stats.clear()
+        get_storage().log_workout("run", 30, user_id="keith")
+
+        assert await chat_async("How am I doing?", user_id="keith") == "Go lift."
+
+        prompt = mock_runner.run.call_args.args[1]
+        assert "No relevant memories." in prompt
+        assert "Streak: 1 days" in prompt
+        stats = stage_stats.stats()
+        assert stats["memory"]["timeout"] == 1
+        assert stats["agent"]["ok"] == 1
+        assert stats["activity"]["ok"] == 1
+        assert stats["memory"]["max_ms"] < 250
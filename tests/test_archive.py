@@ -0,0 +1,119 @@
+# tests/test_archive.py
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+from src.storage.archive import archive_months, merge_entries, month_keys_between, pack_entries, unpack_archive
+
+
+def _workout(entry_id, timestamp, **fields):
+    return {"id": entry_id, "timestamp": timestamp, "type": "run", "duration_mins": 30,
+            "exercises": [], "notes": None, **fields}
+
+
+def test_pack_and_unpack_round_trip():
+    """Test entries survive packing into columns, oldest first."""
+    t1 = datetime(2026, 1, 5, 15, tzinfo=timezone.utc)
+    t2 = datetime(2026, 1, 3, 15, tzinfo=timezone.utc)
+    archive = pack_entries("workouts", "2026-01", [
+        _workout("a", t1, exercises=[{"name": "bench", "sets": 3}], raw_input="did bench"),
+        _workout("b", t2, type="pull"),
+    ])
+
+    assert archive["count"] == 2
+    assert archive["columns"]["id"] == ["b", "a"]
+    assert "raw_input" not in archive["columns"]
+    rows = unpack_archive("workouts", archive)
+    assert rows[1]["exercises"] == [{"name": "bench", "sets": 3}]
+    assert rows[0]["type"] == "pull"
+    assert unpack_archive("workouts", archive, since=t1) == [rows[1]]
+
+
+def test_pack_merges_into_existing_archive_without_duplicates():
+    """Test re-compacting the same entries leaves the archive unchanged."""
+    ts = datetime(2026, 1, 5, 15, tzinfo=timezone.utc)
+    archive = pack_entries("workouts", "2026-01", [_workout("a", ts)])
+    again = pack_entries("workouts", "2026-01", [_workout("a", ts), _workout("c", ts + timedelta(days=1))], archive)
+
+    assert again["columns"]["id"] == ["a", "c"]
+
+
+def test_merge_entries_newest_first_with_limit():
+    """Test hot and cold entries merge into one newest-first list."""
+    now = datetime.now(timezone.utc)
+    hot = [{"id": "h", "timestamp": now}]
+    cold = [{"id": "c1", "timestamp": now - timedelta(days=100)}, {"id": "h", "timestamp": now}]
+
+    assert [e["id"] for e in merge_entries(hot, cold)] == ["h", "c1"]
+    assert [e["id"] for e in merge_entries(hot, cold, limit=1)] == ["h"]
+
+
+def test_archive_months_only_for_long_windows():
+    """Test windows inside the hot tier read no archives."""
+    assert archive_months(30, age_days=90) == []
+    assert len(archive_months(180, age_days=90)) in (3, 4)
+    assert month_keys_between(
+        datetime(2025, 11, 20, tzinfo=timezone.utc), datetime(2026, 2, 10, tzinfo=timezone.utc)
+    ) == ["2025-11", "2025-12", "2026-01", "2026-02"]
+
+
+def test_compact_logs_packs_and_deletes_old_entries():
+    """Test compaction writes monthly archives and deletes entries in one batch."""
+    with patch("src.storage.firestore.firebase_admin") as mock_firebase:
+        with patch("src.storage.firestore.firestore") as mock_firestore:
+            mock_firebase._apps = []
+            mock_db = MagicMock()
+            mock_firestore.client.return_value = mock_db
+            mock_db.get_all.return_value = []
+
+            old = datetime.now(timezone.utc) - timedelta(days=200)
+            docs = []
+            for i in range(3):
+                doc = MagicMock(id=f"w{i}")
+                doc.to_dict.return_value = _workout(f"w{i}", old + timedelta(hours=i))
+                docs.append(doc)
+            entries = mock_db.collection.return_value.document.return_value.collection.return_value
+            entries.where.return_value.order_by.return_value.limit.return_value.stream.side_effect = [docs, []]
+
+            from src.storage.firestore import FirestoreClient
+            FirestoreClient._instance = None
+            FirestoreClient._initialized = False
+
+            compacted = FirestoreClient().compact_logs(user_id="keith")
+
+            assert compacted == {"workouts": 3, "meals": 0}
+            batch = mock_db.batch.return_value
+            archive = batch.set.call_args.args[1]
+            assert archive["kind"] == "workouts"
+            assert archive["columns"]["id"] == ["w0", "w1", "w2"]
+            assert batch.delete.call_count == 3
+            batch.commit.assert_called_once()
+
+
+def test_long_window_reads_merge_archives():
+    """Test get_workouts over a long window merges archived months in one batched get."""
+    with patch("src.storage.firestore.firebase_admin") as mock_firebase:
+        with patch("src.storage.firestore.firestore") as mock_firestore:
+            mock_firebase._apps = []
+            mock_db = MagicMock()
+            mock_firestore.client.return_value = mock_db
+
+            now = datetime.now(timezone.utc)
+            hot = MagicMock(id="hot")
+            hot.to_dict.return_value = _workout("hot", now)
+            entries = mock_db.collection.return_value.document.return_value.collection.return_value
+            entries.where.return_value.order_by.return_value.stream.return_value = [hot]
+
+            archive = MagicMock(exists=True)
+            archive.to_dict.return_value = pack_entries(
+                "workouts", "x", [_workout("cold", now - timedelta(days=120)), _workout("too-old", now - timedelta(days=400))]
+            )
+            mock_db.get_all.return_value = [archive]
+
+            from src.storage.firestore import FirestoreClient
+            FirestoreClient._instance = None
+            FirestoreClient._initialized = False
+            client = FirestoreClient()
+
+            assert [w["id"] for w in client.get_workouts(days=180)] == ["hot", "cold"]
+            client.get_workouts(days=7)
+            mock_db.get_all.assert_called_once()
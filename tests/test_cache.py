@@ -0,0 +1,64 @@
+# tests/test_cache.py
+from unittest.mock import MagicMock, patch
+
+from src.storage.cache import MISSING, TTLCache
+
+
+def test_cache_hit_and_miss_counters():
+    """Test hits and misses are counted."""
+    cache = TTLCache(maxsize=4, ttl=60)
+
+    assert cache.get("a", MISSING) is MISSING
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_cache_entries_expire():
+    """Test entries are dropped once their TTL passes."""
+    cache = TTLCache(maxsize=4, ttl=10)
+    with patch("src.storage.cache.time.monotonic", return_value=100.0):
+        cache.set("a", 1)
+    with patch("src.storage.cache.time.monotonic", return_value=105.0):
+        assert cache.get("a") == 1
+    with patch("src.storage.cache.time.monotonic", return_value=111.0):
+        assert cache.get("a") is None
+
+
+def test_cache_evicts_least_recently_used():
+    """Test LRU eviction once maxsize is reached."""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.stats()["evictions"] == 1
+
+
+def test_cache_invalidate_by_predicate():
+    """Test invalidation only drops matching keys."""
+    cache = TTLCache(maxsize=8, ttl=60)
+    cache.set(("workouts", 7), [])
+    cache.set(("meals", 1, None), [])
+
+    assert cache.invalidate(lambda key: key[0] == "workouts") == 1
+    assert cache.get(("workouts", 7)) is None
+    assert cache.get(("meals", 1, None)) == []
+
+
+def test_cache_disabled_with_zero_ttl():
+    """Test a zero TTL never stores anything."""
+    cache = TTLCache(maxsize=8, ttl=0)
+    loader = MagicMock(return_value=[1])
+
+    cache.get_or_load("a", loader)
+    cache.get_or_load("a", loader)
+
+    assert loader.call_count == 2
@@ -1,4 +1,7 @@
 # tests/test_config.py
+import os
+import time
+
 import pytest
 from unittest.mock import MagicMock, patch
 
@@ -75,3 +78,96 @@ def test_config_loader_get_schedule():
 
             assert schedule["timezone"] == "America/Los_Angeles"
             assert "07:00" in schedule["daily_checkins"]
+
+
+def test_config_snapshot_shared_across_loaders():
+    """Test config is read from storage once per process, not per ConfigLoader."""
+    with patch("src.storage.firestore.firebase_admin") as mock_firebase:
+        with patch("src.storage.firestore.firestore") as mock_firestore:
+            mock_firebase._apps = []
+            mock_db = MagicMock()
+            mock_firestore.client.return_value = mock_db
+
+            config_ref = mock_db.collection.return_value.document.return_value
+            config_ref.get.return_value = MagicMock(exists=True, to_dict=MagicMock(return_value={"timezone": "UTC"}))
+
+            from src.config.loader import ConfigLoader
+            assert ConfigLoader().get_schedule()["timezone"] == "UTC"
+            assert ConfigLoader().get_schedule()["timezone"] == "UTC"
+
+            config_ref.get.assert_called_once()
+            config_ref.on_snapshot.assert_called_once()
+
+
+def test_config_listener_hot_swaps_snapshot():
+    """Test a snapshot listener event swaps in a new, immutable version."""
+    with patch("src.storage.firestore.firebase_admin") as mock_firebase:
+        with patch("src.storage.firestore.firestore") as mock_firestore:
+            mock_firebase._apps = []
+            mock_db = MagicMock()
+            mock_firestore.client.return_value = mock_db
+
+            config_ref = mock_db.collection.return_value.document.return_value
+            config_ref.get.return_value = MagicMock(exists=True, to_dict=MagicMock(return_value={"rules": []}))
+
+            from src.config.loader import ConfigLoader
+            loader = ConfigLoader()
+            assert loader.get_triggers()["rules"] == ()
+            version = loader.version
+
+            on_snapshot = config_ref.on_snapshot.call_args.args[0]
+            changed = MagicMock(exists=True, to_dict=MagicMock(return_value={"rules": [{"event": "no_workout"}]}))
+            on_snapshot([changed], [], None)
+
+            triggers = loader.get_triggers()
+            assert triggers["rules"][0]["event"] == "no_workout"
+            assert loader.version == version + 1
+            with pytest.raises(TypeError):
+                triggers["rules"][0]["event"] = "other"
+
+            # Unchanged docs don't bump the version
+            on_snapshot([changed], [], None)
+            assert loader.version == version + 1
+
+
+def test_config_polls_without_listeners():
+    """Test engines without listeners are polled for config changes."""
+    with patch.dict(os.environ, {"STORAGE_BACKEND": "memory"}):
+        from src.config.snapshot import config_store
+        from src.storage.engine import get_storage
+
+        config_store.poll_interval = 0.01
+        try:
+            assert config_store.get("schedule")["timezone"] == "America/Los_Angeles"
+            get_storage().set_config("schedule", {"timezone": "UTC"})
+            deadline = time.monotonic() + 2
+            while config_store.get("schedule").get("timezone") != "UTC" and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert config_store.get("schedule")["timezone"] == "UTC"
+            assert config_store.stats()["polled"] == 1
+        finally:
+            config_store.close()
+            config_store.poll_interval = 30.0
+
+
+def test_clear_cache_reloads_without_stopping_listeners():
+    """Test clear_cache re-reads config but keeps the store's listeners."""
+    with patch.dict(os.environ, {"STORAGE_BACKEND": "memory"}):
+        from src.config.loader import ConfigLoader
+        from src.config.snapshot import config_store
+        from src.storage.engine import get_storage
+
+        config_store.poll_interval = 0
+        try:
+            loader = ConfigLoader()
+            assert loader.get_schedule()["timezone"] == "America/Los_Angeles"
+            polled = config_store.stats()["polled"]
+
+            get_storage().set_config("schedule", {"timezone": "UTC"})
+            loader.clear_cache()
+
+            assert loader.get_schedule()["timezone"] == "UTC"
+            assert config_store.stats()["polled"] == polled
+        finally:
+            config_store.close()
+            config_store.poll_interval = 30.0
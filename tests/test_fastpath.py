@@ -0,0 +1,98 @@
+# tests/test_fastpath.py
+import json
+import os
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.agent.fastpath import fastpath_stats, parse, render
+
+CORPUS = Path(__file__).parent / "data" / "fastpath_corpus.jsonl"
+
+
+def _label(log) -> dict | None:
+    if log is None:
+        return None
+    if log.kind == "workout":
+        return {"kind": "workout", "workout_type": log.workout_type, "duration_mins": log.duration_mins}
+    return {"kind": "meal", "meal_type": log.meal_type, "calories": log.calories}
+
+
+def test_corpus_precision_and_recall():
+    """Test every fast-path parse in the labeled corpus is correct, and most logs are caught."""
+    rows = [json.loads(line) for line in CORPUS.read_text().splitlines()]
+    parsed = [(row, _label(parse(row["text"]))) for row in rows]
+
+    wrong = [row["text"] for row, got in parsed if got is not None and got != row["label"]]
+    logs = [row for row in rows if row["label"] is not None]
+    caught = [row for row, got in parsed if got is not None and got == row["label"]]
+
+    assert wrong == []
+    assert len(caught) / len(logs) >= 0.8
+
+
+def test_parse_structures_exercises():
+    """Test lifts, cardio distance and notes are extracted."""
+    log = parse("Did push day - bench 185x5x3, pullups 3x10, felt strong")
+
+    assert log.workout_type == "push"
+    assert log.exercises == (
+        {"name": "bench press", "weight": 185, "reps": 5, "sets": 3},
+        {"name": "pull-up", "sets": 3, "reps": 10},
+    )
+    assert log.notes == "felt strong"
+    assert parse("ran 3 miles in 25:30").exercises == ({"name": "run", "distance_km": 4.83},)
+
+
+def test_two_number_lifts_split_sets_from_weight():
+    """Test "N x M" is sets x reps for small N, weight x reps for large N, and ambiguous between."""
+    from src.agent.tools.fitness import _workout_fields
+
+    assert parse("pullups 3x10").exercises == ({"name": "pull-up", "sets": 3, "reps": 10},)
+    assert parse("bench 135x10").exercises == ({"name": "bench press", "sets": 1, "reps": 10, "weight": 135},)
+    assert parse("curls 15x12") is None
+    # The agent's log_workout tool reads lifts with the same grammar
+    assert _workout_fields("deadlift 315x5")["exercises"] == [{"name": "deadlift", "sets": 1, "reps": 5, "weight": 315}]
+
+
+def test_render_uses_personality_template():
+    """Test replies come from the personality's templates, with a generic fallback."""
+    log = parse("ran 5k 28 min")
+
+    assert render(log, {"fastpath": {"workout": "Done: {summary}!"}}) == "Done: 5 km run, 28 min!"
+    assert render(log, {}) == "Logged: 5 km run, 28 min."
+
+
+@pytest.mark.asyncio
+async def test_chat_async_logs_without_agent():
+    """Test a plain log is stored and answered without running the agent."""
+    with patch.dict(os.environ, {"STORAGE_BACKEND": "memory"}), \
+            patch("src.agent.coach.Runner") as mock_runner:
+        mock_runner.run = AsyncMock()
+
+        from src.agent.coach import chat_async
+        from src.storage.engine import get_storage
+
+        reply = await chat_async("bench 185x5x3, 45 mins", user_id="keith")
+
+        assert reply.startswith("Logged: bench press 185x5x3, 45 min.")
+        mock_runner.run.assert_not_called()
+        [workout] = get_storage().get_workouts(days=1, user_id="keith")
+        assert workout["type"] == "strength"
+        assert workout["duration_mins"] == 45
+        assert workout["exercises"] == [{"name": "bench press", "sets": 3, "reps": 5, "weight": 185}]
+        assert fastpath_stats.stats()["hits_by_kind"] == {"workout": 1}
+
+
+@pytest.mark.asyncio
+async def test_fast_path_write_failure_falls_back_to_agent():
+    """Test a failed fast-path write hands the message to the agent."""
+    storage = MagicMock()
+    storage.log_workout = AsyncMock(side_effect=RuntimeError("unavailable"))
+
+    with patch("src.agent.fastpath.get_async_storage", return_value=storage):
+        from src.agent.fastpath import try_fast_path
+
+        assert await try_fast_path("ran 5k", "keith", {}) is None
+        assert fastpath_stats.stats()["errors"] == 1
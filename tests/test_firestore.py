@@ -1,6 +1,6 @@
 # tests/test_firestore.py
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 import importlib
 
 
@@ -12,6 +12,20 @@ def reset_firestore_singleton():
     import src.storage.firestore as fs_module
     fs_module.FirestoreClient._instance = None
     fs_module.FirestoreClient._initialized = False
+    fs_module.AsyncFirestoreClient._instance = None
+    fs_module.AsyncFirestoreClient._initialized = False
+
+
+def _transaction(mock_db, async_=False):
+    """The transaction mock_db.transaction() returns, set up to commit on the first attempt."""
+    transaction = mock_db.transaction.return_value
+    transaction._max_attempts = 1
+    transaction._read_only = False
+    if async_:
+        transaction._begin = AsyncMock()
+        transaction._commit = AsyncMock(return_value=[])
+        transaction._rollback = AsyncMock()
+    return transaction
 
 
 def test_firestore_client_initialization():
@@ -39,11 +53,11 @@ def test_log_workout():
             mock_db = MagicMock()
             mock_firestore.client.return_value = mock_db
 
-            # Set up the chained call: collection().document().collection().add()
+            # Set up the chained call: collection().document().collection().document()
             mock_entries_collection = MagicMock()
             mock_doc_ref = MagicMock()
             mock_doc_ref.id = "doc123"
-            mock_entries_collection.add.return_value = (None, mock_doc_ref)
+            mock_entries_collection.document.return_value = mock_doc_ref
 
             mock_workouts_doc = MagicMock()
             mock_workouts_doc.collection.return_value = mock_entries_collection
@@ -52,6 +66,7 @@ def test_log_workout():
             mock_logs_collection.document.return_value = mock_workouts_doc
 
             mock_db.collection.return_value = mock_logs_collection
+            transaction = _transaction(mock_db)
 
             from src.storage.firestore import FirestoreClient
             # Reset singleton for this test
@@ -68,7 +83,17 @@ def test_log_workout():
                 raw_input="Did push day"
             )
 
-            mock_entries_collection.add.assert_called_once()
+            # The activity doc is read, then entry, daily rollup and activity
+            # state are written, all in one transaction
+            mock_doc_ref.get.assert_called_once_with(transaction=transaction)
+            assert transaction.set.call_count == 3
+            entry_ref, entry = transaction.set.call_args_list[0].args
+            assert entry_ref is mock_doc_ref
+            assert entry["type"] == "push"
+            assert transaction.set.call_args_list[1].kwargs == {"merge": True}
+            assert transaction.set.call_args_list[2].kwargs == {"merge": True}
+            transaction._commit.assert_called_once()
+            mock_db.batch.assert_not_called()
             assert result == "doc123"
 
 
@@ -80,11 +105,11 @@ def test_log_meal():
             mock_db = MagicMock()
             mock_firestore.client.return_value = mock_db
 
-            # Set up the chained call: collection().document().collection().add()
+            # Set up the chained call: collection().document().collection().document()
             mock_entries_collection = MagicMock()
             mock_doc_ref = MagicMock()
             mock_doc_ref.id = "meal456"
-            mock_entries_collection.add.return_value = (None, mock_doc_ref)
+            mock_entries_collection.document.return_value = mock_doc_ref
 
             mock_nutrition_doc = MagicMock()
             mock_nutrition_doc.collection.return_value = mock_entries_collection
@@ -93,6 +118,7 @@ def test_log_meal():
             mock_logs_collection.document.return_value = mock_nutrition_doc
 
             mock_db.collection.return_value = mock_logs_collection
+            transaction = _transaction(mock_db)
 
             from src.storage.firestore import FirestoreClient
             # Reset singleton for this test
@@ -111,5 +137,335 @@ def test_log_meal():
                 raw_input="Had a chipotle bowl"
             )
 
-            mock_entries_collection.add.assert_called_once()
+            assert transaction.set.call_count == 3
+            transaction._commit.assert_called_once()
             assert result == "meal456"
+
+
+def test_get_daily_rollups():
+    """Test daily rollups are read in one batched get and zero-filled."""
+    with patch("src.storage.firestore.firebase_admin") as mock_firebase:
+        with patch("src.storage.firestore.firestore") as mock_firestore:
+            mock_firebase._apps = []
+            mock_db = MagicMock()
+            mock_firestore.client.return_value = mock_db
+
+            from src.storage.base import local_today, sum_rollups
+            from src.storage.firestore import FirestoreClient
+            FirestoreClient._instance = None
+            FirestoreClient._initialized = False
+
+            today = local_today().isoformat()
+            snapshot = MagicMock()
+            snapshot.id = today
+            snapshot.exists = True
+            snapshot.to_dict.return_value = {"date": today, "meal_count": 2, "calories": 1200}
+            mock_db.get_all.return_value = [snapshot]
+
+            client = FirestoreClient()
+            rollups = client.get_daily_rollups(days=3)
+
+            mock_db.get_all.assert_called_once()
+            assert len(mock_db.get_all.call_args.args[0]) == 3
+            assert [r["date"] for r in rollups][0] == today
+            assert rollups[1]["calories"] == 0
+            assert sum_rollups(rollups)["calories"] == 1200
+            assert sum_rollups(rollups)["meal_count"] == 2
+
+
+async def _stream(docs):
+    for doc in docs:
+        yield doc
+
+
+@pytest.mark.asyncio
+async def test_async_log_workout():
+    """Test logging a workout through the async client."""
+    with patch("src.storage.firestore.firebase_admin") as mock_firebase:
+        with patch("src.storage.firestore.firestore_async") as mock_firestore_async:
+            mock_firebase._apps = []
+            mock_db = MagicMock()
+            mock_firestore_async.client.return_value = mock_db
+
+            mock_doc_ref = MagicMock()
+            mock_doc_ref.id = "async123"
+            mock_doc_ref.get = AsyncMock(return_value=MagicMock(exists=False))
+            mock_db.collection.return_value.document.return_value.collection.return_value.document.return_value = mock_doc_ref
+            transaction = _transaction(mock_db, async_=True)
+
+            from src.storage.firestore import AsyncFirestoreClient
+            AsyncFirestoreClient._instance = None
+            AsyncFirestoreClient._initialized = False
+
+            client = AsyncFirestoreClient()
+
+            result = await client.log_workout(workout_type="run", duration_mins=30)
+
+            mock_doc_ref.get.assert_awaited_once_with(transaction=transaction)
+            assert transaction.set.call_count == 3
+            transaction._commit.assert_awaited_once()
+            assert result == "async123"
+
+
+@pytest.mark.asyncio
+async def test_async_get_last_workout_date():
+    """Test the async client falls back to the newest workout without an activity doc."""
+    with patch("src.storage.firestore.firebase_admin") as mock_firebase:
+        with patch("src.storage.firestore.firestore_async") as mock_firestore_async:
+            mock_firebase._apps = []
+            mock_db = MagicMock()
+            mock_firestore_async.client.return_value = mock_db
+
+            mock_doc = MagicMock()
+            mock_doc.to_dict.return_value = {"timestamp": "2026-02-01T07:00:00"}
+            mock_query = MagicMock()
+            mock_query.stream.side_effect = lambda: _stream([mock_doc])
+            entries = mock_db.collection.return_value.document.return_value.collection.return_value
+            entries.order_by.return_value.limit.return_value = mock_query
+            entries.document.return_value.get = AsyncMock(return_value=MagicMock(exists=False))
+
+            from src.storage.firestore import AsyncFirestoreClient
+            AsyncFirestoreClient._instance = None
+            AsyncFirestoreClient._initialized = False
+
+            client = AsyncFirestoreClient()
+
+            assert await client.get_last_workout_date() == "2026-02-01T07:00:00"
+
+
+def test_query_cache_invalidated_by_matching_writes():
+    """Test repeated reads hit the cache and writes only drop affected queries."""
+    with patch("src.storage.firestore.firebase_admin") as mock_firebase:
+        with patch("src.storage.firestore.firestore") as mock_firestore:
+            mock_firebase._apps = []
+            mock_db = MagicMock()
+            mock_firestore.client.return_value = mock_db
+
+            entries = mock_db.collection.return_value.document.return_value.collection.return_value
+            mock_query = entries.where.return_value.order_by.return_value
+            mock_query.stream.return_value = []
+
+            from src.storage.firestore import FirestoreClient, query_cache
+            FirestoreClient._instance = None
+            FirestoreClient._initialized = False
+
+            client = FirestoreClient()
+            client.get_workouts(days=3)
+            client.get_workouts(days=3)
+            client.get_meals(days=1)
+            assert mock_query.stream.call_count == 2
+            assert query_cache.stats()["hits"] == 1
+
+            client.log_workout(workout_type="run", duration_mins=30)
+            client.get_meals(days=1)
+            assert mock_query.stream.call_count == 2
+
+            client.get_workouts(days=3)
+            assert mock_query.stream.call_count == 3
+
+
+def test_logs_are_partitioned_per_user():
+    """Test entries and rollups are written under users/{user_id}/."""
+    with patch("src.storage.firestore.firebase_admin") as mock_firebase:
+        with patch("src.storage.firestore.firestore") as mock_firestore:
+            mock_firebase._apps = []
+            mock_db = MagicMock()
+            mock_firestore.client.return_value = mock_db
+
+            from src.storage.firestore import FirestoreClient
+            FirestoreClient._instance = None
+            FirestoreClient._initialized = False
+
+            transaction = _transaction(mock_db)
+            client = FirestoreClient()
+            client.log_meal(
+                meal_type="lunch", calories=650, protein=45, carbs=70, fat=18,
+                description="Chipotle bowl", user_id="15551234567",
+            )
+
+            mock_db.collection.assert_called_with("users")
+            mock_db.collection.return_value.document.assert_called_with("15551234567")
+            user_doc = mock_db.collection.return_value.document.return_value
+            assert [c.args[0] for c in user_doc.collection.call_args_list] == ["meals", "rollups", "state", "state"]
+            entry = transaction.set.call_args_list[0].args[1]
+            assert entry["user_id"] == "15551234567"
+
+
+def test_aggregate_meals_falls_back_to_projection():
+    """Test meal totals stream only numeric fields when aggregation is unavailable."""
+    with patch("src.storage.firestore.firebase_admin") as mock_firebase:
+        with patch("src.storage.firestore.firestore") as mock_firestore:
+            mock_firebase._apps = []
+            mock_db = MagicMock()
+            mock_firestore.client.return_value = mock_db
+
+            mock_query = mock_db.collection.return_value.document.return_value.collection.return_value.where.return_value.order_by.return_value
+            mock_query.count.side_effect = NotImplementedError
+            meals = []
+            for calories in (500, 700):
+                doc = MagicMock()
+                doc.to_dict.return_value = {"calories": calories, "protein": 30, "carbs": 50, "fat": 20}
+                meals.append(doc)
+            mock_query.select.return_value.stream.return_value = meals
+
+            from src.storage.firestore import FirestoreClient
+            FirestoreClient._instance = None
+            FirestoreClient._initialized = False
+
+            totals = FirestoreClient().aggregate_meals(days=1, user_id="keith")
+
+            mock_query.select.assert_called_once_with(("calories", "protein", "carbs", "fat"))
+            assert totals == {"count": 2, "calories": 1200, "protein": 60, "carbs": 100, "fat": 40}
+
+
+def _activity_client(mock_db, state):
+    """FirestoreClient whose activity doc point read returns ``state``."""
+    from src.storage.firestore import FirestoreClient
+    FirestoreClient._instance = None
+    FirestoreClient._initialized = False
+
+    activity_ref = mock_db.collection.return_value.document.return_value.collection.return_value.document.return_value
+    activity_ref.get.return_value = MagicMock(exists=state is not None, to_dict=MagicMock(return_value=state))
+    return FirestoreClient(), activity_ref
+
+
+def test_get_last_workout_date_reads_activity_doc():
+    """Test the last workout comes from one point read, then the cache."""
+    with patch("src.storage.firestore.firebase_admin") as mock_firebase:
+        with patch("src.storage.firestore.firestore") as mock_firestore:
+            mock_firebase._apps = []
+            mock_db = MagicMock()
+            mock_firestore.client.return_value = mock_db
+
+            client, activity_ref = _activity_client(mock_db, {"last_workout_at": "2026-02-01T07:00:00"})
+
+            assert client.get_last_workout_date() == "2026-02-01T07:00:00"
+            assert client.get_last_workout_date() == "2026-02-01T07:00:00"
+
+            activity_ref.get.assert_called_once()
+            entries = mock_db.collection.return_value.document.return_value.collection.return_value
+            entries.order_by.assert_not_called()
+
+
+def test_log_workout_advances_activity_state():
+    """Test logging advances the streak and today's totals from the transaction's read."""
+    from src.storage.base import local_today
+    from datetime import timedelta
+
+    today = local_today()
+    yesterday = (today - timedelta(days=1)).isoformat()
+    stored = {
+        "last_workout_day": yesterday,
+        "streak_days": 4,
+        "today": {"date": today.isoformat(), "workout_count": 0, "workout_minutes": 0, "meal_count": 2,
+                  "calories": 900, "protein": 60, "carbs": 80, "fat": 30},
+    }
+    with patch("src.storage.firestore.firebase_admin") as mock_firebase:
+        with patch("src.storage.firestore.firestore") as mock_firestore:
+            mock_firebase._apps = []
+            mock_db = MagicMock()
+            mock_firestore.client.return_value = mock_db
+
+            transaction = _transaction(mock_db)
+            client, activity_ref = _activity_client(mock_db, stored)
+            client.log_workout(workout_type="run", duration_mins=30)
+
+            activity_ref.get.assert_called_once_with(transaction=transaction)
+            update = transaction.set.call_args_list[2].args[1]
+            assert update["streak_days"] == 5
+            assert update["last_workout_day"] == today.isoformat()
+            mock_firestore.Increment.assert_any_call(30)
+            assert update["data_version"] == mock_firestore.Increment.return_value
+
+            state = client.get_activity_state()
+            assert state["streak_days"] == 5
+            assert state["data_version"] == 1
+            assert state["today"]["workout_minutes"] == 30
+            assert state["today"]["calories"] == 900
+            activity_ref.get.assert_called_once()
+
+
+def test_rebuild_activity_state_from_rollups():
+    """Test the repair job rebuilds the streak from rollups and stores the doc in one transaction."""
+    with patch("src.storage.firestore.firebase_admin") as mock_firebase:
+        with patch("src.storage.firestore.firestore") as mock_firestore:
+            mock_firebase._apps = []
+            mock_db = MagicMock()
+            mock_firestore.client.return_value = mock_db
+
+            from src.storage.base import rollup_day_keys
+            day_keys = rollup_day_keys(5)
+            snapshots = []
+            for key in day_keys[1:4]:
+                snapshot = MagicMock(id=key, exists=True)
+                snapshot.to_dict.return_value = {"date": key, "workout_count": 1, "workout_minutes": 40}
+                snapshots.append(snapshot)
+            mock_db.get_all.return_value = snapshots
+            transaction = _transaction(mock_db)
+
+            client, activity_ref = _activity_client(mock_db, None)
+            last_workout = MagicMock()
+            last_workout.to_dict.return_value = {"timestamp": "yesterday"}
+            entries = mock_db.collection.return_value.document.return_value.collection.return_value
+            entries.order_by.return_value.limit.return_value.stream.return_value = [last_workout]
+
+            state = client.rebuild_activity_state()
+
+            # Today has no workout yet, so the three-day streak is still alive
+            assert state["streak_days"] == 3
+            assert state["last_workout_day"] == day_keys[1]
+            assert state["last_workout_at"] == "yesterday"
+            assert mock_db.get_all.call_args.kwargs == {"transaction": transaction}
+            activity_ref.get.assert_called_once_with(transaction=transaction)
+            transaction.set.assert_called_once()
+            assert transaction.set.call_args.args[0] is activity_ref
+            activity_ref.set.assert_not_called()
+            assert client.get_last_workout_date() == "yesterday"
+
+
+def test_second_log_of_the_day_is_a_blind_batch():
+    """Test only the day's first log reads the activity doc; later ones are increments in a batch."""
+    with patch("src.storage.firestore.firebase_admin") as mock_firebase:
+        with patch("src.storage.firestore.firestore") as mock_firestore:
+            mock_firebase._apps = []
+            mock_db = MagicMock()
+            mock_firestore.client.return_value = mock_db
+            transaction = _transaction(mock_db)
+
+            client, activity_ref = _activity_client(mock_db, None)
+            client.log_meal(meal_type="breakfast", calories=400, protein=20, carbs=50, fat=10, description="oats")
+            client.log_meal(meal_type="lunch", calories=600, protein=40, carbs=60, fat=20, description="bowl")
+
+            activity_ref.get.assert_called_once_with(transaction=transaction)
+            transaction._commit.assert_called_once()
+            batch = mock_db.batch.return_value
+            batch.commit.assert_called_once()
+            activity_update = batch.set.call_args_list[2].args[1]
+            assert "streak_days" not in activity_update
+            assert activity_update["data_version"] == mock_firestore.Increment.return_value
+            assert client.get_activity_state()["today"]["calories"] == 1000
+
+
+def test_log_invalidates_cached_queries_after_commit():
+    """Test a read racing the commit can't re-cache the rows from before the write."""
+    with patch("src.storage.firestore.firebase_admin") as mock_firebase:
+        with patch("src.storage.firestore.firestore") as mock_firestore:
+            mock_firebase._apps = []
+            mock_db = MagicMock()
+            mock_firestore.client.return_value = mock_db
+            transaction = _transaction(mock_db)
+
+            from src.storage.firestore import FirestoreClient, query_cache
+            FirestoreClient._instance = None
+            FirestoreClient._initialized = False
+            client = FirestoreClient()
+
+            def commit(*args, **kwargs):
+                # A read between invalidation and commit caches the old rows
+                query_cache.set(("workouts", "default", 7), [])
+                return []
+            transaction._commit.side_effect = commit
+
+            client.log_workout(workout_type="run", duration_mins=30)
+
+            assert query_cache.get(("workouts", "default", 7)) is None
@@ -0,0 +1,121 @@
+# tests/test_mem0_client.py
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _reply(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        body = b"[]"
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = _reply
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_memory_wrappers_share_one_client():
+    """Test every MemoryWrapper uses the one pooled client, built once."""
+    with patch.dict(os.environ, {"MEM0_API_KEY": "test-key"}):
+        with patch("src.storage.mem0_client.MemoryClient") as mock_mem0, \
+                patch("src.storage.memory.memory_indexes.enabled", False):
+            mock_mem0.return_value.search.return_value = []
+
+            from src.storage.mem0_client import mem0_pool
+            from src.storage.memory import MemoryWrapper
+
+            for user_id in ("keith", "sam", "alex"):
+                MemoryWrapper(user_id=user_id).search("workouts")
+
+            mock_mem0.assert_called_once()
+            http_client = mock_mem0.call_args.kwargs["client"]
+            assert http_client._transport._pool._max_connections == mem0_pool.pool_size
+            assert mock_mem0.return_value.search.call_count == 3
+            assert mem0_pool.stats()["sync"]["clients"] == 1
+
+
+def test_pooled_http_client_reuses_connections(server_url):
+    """Test sequential requests ride one kept-alive connection and are counted as reuse."""
+    from src.storage.mem0_client import Mem0Pool
+
+    pool = Mem0Pool(pool_size=4)
+    with pool._http_client() as http:
+        for _ in range(5):
+            assert http.post(f"{server_url}/v1/memories/search/", json={"query": "x"}).json() == []
+
+    stats = pool.stats()["sync"]
+    assert stats["requests"] == 5
+    assert stats["connections"] == 1
+    assert stats["reused"] == 4
+    assert stats["reuse_ratio"] == 0.8
+
+
+@pytest.mark.asyncio
+async def test_async_client_reused_within_a_loop(server_url):
+    """Test the async client is built once per loop and its connections are reused."""
+    with patch.dict(os.environ, {"MEM0_API_KEY": "test-key"}):
+        with patch("src.storage.mem0_client.AsyncMemoryClient") as mock_mem0:
+            from src.storage.mem0_client import mem0_pool
+
+            first = await mem0_pool.async_client()
+            second = await mem0_pool.async_client()
+
+            assert first is second
+            mock_mem0.assert_called_once()
+            http = mock_mem0.call_args.kwargs["client"]
+            for _ in range(3):
+                await http.get(f"{server_url}/v1/ping/")
+            await mem0_pool.aclose()
+
+    stats = mem0_pool.stats()["async"]
+    assert (stats["clients"], stats["requests"], stats["connections"]) == (1, 3, 1)
+
+
+@pytest.mark.asyncio
+async def test_async_search_falls_back_to_mem0_while_index_syncs():
+    """Test async search doesn't wait on the first index sync."""
+    with patch.dict(os.environ, {"MEM0_API_KEY": "test-key", "MEMORY_EMBEDDER": "hashing"}):
+        with patch("src.storage.mem0_client.AsyncMemoryClient") as mock_async, \
+                patch("src.storage.memory.memory_indexes.enabled", True), \
+                patch("src.storage.memory_index.MemoryIndexes._sync_in_background") as background:
+            mock_async.return_value.search = AsyncMock(return_value=[{"memory": "User hates burpees", "score": 0.9}])
+
+            from src.storage.memory import MemoryWrapper, ScoredMemory
+
+            found = await MemoryWrapper(user_id="keith").search_scored_async("burpees", limit=3)
+
+            assert found == [ScoredMemory("User hates burpees", 0.9)]
+            background.assert_called_once_with(None, "keith")
+            mock_async.return_value.search.assert_awaited_once_with("burpees", user_id="keith", limit=3)
+
+
+def test_no_api_key_builds_no_client():
+    """Test memory is a no-op without MEM0_API_KEY."""
+    with patch.dict(os.environ, {}, clear=True):
+        with patch("src.storage.mem0_client.MemoryClient", MagicMock()) as mock_mem0:
+            from src.storage.memory import MemoryWrapper
+
+            assert MemoryWrapper(user_id="keith").search("anything") == []
+            mock_mem0.assert_not_called()
@@ -7,7 +7,7 @@ import os
 def test_memory_search():
     """Test searching memories."""
     with patch.dict(os.environ, {"MEM0_API_KEY": "test-key"}):
-        with patch("src.storage.memory.MemoryClient") as mock_mem0:
+        with patch("src.storage.mem0_client.MemoryClient") as mock_mem0:
             mock_client = MagicMock()
             mock_mem0.return_value = mock_client
             mock_client.search.return_value = {
@@ -29,7 +29,7 @@ def test_memory_search():
 def test_memory_add():
     """Test adding memories."""
     with patch.dict(os.environ, {"MEM0_API_KEY": "test-key"}):
-        with patch("src.storage.memory.MemoryClient") as mock_mem0:
+        with patch("src.storage.mem0_client.MemoryClient") as mock_mem0:
             mock_client = MagicMock()
             mock_mem0.return_value = mock_client
 
@@ -43,7 +43,7 @@ def test_memory_add():
 
 def test_memory_format():
     """Test formatting memories for prompts."""
-    with patch("src.storage.memory.MemoryClient") as mock_mem0:
+    with patch("src.storage.mem0_client.MemoryClient") as mock_mem0:
         mock_mem0.return_value = MagicMock()
 
         from src.storage.memory import MemoryWrapper
@@ -57,7 +57,7 @@ def test_memory_format():
 
 def test_memory_format_empty():
     """Test formatting empty memories."""
-    with patch("src.storage.memory.MemoryClient") as mock_mem0:
+    with patch("src.storage.mem0_client.MemoryClient") as mock_mem0:
         mock_mem0.return_value = MagicMock()
 
         from src.storage.memory import MemoryWrapper
@@ -83,3 +83,26 @@ def test_memory_no_api_key():
 
         # Should not raise
         wrapper.add("test")
+
+
+def test_memory_search_scored():
+    """Test scored search keeps Mem0's relevance scores."""
+    with patch.dict(os.environ, {"MEM0_API_KEY": "test-key"}):
+        with patch("src.storage.mem0_client.MemoryClient") as mock_mem0:
+            mock_client = MagicMock()
+            mock_mem0.return_value = mock_client
+            mock_client.search.return_value = [
+                {"memory": "User prefers morning workouts", "score": 0.82},
+                {"memory": "User is training for a marathon"},
+            ]
+
+            from src.storage.memory import MemoryWrapper, ScoredMemory
+            wrapper = MemoryWrapper(user_id="keith")
+
+            results = wrapper.search_scored("workout preferences", limit=5)
+
+            assert results == [
+                ScoredMemory("User prefers morning workouts", 0.82),
+                ScoredMemory("User is training for a marathon", None),
+            ]
+            mock_client.search.assert_called_once_with("workout preferences", user_id="keith", limit=5)
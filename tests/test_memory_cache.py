@@ -0,0 +1,74 @@
+# tests/test_memory_cache.py
+import os
+import time
+from unittest.mock import MagicMock, patch
+
+from src.storage.memory_cache import MemorySearchCache, normalize_query
+
+
+def test_normalize_query():
+    """Test queries differing only in case, spacing or end punctuation share a key."""
+    assert normalize_query("  Recent activity\n and MOOD? ") == "recent activity and mood"
+
+
+def test_repeated_search_served_from_cache_until_a_write():
+    """Test a repeated query skips Mem0 until the user's memories change."""
+    with patch.dict(os.environ, {"MEM0_API_KEY": "test-key"}):
+        with patch("src.storage.mem0_client.MemoryClient") as mock_mem0, \
+                patch("src.storage.memory.memory_indexes.enabled", False):
+            mock_client = mock_mem0.return_value
+            mock_client.search.return_value = [{"memory": "User prefers morning workouts", "score": 0.8}]
+
+            from src.storage.memory import MemoryWrapper
+            from src.storage.memory_cache import memory_search_cache
+
+            memory = MemoryWrapper(user_id="keith")
+            first = memory.search("recent activity and mood")
+            assert memory.search("Recent activity and mood") == first
+            assert MemoryWrapper(user_id="keith").search("recent activity and mood ") == first
+            assert mock_client.search.call_count == 1
+
+            memory.search("recent activity and mood", limit=3)
+            MemoryWrapper(user_id="sam").search("recent activity and mood")
+            assert mock_client.search.call_count == 3
+
+            memory.add_conversation([{"role": "user", "content": "I switched to evening runs"}])
+            memory.search("recent activity and mood")
+            assert mock_client.search.call_count == 4
+
+            stats = memory_search_cache.stats()
+            assert (stats["hits"], stats["misses"], stats["bumps"]) == (2, 4, 1)
+            assert stats["hit_rate"] == 0.333
+
+
+def test_index_sync_bumps_version_only_on_change():
+    """Test an index sync invalidates cached searches only when memories changed."""
+    from src.storage.memory_cache import memory_search_cache
+    from src.storage.memory_index import HashingEmbedder, MemoryIndexes
+
+    memories = [{"id": "m1", "memory": "User hates burpees", "updated_at": "2026-01-01T00:00:00"}]
+    client = MagicMock()
+    client.get_all.return_value = {"count": 1, "next": None, "results": memories}
+    indexes = MemoryIndexes()
+    indexes._embedder = HashingEmbedder()
+
+    indexes.sync(client, "keith")
+    assert memory_search_cache.version("keith") == 1
+
+    indexes.sync(client, "keith")  # incremental sync re-reads the newest memory, unchanged
+    assert memory_search_cache.version("keith") == 1
+
+    client.get_all.return_value = {"count": 1, "next": None, "results": [{**memories[0], "memory": "User likes burpees now"}]}
+    indexes.sync(client, "keith")
+    assert memory_search_cache.version("keith") == 2
+
+
+def test_cached_searches_expire():
+    """Test entries expire after the TTL."""
+    cache = MemorySearchCache(ttl=0.05)
+    key = cache.key_for("keith", "fitness coaching conversation", 20)
+    cache.set(key, ["Likes kettlebells"])
+
+    assert cache.get(key) == ["Likes kettlebells"]
+    time.sleep(0.06)
+    assert cache.get(key) is None
@@ -0,0 +1,165 @@
+# tests/test_memory_index.py
+import os
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from src.storage.memory_index import HashingEmbedder, MemoryIndex, MemoryIndexes, fetch_memories, memory_indexes
+
+MEMORIES = [
+    {"id": "m1", "memory": "User prefers morning workouts", "updated_at": "2026-01-01T08:00:00"},
+    {"id": "m2", "memory": "User is training for a marathon in April", "updated_at": "2026-01-02T08:00:00"},
+    {"id": "m3", "memory": "User's knee hurts after long runs", "updated_at": "2026-01-03T08:00:00"},
+]
+
+
+@pytest.fixture(autouse=True)
+def hashing_index():
+    """Opt in to the index, with the offline embedder."""
+    with patch.dict(os.environ, {"MEMORY_EMBEDDER": "hashing"}), patch.object(memory_indexes, "enabled", True):
+        yield
+
+
+def _client(*pages):
+    client = MagicMock()
+    client.get_all.side_effect = [{"count": len(page), "next": None, "results": page} for page in pages]
+    return client
+
+
+def test_hashing_embedder_is_deterministic_and_unit_length():
+    """Test the offline embedder gives the same unit vectors every time."""
+    first = HashingEmbedder().embed(["ran 5k this morning", ""])
+    second = HashingEmbedder().embed(["ran 5k this morning", ""])
+
+    assert np.array_equal(first, second)
+    assert np.isclose(np.linalg.norm(first[0]), 1.0)
+    assert not first[1].any()
+
+
+def test_index_search_ranks_by_similarity():
+    """Test search returns the closest memories first, and upserts replace by id."""
+    index = MemoryIndex(HashingEmbedder())
+    index.upsert(MEMORIES)
+
+    found = index.search("marathon training plan", limit=2)
+    assert [text for text, _ in found][0] == "User is training for a marathon in April"
+    assert len(found) == 2 and found[0][1] > found[1][1]
+
+    index.upsert([{"id": "m2", "memory": "User finished their marathon", "updated_at": "2026-02-01T08:00:00"}])
+    assert len(index) == 3
+    assert index.search("marathon", limit=1)[0][0] == "User finished their marathon"
+    assert index.cursor == "2026-02-01T08:00:00"
+
+
+def test_incremental_sync_then_full_sync_drops_deleted():
+    """Test syncs fetch changes since the cursor, and a full sync removes deleted memories."""
+    client = _client(MEMORIES[:2], MEMORIES[2:], MEMORIES[1:])
+    indexes = MemoryIndexes(full_sync_interval=3600)
+
+    assert indexes.sync(client, "keith")
+    assert indexes.sync(client, "keith")
+    second = client.get_all.call_args.kwargs["filters"]
+    assert second == {"AND": [{"user_id": "keith"}, {"updated_at": {"gte": "2026-01-02T08:00:00"}}]}
+    assert set(indexes._entry("keith").index.ids) == {"m1", "m2", "m3"}
+
+    assert indexes.sync(client, "keith", full=True)
+    assert client.get_all.call_args.kwargs["filters"] == {"user_id": "keith"}
+    assert set(indexes._entry("keith").index.ids) == {"m2", "m3"}
+    assert indexes.stats()["full_syncs"] == 2
+
+
+def test_fetch_memories_follows_pages():
+    """Test every page of a user's memories is fetched."""
+    client = MagicMock()
+    client.get_all.side_effect = [
+        {"count": 3, "next": "page-2", "results": MEMORIES[:2]},
+        {"count": 3, "next": None, "results": MEMORIES[2:]},
+    ]
+
+    assert fetch_memories(client, "keith", page_size=2) == MEMORIES
+    assert client.get_all.call_args.kwargs["page"] == 2
+
+
+def test_index_persists_to_disk(tmp_path):
+    """Test a restarted process serves searches from the saved index."""
+    indexes = MemoryIndexes(directory=str(tmp_path))
+    indexes.sync(_client(MEMORIES), "keith")
+
+    restarted = MemoryIndexes(directory=str(tmp_path), sync_interval=3600)
+    restarted._entry("keith").synced_at = float("inf")  # don't start a background sync
+    client = MagicMock()
+
+    found = restarted.search(client, "keith", "knee pain", limit=1)
+
+    assert found[0][0] == "User's knee hurts after long runs"
+    client.get_all.assert_not_called()
+
+
+def test_memory_wrapper_searches_local_index():
+    """Test MemoryWrapper answers from the index once synced, without Mem0 search calls."""
+    with patch.dict(os.environ, {"MEM0_API_KEY": "test-key"}):
+        with patch("src.storage.mem0_client.MemoryClient") as mock_mem0:
+            mock_client = MagicMock()
+            mock_mem0.return_value = mock_client
+            mock_client.get_all.return_value = {"count": 3, "next": None, "results": MEMORIES}
+
+            from src.storage.memory import MemoryWrapper
+            wrapper = MemoryWrapper(user_id="keith")
+
+            first = wrapper.search_scored("morning workouts", limit=2)
+            second = wrapper.search("marathon", limit=1)
+
+            assert first[0].text == "User prefers morning workouts" and first[0].score > 0.5
+            assert second == ["User is training for a marathon in April"]
+            mock_client.get_all.assert_called_once()
+            mock_client.search.assert_not_called()
+
+
+def test_memory_wrapper_falls_back_to_mem0_when_sync_fails():
+    """Test search goes to Mem0 while the index can't sync."""
+    with patch.dict(os.environ, {"MEM0_API_KEY": "test-key"}):
+        with patch("src.storage.mem0_client.MemoryClient") as mock_mem0:
+            mock_client = MagicMock()
+            mock_mem0.return_value = mock_client
+            mock_client.get_all.side_effect = ConnectionError("mem0 down")
+            mock_client.search.return_value = [{"memory": "User hates burpees", "score": 0.9}]
+
+            from src.storage.memory import MemoryWrapper
+            wrapper = MemoryWrapper(user_id="keith")
+
+            assert wrapper.search("burpees") == ["User hates burpees"]
+            assert wrapper.search("burpees") == ["User hates burpees"]
+            # The failed start isn't retried on every search
+            mock_client.get_all.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_async_search_reads_index_off_the_loop():
+    """Test the async search does the index lookup and query embedding in a worker thread."""
+    import threading
+
+    threads = []
+
+    def search(*args, **kwargs):
+        threads.append(threading.current_thread())
+        return [("User prefers morning workouts", 0.9)]
+
+    with patch.dict(os.environ, {"MEM0_API_KEY": "test-key"}), \
+            patch("src.storage.memory.memory_indexes.search", side_effect=search):
+        from src.storage.memory import MemoryWrapper
+        found = await MemoryWrapper(user_id="keith").search_scored_async("mornings", limit=1)
+
+    assert found[0].text == "User prefers morning workouts"
+    assert threads[0] is not threading.current_thread()
+
+
+def test_index_is_opt_in_and_embeds_with_openai_by_default():
+    """Test production defaults: Mem0 search unless enabled, and a semantic embedder."""
+    from src.storage.memory_index import get_embedder
+
+    assert MemoryIndexes().enabled is False
+    with patch.dict(os.environ, {}, clear=False):
+        os.environ.pop("MEMORY_EMBEDDER", None)
+        with patch("src.storage.memory_index.OpenAIEmbedder") as mock_openai:
+            assert get_embedder() is mock_openai.return_value
@@ -0,0 +1,74 @@
+# tests/test_memory_packer.py
+import os
+from unittest.mock import MagicMock, patch
+
+from src.agent.memory_packer import ChannelBudget, pack, packer_stats, similarity
+from src.storage.memory import ScoredMemory
+
+
+def test_pack_drops_low_score_and_duplicates():
+    """Test memories under the relevance floor and near-duplicates are dropped."""
+    memories = [
+        ScoredMemory("User likes morning workouts", 0.9),
+        ScoredMemory("user likes morning workouts!", 0.8),
+        ScoredMemory("User is training for a marathon", 0.7),
+        ScoredMemory("User once mentioned a dentist appointment", 0.1),
+    ]
+
+    packed = pack(memories, ChannelBudget(max_tokens=500, min_score=0.3))
+
+    assert packed.memories == ["User likes morning workouts", "User is training for a marathon"]
+    assert packed.dropped_duplicate == 1
+    assert packed.dropped_low_score == 1
+    assert packed.tokens_saved > 0
+
+
+def test_pack_fits_token_budget_in_rank_order():
+    """Test memories are kept in rank order while they fit, skipping ones that don't."""
+    memories = [
+        ScoredMemory("Hates burpees", 0.9),
+        ScoredMemory("Long story about " + "a very long trip " * 20, 0.8),
+        ScoredMemory("Vegetarian", 0.7),
+    ]
+
+    packed = pack(memories, ChannelBudget(max_tokens=12))
+
+    assert packed.memories == ["Hates burpees", "Vegetarian"]
+    assert packed.dropped_over_budget == 1
+    assert packed.tokens_out <= 12
+
+
+def test_unscored_memories_are_kept():
+    """Test memories without a score aren't cut by the relevance floor."""
+    packed = pack([ScoredMemory("Runs on Sundays")], ChannelBudget(min_score=0.5))
+
+    assert packed.memories == ["Runs on Sundays"]
+
+
+def test_similarity():
+    """Test word-set similarity ignores case and punctuation."""
+    assert similarity("Likes squats.", "likes squats") == 1.0
+    assert similarity("Likes squats", "Hates running") == 0.0
+
+
+def test_memory_context_uses_channel_budget():
+    """Test channel budgets come from config and packing is recorded per channel."""
+    with patch.dict(os.environ, {"STORAGE_BACKEND": "memory"}):
+        from src.agent.memory_packer import memory_context
+        from src.config.snapshot import config_store
+
+        config_store.apply("memory", {"channels": {"voice": {"limit": 3, "min_score": 0.5}}})
+        memory = MagicMock()
+        memory.search_scored.return_value = [
+            ScoredMemory("Likes kettlebells", 0.9),
+            ScoredMemory("Mentioned the weather", 0.2),
+        ]
+
+        assert memory_context(memory, "coaching", "voice") == ["Likes kettlebells"]
+
+        memory.search_scored.assert_called_once_with("coaching", limit=3)
+        voice = packer_stats.stats()["voice"]
+        assert voice["packs"] == 1
+        assert voice["kept"] == 1
+        assert voice["dropped_low_score"] == 1
+        assert voice["tokens_saved"] == voice["tokens_in"] - voice["tokens_out"]
@@ -0,0 +1,100 @@
+# tests/test_memory_persister.py
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.storage.memory_persister import MemoryPersister
+
+
+def _turn(text):
+    return [{"role": "user", "content": text}, {"role": "assistant", "content": "ok"}]
+
+
+@pytest.mark.asyncio
+async def test_turns_are_batched_per_user():
+    """Test queued turns reach Mem0 as one add() call per user."""
+    persister = MemoryPersister(flush_interval=10)
+    memories = {"keith": MagicMock(), "sam": MagicMock()}
+    with patch.object(persister, "_memory", side_effect=memories.get):
+        await persister.start()
+        persister.persist("keith", _turn("did legs"))
+        persister.persist("keith", _turn("ate oats"))
+        persister.persist("sam", _turn("ran 5k"))
+        memories["keith"].add_conversation.assert_not_called()
+
+        await persister.stop()
+
+    memories["keith"].add_conversation.assert_called_once_with(_turn("did legs") + _turn("ate oats"), metadata=None)
+    memories["sam"].add_conversation.assert_called_once()
+    assert persister.stats()["written"] == 6
+    assert persister.stats()["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_full_batch_flushes_without_waiting():
+    """Test reaching batch_size wakes the worker before the flush interval."""
+    persister = MemoryPersister(batch_size=2, flush_interval=10)
+    memory = MagicMock()
+    with patch.object(persister, "_memory", return_value=memory):
+        await persister.start()
+        persister.persist("keith", _turn("a"))
+        persister.persist("keith", _turn("b"))
+        for _ in range(100):
+            if memory.add_conversation.called:
+                break
+            await asyncio.sleep(0.01)
+        assert memory.add_conversation.called
+        await persister.stop()
+
+
+@pytest.mark.asyncio
+async def test_failed_writes_are_retried_with_backoff():
+    """Test transient Mem0 failures are retried and permanent ones are counted."""
+    persister = MemoryPersister(flush_interval=10, max_retries=2, retry_backoff=0)
+    memory = MagicMock()
+    memory.add_conversation.side_effect = [RuntimeError("503"), None]
+    with patch.object(persister, "_memory", return_value=memory):
+        await persister.start()
+        persister.persist("keith", _turn("a"))
+        await persister.stop()
+
+        assert memory.add_conversation.call_count == 2
+        assert persister.stats()["retries"] == 1
+
+        memory.add_conversation.side_effect = RuntimeError("down")
+        persister.persist("keith", _turn("b"))
+        await persister.flush()
+
+    assert persister.stats()["failed"] == 2
+
+
+def test_writes_inline_when_not_running():
+    """Test turns are written immediately outside the app lifespan."""
+    persister = MemoryPersister()
+    memory = MagicMock()
+    with patch.object(persister, "_memory", return_value=memory):
+        persister.persist("keith", _turn("a"), metadata={"type": "voice_call"})
+
+    memory.add_conversation.assert_called_once_with(_turn("a"), metadata={"type": "voice_call"})
+
+
+@pytest.mark.asyncio
+async def test_writes_off_the_loop_after_stop():
+    """Test turns persisted on the event loop after stop() don't block it."""
+    import threading
+
+    persister = MemoryPersister(flush_interval=10)
+    memory = MagicMock()
+    writers = []
+    memory.add_conversation.side_effect = lambda *args, **kwargs: writers.append(threading.current_thread())
+    with patch.object(persister, "_memory", return_value=memory):
+        await persister.start()
+        await persister.stop()
+
+        persister.persist("keith", _turn("a"))
+        memory.add_conversation.assert_not_called()
+        await persister.flush()
+
+    memory.add_conversation.assert_called_once_with(_turn("a"), metadata=None)
+    assert writers[0] is not threading.current_thread()
@@ -0,0 +1,53 @@
+# tests/test_prompts.py
+from types import SimpleNamespace
+
+import pytest
+from agents.usage import Usage
+from openai.types.responses.response_usage import InputTokensDetails
+
+from src.agent import prompts
+
+
+def test_instructions_are_byte_identical_across_calls():
+    """Test instructions depend only on config, whatever the message or memories."""
+    personality = {"prompt": "You are a coach.  \r\nNo excuses.\r\n"}
+
+    first = prompts.instructions(personality, "You are coaching Keith.", prompts.COACH_TOOLS_DOC)
+    second = prompts.instructions(dict(personality), "You are coaching Keith.", prompts.COACH_TOOLS_DOC)
+
+    assert first == second
+    assert first.startswith("You are a coach.\nNo excuses.\n\nYou are coaching Keith.\n\n")
+    assert "\r" not in first
+
+
+def test_segments_ordered_most_stable_first():
+    """Test volatile segments always follow stable ones, whatever order they're passed in."""
+    prompt = prompts.assemble(message="hi", memories="- likes squats", personality="Coach.", user="User.")
+
+    assert prompt.index("Coach.") < prompt.index("User.") < prompt.index("likes squats") < prompt.index("hi")
+    with pytest.raises(ValueError):
+        prompts.assemble(extra="nope")
+
+
+def test_run_input_renders_context_deterministically():
+    """Test equal context dicts render to the same bytes regardless of key order."""
+    a = prompts.run_input("go", ["m1"], {"days_since_workout": 3, "trigger": "no_workout"})
+    b = prompts.run_input("go", ["m1"], {"trigger": "no_workout", "days_since_workout": 3})
+
+    assert a == b
+    assert a.index("[Context from past conversations:]") < a.index("[Current context:]") < a.index("[User message:]")
+
+
+def test_prompt_cache_stats_from_run_usage():
+    """Test cached and uncached input tokens are recorded from run usage."""
+    stats = prompts.PromptCacheStats()
+    usage = Usage(requests=2, input_tokens=2000, input_tokens_details=InputTokensDetails(cached_tokens=1536, cache_write_tokens=0))
+
+    stats.record("coach", SimpleNamespace(context_wrapper=SimpleNamespace(usage=usage)))
+    stats.record("coach", SimpleNamespace())  # results without usage are skipped
+
+    coach = stats.stats()["coach"]
+    assert coach["runs"] == 1
+    assert coach["cached_tokens"] == 1536
+    assert coach["uncached_tokens"] == 464
+    assert coach["hit_rate"] == pytest.approx(0.768)
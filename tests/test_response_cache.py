@@ -0,0 +1,92 @@
+# tests/test_response_cache.py
+import os
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.agent.intent import classify
+from src.agent.response_cache import response_cache
+
+
+def test_classify_normalizes_progress_questions():
+    """Test phrasings of the same question share an intent and other messages don't."""
+    assert classify("How am I doing this week?") == "progress:week"
+    assert classify("hey coach, how's my week going") == "progress:week"
+    assert classify("how am i doing this week lol") == "progress:week"
+    assert classify("When was my last workout?") == "last_workout"
+    assert classify("how many calories have I eaten today") == "nutrition:today"
+
+    assert classify("how am I doing? also ran 5k") is None
+    assert classify("should I run today?") is None
+    assert classify("I'm doing great") is None
+
+
+@pytest.mark.asyncio
+async def test_repeat_questions_cached_until_new_log():
+    """Test a repeated question skips the agent until a new log changes the data version."""
+    with patch.dict(os.environ, {"STORAGE_BACKEND": "memory"}), \
+            patch("src.agent.coach.Runner") as mock_runner:
+        mock_runner.run = AsyncMock(side_effect=[
+            MagicMock(final_output="Two workouts. Lazy."),
+            MagicMock(final_output="Three workouts. Better."),
+        ])
+
+        from src.agent.coach import chat_async
+
+        assert await chat_async("How am I doing this week?", user_id="keith") == "Two workouts. Lazy."
+        assert await chat_async("how's my week going", user_id="keith") == "Two workouts. Lazy."
+        assert mock_runner.run.await_count == 1
+
+        await chat_async("ran 5k 28 min", user_id="keith")
+        assert await chat_async("How am I doing this week?", user_id="keith") == "Three workouts. Better."
+        assert mock_runner.run.await_count == 2
+
+        stats = response_cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 2
+        assert stats["stores"] == 2
+
+
+@pytest.mark.asyncio
+async def test_response_cache_personality_toggle():
+    """Test personalities can turn the response cache off."""
+    with patch.dict(os.environ, {"STORAGE_BACKEND": "memory"}), \
+            patch("src.agent.coach.Runner") as mock_runner:
+        mock_runner.run = AsyncMock(return_value=MagicMock(final_output="Keep going."))
+
+        from src.agent.coach import chat_async
+        from src.config.snapshot import config_store
+        config_store.apply("personality", {
+            "active": "fresh", "presets": {"fresh": {"prompt": "You are a coach", "response_cache": False}},
+        })
+
+        await chat_async("How am I doing this week?", user_id="keith")
+        await chat_async("How am I doing this week?", user_id="keith")
+
+        assert mock_runner.run.await_count == 2
+        assert response_cache.stats()["disabled"] == 2
+
+
+@pytest.mark.asyncio
+async def test_slow_data_version_is_a_cache_miss():
+    """Test a data version read that outlasts the activity budget skips the cache instead of stalling."""
+    import asyncio
+
+    async def slow_version(user_id):
+        await asyncio.sleep(5)
+
+    with patch.dict(os.environ, {"STORAGE_BACKEND": "memory"}), \
+            patch("src.agent.coach.ACTIVITY_TIMEOUT", 0.05), \
+            patch("src.agent.coach.Runner") as mock_runner:
+        mock_runner.run = AsyncMock(return_value=MagicMock(final_output="Keep going."))
+
+        from src.agent.coach import chat_async
+        storage = MagicMock(get_data_version=slow_version)
+        with patch("src.agent.response_cache.get_async_storage", return_value=storage):
+            reply = await asyncio.wait_for(chat_async("How am I doing this week?", user_id="keith"), 1)
+
+        assert reply == "Keep going."
+        assert mock_runner.run.await_count == 1
+        stats = response_cache.stats()
+        assert stats["version_timeouts"] == 1
+        assert stats["stores"] == 0
@@ -0,0 +1,65 @@
+# tests/test_router.py
+import os
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from agents.usage import Usage
+
+from src.agent.router import classify_turn, model_router, resolve
+
+CONFIG = {
+    "tiers": {"fast": "gpt-4o-mini", "standard": "gpt-4o"},
+    "default_tier": "standard",
+    "turns": {"log": "fast", "smalltalk": "fast", "quick": "fast", "complex": "standard"},
+    "agents": {"checkin": "fast", "trigger-call": "missing-tier"},
+}
+
+
+@pytest.mark.parametrize("message, turn", [
+    ("ran 5k 28 min", "log"),
+    ("I did 3 sets of 10 squats", "log"),
+    ("thanks!", "smalltalk"),
+    ("good morning coach", "smalltalk"),
+    ("How am I doing this week?", "quick"),
+    ("Can you build me a 12 week marathon plan?", "complex"),
+    ("should I skip today? my knee hurts", "complex"),
+])
+def test_classify_turn(message, turn):
+    """Test turns are classified locally into routing classes."""
+    assert classify_turn(message) == turn
+
+
+def test_resolve_tiers():
+    """Test coach turns route by turn class, other agents by kind, unknowns to the default tier."""
+    assert resolve(CONFIG, "coach", "log") == ("fast", "gpt-4o-mini")
+    assert resolve(CONFIG, "coach", "complex") == ("standard", "gpt-4o")
+    assert resolve(CONFIG, "checkin", "checkin") == ("fast", "gpt-4o-mini")
+    assert resolve(CONFIG, "trigger-call", "trigger-call") == ("standard", "gpt-4o")
+    assert resolve({}, "coach", "quick") == ("standard", "gpt-4o")
+
+
+@pytest.mark.asyncio
+async def test_chat_async_runs_on_routed_model():
+    """Test a coach turn runs on its tier's model and usage is recorded per tier."""
+    usage = Usage(requests=1, input_tokens=900, output_tokens=40)
+    result = MagicMock(final_output="Rest day.", context_wrapper=SimpleNamespace(usage=usage))
+
+    with patch.dict(os.environ, {"STORAGE_BACKEND": "memory"}), \
+            patch("src.agent.coach.Runner") as mock_runner:
+        mock_runner.run = AsyncMock(return_value=result)
+
+        from src.agent.coach import chat_async
+        from src.config.snapshot import config_store
+        config_store.apply("models", CONFIG)
+
+        await chat_async("Can you build me a 12 week marathon plan?", user_id="keith")
+        await chat_async("good morning coach", user_id="keith")
+
+        models = [call.kwargs["run_config"].model for call in mock_runner.run.call_args_list]
+        assert models == ["gpt-4o", "gpt-4o-mini"]
+        stats = model_router.stats()
+        assert stats["standard"]["turns"] == {"complex": 1}
+        assert stats["fast"]["turns"] == {"smalltalk": 1}
+        assert stats["fast"]["input_tokens"] == 900
+        assert stats["fast"]["output_tokens"] == 40
@@ -1,7 +1,7 @@
 # tests/test_scheduler.py
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 
 
 @pytest.fixture(autouse=True)
@@ -11,16 +11,26 @@ def reset_firestore_singleton():
     import src.storage.firestore as fs_module
     fs_module.FirestoreClient._instance = None
     fs_module.FirestoreClient._initialized = False
+    fs_module.AsyncFirestoreClient._instance = None
+    fs_module.AsyncFirestoreClient._initialized = False
+
+
+async def _empty_stream():
+    return
+    yield
 
 
 def test_daily_checkin_endpoint():
     """Test daily check-in cron endpoint."""
     with patch("src.storage.firestore.firebase_admin") as mock_firebase:
-        with patch("src.storage.firestore.firestore") as mock_firestore:
+        with patch("src.storage.firestore.firestore") as mock_firestore, \
+                patch("src.storage.firestore.firestore_async") as mock_firestore_async:
             with patch("src.scheduler.checkins.Runner") as mock_runner:
                 mock_firebase._apps = []
                 mock_db = MagicMock()
                 mock_firestore.client.return_value = mock_db
+                mock_async_db = MagicMock()
+                mock_firestore_async.client.return_value = mock_async_db
 
                 # Mock config
                 mock_doc = MagicMock()
@@ -33,13 +43,13 @@ def test_daily_checkin_endpoint():
 
                 # Mock workout/meal queries
                 mock_query = MagicMock()
-                mock_query.stream.return_value = []
-                mock_db.collection.return_value.document.return_value.collection.return_value.where.return_value.order_by.return_value = mock_query
+                mock_query.stream.side_effect = lambda: _empty_stream()
+                mock_async_db.collection.return_value.document.return_value.collection.return_value.where.return_value.order_by.return_value = mock_query
 
                 # Mock runner
                 mock_result = MagicMock()
                 mock_result.final_output = "Time to move!"
-                mock_runner.run_sync.return_value = mock_result
+                mock_runner.run = AsyncMock(return_value=mock_result)
 
                 import src.storage.firestore as fs_module
                 fs_module.FirestoreClient._instance = None
@@ -52,12 +62,14 @@ def test_daily_checkin_endpoint():
 
                 assert response.status_code == 200
                 assert response.json()["status"] == "ok"
+                mock_runner.run.assert_awaited_once()
 
 
 def test_check_triggers_endpoint():
     """Test trigger check cron endpoint."""
     with patch("src.storage.firestore.firebase_admin") as mock_firebase:
-        with patch("src.storage.firestore.firestore") as mock_firestore:
+        with patch("src.storage.firestore.firestore") as mock_firestore, \
+                patch("src.storage.firestore.firestore_async"):
             mock_firebase._apps = []
             mock_db = MagicMock()
             mock_firestore.client.return_value = mock_db
@@ -79,3 +91,52 @@ def test_check_triggers_endpoint():
 
             assert response.status_code == 200
             assert response.json()["status"] == "ok"
+
+
+@pytest.mark.asyncio
+async def test_rule_plan_fetches_each_fact_once():
+    """Test rules sharing a fact trigger a single storage read for it."""
+    from src.scheduler.rules import compile_rules
+
+    storage = MagicMock()
+    storage.get_last_workout_date = AsyncMock(return_value=None)
+    storage.get_daily_rollups = AsyncMock(return_value=[{"calories": 1200}])
+
+    plan = compile_rules([
+        {"event": "no_workout", "days": 2, "action": "sms"},
+        {"event": "no_workout", "days": 4, "action": "call"},
+        {"event": "calorie_deficit", "threshold": 500, "action": "sms"},
+        {"event": "not_a_real_event"},
+    ])
+    triggered = await plan.run(storage, "keith")
+
+    assert plan.facts == ("days_since_workout", "calories_today")
+    storage.get_last_workout_date.assert_awaited_once_with(user_id="keith")
+    storage.get_daily_rollups.assert_awaited_once()
+    assert [t["rule"]["action"] for t in triggered] == ["sms", "call", "sms"]
+    assert triggered[2]["context"] == {"calorie_deficit": 800, "total_today": 1200}
+
+
+@pytest.mark.asyncio
+async def test_custom_event_types_plug_in():
+    """Test new events register their own fact providers and predicates."""
+    from src.scheduler import rules
+
+    @rules.fact_provider("test_workouts_this_week")
+    async def workouts_this_week(storage, user_id):
+        return await storage.count_workouts(days=7, user_id=user_id)
+
+    @rules.event_type("test_low_volume", "test_workouts_this_week")
+    def low_volume(rule, facts):
+        if facts["test_workouts_this_week"] < rule.get("min", 3):
+            return {"workouts": facts["test_workouts_this_week"]}
+        return None
+
+    try:
+        storage = MagicMock()
+        storage.count_workouts = AsyncMock(return_value=1)
+        triggered = await rules.compile_rules([{"event": "test_low_volume"}]).run(storage, "keith")
+        assert triggered[0]["context"] == {"workouts": 1}
+    finally:
+        rules.FACT_PROVIDERS.pop("test_workouts_this_week")
+        rules.EVENT_TYPES.pop("test_low_volume")
@@ -0,0 +1,151 @@
+# tests/test_storage_engines.py
+import os
+import pytest
+from datetime import datetime
+from unittest.mock import patch
+
+from src.storage.inmemory import InMemoryStorage
+from src.storage.sqlite import SQLiteStorage
+
+
+@pytest.fixture(params=["sqlite", "memory"])
+def storage(request, tmp_path):
+    """Each local engine, freshly created."""
+    if request.param == "sqlite":
+        backend = SQLiteStorage(str(tmp_path / "layz.db"))
+    else:
+        backend = InMemoryStorage()
+    yield backend
+    backend.close()
+
+
+def test_log_and_read_workouts(storage):
+    """Test workouts round-trip newest first with aware timestamps."""
+    storage.log_workout("run", 30, notes="easy 5k", user_id="keith")
+    storage.log_workout("push", 45, exercises=[{"name": "bench"}], user_id="keith")
+
+    workouts = storage.get_workouts(days=7, user_id="keith")
+
+    assert [w["type"] for w in workouts] == ["push", "run"]
+    assert workouts[0]["exercises"] == [{"name": "bench"}]
+    assert isinstance(workouts[0]["timestamp"], datetime)
+    assert workouts[0]["timestamp"].tzinfo is not None
+    assert storage.get_last_workout_date(user_id="keith") == workouts[0]["timestamp"]
+
+
+def test_users_are_isolated(storage):
+    """Test one user's logs never show up for another."""
+    storage.log_meal("lunch", 650, 45, 70, 18, "Chipotle bowl", user_id="keith")
+
+    assert storage.get_meals(days=1, user_id="someone-else") == []
+    assert storage.get_last_workout_date(user_id="keith") is None
+
+
+def test_daily_rollups(storage):
+    """Test daily rollups total today's logs and zero-fill other days."""
+    storage.log_workout("run", 30, user_id="keith")
+    storage.log_workout("run", 20, user_id="keith")
+    storage.log_meal("lunch", 650, 45, 70, 18, "bowl", user_id="keith")
+    storage.log_meal("dinner", 800, 50, 60, 30, "steak", user_id="keith")
+
+    rollups = storage.get_daily_rollups(days=3, user_id="keith")
+
+    assert len(rollups) == 3
+    today = rollups[0]
+    assert today["workout_count"] == 2
+    assert today["workout_minutes"] == 50
+    assert today["workout_types"] == ["run"]
+    assert today["meal_count"] == 2
+    assert today["calories"] == 1450
+    assert rollups[1]["calories"] == 0
+
+
+def test_meals_limit(storage):
+    """Test get_meals honours limit."""
+    for i in range(4):
+        storage.log_meal("snack", 100, 1, 1, 1, f"snack {i}", user_id="keith")
+
+    assert len(storage.get_meals(days=1, limit=2, user_id="keith")) == 2
+
+
+def test_config_documents(storage):
+    """Test config documents can be stored and read back."""
+    assert storage.get_config("schedule") is None
+
+    storage.set_config("schedule", {"daily_checkins": ["07:00"]})
+
+    assert storage.get_config("schedule") == {"daily_checkins": ["07:00"]}
+
+
+def test_engine_selected_by_env():
+    """Test STORAGE_BACKEND picks the engine and config reads go through it."""
+    with patch.dict(os.environ, {"STORAGE_BACKEND": "memory"}):
+        from src.storage.engine import get_storage
+        from src.config.loader import ConfigLoader
+
+        storage = get_storage()
+        assert isinstance(storage, InMemoryStorage)
+        assert get_storage() is storage
+
+        storage.set_config("schedule", {"timezone": "UTC", "daily_checkins": []})
+        assert ConfigLoader().get_schedule()["timezone"] == "UTC"
+
+
+def test_unknown_engine_rejected():
+    """Test an unknown STORAGE_BACKEND raises."""
+    with patch.dict(os.environ, {"STORAGE_BACKEND": "postgres"}):
+        from src.storage.engine import get_storage
+
+        with pytest.raises(ValueError):
+            get_storage()
+
+
+@pytest.mark.asyncio
+async def test_async_adapter_wraps_local_engine():
+    """Test the async view of a local engine is awaitable."""
+    with patch.dict(os.environ, {"STORAGE_BACKEND": "memory"}):
+        from src.storage.engine import get_async_storage
+
+        storage = get_async_storage()
+        await storage.log_workout("run", 30, user_id="keith")
+
+        assert len(await storage.get_workouts(days=1, user_id="keith")) == 1
+
+
+def test_aggregate_meals_and_count_workouts(storage):
+    """Test aggregate helpers total the window."""
+    storage.log_meal("lunch", 650, 45, 70, 18, "bowl", user_id="keith")
+    storage.log_meal("dinner", 800, 50, 60, 30, "steak", user_id="keith")
+    storage.log_workout("run", 30, user_id="keith")
+
+    assert storage.aggregate_meals(days=1, user_id="keith") == {
+        "count": 2, "calories": 1450, "protein": 95, "carbs": 130, "fat": 48,
+    }
+    assert storage.count_workouts(days=7, user_id="keith") == 1
+
+
+def test_activity_state(storage):
+    """Test local engines derive the last-activity state from their logs."""
+    storage.log_workout("run", 30, user_id="keith")
+    storage.log_meal("lunch", 650, 45, 70, 18, "Chipotle bowl", user_id="keith")
+
+    state = storage.get_activity_state(user_id="keith")
+
+    assert state["streak_days"] == 1
+    assert state["last_workout_at"] == storage.get_last_workout_date(user_id="keith")
+    assert state["last_meal_at"] is not None
+    assert state["today"]["workout_minutes"] == 30
+    assert state["today"]["calories"] == 650
+    assert storage.rebuild_activity_state(user_id="keith") == state
+
+
+def test_data_version_changes_on_log(storage):
+    """Test every workout or meal log changes the user's data version."""
+    before = storage.get_data_version(user_id="keith")
+
+    storage.log_workout("run", 30, user_id="keith")
+    after_workout = storage.get_data_version(user_id="keith")
+    storage.log_meal("lunch", 600, 30, 60, 20, "bowl", user_id="keith")
+
+    assert len({before, after_workout, storage.get_data_version(user_id="keith")}) == 3
+    assert storage.get_data_version(user_id="someone-else") == before
@@ -2,6 +2,8 @@
 import pytest
 from unittest.mock import MagicMock, patch
 
+from agents.models.interface import Model
+
 
 @pytest.fixture(autouse=True)
 def reset_firestore_singleton():
@@ -135,6 +137,32 @@ def test_send_sms_tool():
             assert "SM123" in result or "sent" in result.lower()
 
 
+@pytest.mark.asyncio
+async def test_async_sends_share_one_twilio_client():
+    """Test async SMS and calls reuse one Twilio client until shutdown closes it."""
+    from unittest.mock import AsyncMock
+
+    with patch("src.agent.tools.comms.Client") as mock_twilio, \
+            patch("src.agent.tools.comms.AsyncTwilioHttpClient") as mock_http, \
+            patch.dict("os.environ", {"TWILIO_ACCOUNT_SID": "test_sid", "TWILIO_AUTH_TOKEN": "test_token"}):
+        mock_client = mock_twilio.return_value
+        mock_client.messages.create_async = AsyncMock(return_value=MagicMock(sid="SM1"))
+        mock_client.calls.create_async = AsyncMock(return_value=MagicMock(sid="CA1"))
+        mock_client.http_client.close = AsyncMock()
+
+        from src.agent.tools.comms import _initiate_call_async, close_async_twilio_client, deliver_sms_async
+
+        assert await deliver_sms_async("+15550000001", "one") == "SM1"
+        assert await deliver_sms_async("+15550000002", "two") == "SM1"
+        assert "CA1" in await _initiate_call_async("check in")
+
+        mock_twilio.assert_called_once_with("test_sid", "test_token", http_client=mock_http.return_value)
+        mock_client.http_client.close.assert_not_called()
+
+        await close_async_twilio_client()
+        mock_client.http_client.close.assert_awaited_once()
+
+
 def test_function_tools_are_created():
     """Test that FunctionTool objects are properly created."""
     from agents import FunctionTool
@@ -149,3 +177,214 @@ def test_function_tools_are_created():
     assert isinstance(get_nutrition_summary, FunctionTool)
     assert isinstance(send_sms, FunctionTool)
     assert isinstance(initiate_call, FunctionTool)
+
+
+def test_get_nutrition_summary_uses_aggregation():
+    """Test nutrition totals come from an aggregation query, not a full entry scan."""
+    with patch("src.storage.firestore.firebase_admin") as mock_firebase:
+        with patch("src.storage.firestore.firestore") as mock_firestore:
+            mock_firebase._apps = []
+            mock_db = MagicMock()
+            mock_firestore.client.return_value = mock_db
+
+            def agg(alias, value):
+                result = MagicMock()
+                result.alias, result.value = alias, value
+                return result
+
+            mock_query = mock_db.collection.return_value.document.return_value.collection.return_value.where.return_value.order_by.return_value
+            aggregation = mock_query.count.return_value
+            aggregation.sum.return_value = aggregation
+            aggregation.get.return_value = [[
+                agg("count", 3), agg("calories", 1800), agg("protein", 120), agg("carbs", 150), agg("fat", 60),
+            ]]
+
+            mock_meal = MagicMock()
+            mock_meal.id = "meal1"
+            mock_meal.to_dict.return_value = {"description": "Chipotle bowl", "calories": 650}
+            mock_query.limit.return_value.stream.return_value = [mock_meal]
+
+            import src.storage.firestore as fs_module
+            fs_module.FirestoreClient._instance = None
+            fs_module.FirestoreClient._initialized = False
+
+            from src.agent.tools.nutrition import _get_nutrition_summary
+
+            result = _get_nutrition_summary(days=1)
+
+            assert "Meals logged: 3" in result
+            assert "Total calories: 1800" in result
+            assert "Chipotle bowl (650 cal)" in result
+            mock_query.limit.assert_called_once_with(5)
+            mock_query.stream.assert_not_called()
+
+
+def test_tools_use_user_from_context():
+    """Test tools act for the user set by user_context."""
+    with patch("src.storage.firestore.firebase_admin") as mock_firebase:
+        with patch("src.storage.firestore.firestore") as mock_firestore:
+            mock_firebase._apps = []
+            mock_db = MagicMock()
+            mock_firestore.client.return_value = mock_db
+
+            import src.storage.firestore as fs_module
+            fs_module.FirestoreClient._instance = None
+            fs_module.FirestoreClient._initialized = False
+
+            from src.agent.context import user_context
+            from src.agent.tools.fitness import _log_workout
+
+            with user_context("15551234567"):
+                _log_workout("ran 5k")
+
+            mock_db.collection.return_value.document.assert_called_with("15551234567")
+
+
+class _ScriptedModel(Model):
+    """Model stand-in that replays tool calls, then a final message, one step per LLM turn."""
+
+    def __init__(self, steps):
+        self.steps = list(steps)
+
+    async def get_response(self, *args, **kwargs):
+        import json
+        from agents.items import ModelResponse
+        from agents.usage import Usage
+        from openai.types.responses import ResponseFunctionToolCall, ResponseOutputMessage, ResponseOutputText
+
+        step = self.steps.pop(0)
+        if isinstance(step, str):
+            output = [ResponseOutputMessage(
+                id="msg", type="message", role="assistant", status="completed",
+                content=[ResponseOutputText(type="output_text", text=step, annotations=[])],
+            )]
+        else:
+            output = [
+                ResponseFunctionToolCall(
+                    id=f"fc{i}", call_id=f"call-{len(self.steps)}-{i}", type="function_call",
+                    name=name, arguments=json.dumps(arguments),
+                )
+                for i, (name, arguments) in enumerate(step)
+            ]
+        return ModelResponse(output=output, usage=Usage(requests=1, input_tokens=100, output_tokens=10), response_id=None)
+
+    def stream_response(self, *args, **kwargs):
+        raise NotImplementedError
+
+
+@pytest.mark.asyncio
+async def test_dashboard_combines_progress_data():
+    """Test the dashboard reports workouts, today's nutrition and the streak together."""
+    import os
+    with patch.dict(os.environ, {"STORAGE_BACKEND": "memory"}):
+        from src.agent.context import user_context
+        from src.agent.tools.dashboard import _get_dashboard_async
+        from src.storage.engine import get_storage
+
+        get_storage().log_workout("run", 30, user_id="keith")
+        get_storage().log_meal("lunch", 650, 45, 70, 18, "Chipotle bowl", user_id="keith")
+
+        with user_context("keith"):
+            dashboard = await _get_dashboard_async(days=7)
+
+        assert "Workouts in the past 7 days (1 total, 30 min)" in dashboard
+        assert "- Total calories: 650" in dashboard
+        assert "Current streak: 1 days." in dashboard
+
+
+@pytest.mark.asyncio
+async def test_repeat_tool_calls_memoized_within_run():
+    """Test a repeated read tool call in one run reuses the result until a write."""
+    import os
+    from agents import Agent, RunConfig, Runner
+
+    with patch.dict(os.environ, {"STORAGE_BACKEND": "memory"}):
+        from src.agent.context import tool_stats, user_context
+        from src.agent.tools import get_dashboard, get_fitness_summary, log_workout
+        from src.storage.engine import get_storage
+
+        model = _ScriptedModel([
+            [("_get_dashboard", {"days": 7}), ("_get_fitness_summary", {"days": 7})],
+            [("_get_dashboard", {"days": 7})],
+            [("_log_workout", {"description": "ran 5k 28 min"})],
+            [("_get_fitness_summary", {"days": 7})],
+            "You're on track.",
+        ])
+        agent = Agent(name="Coach", tools=[get_dashboard, get_fitness_summary, log_workout], model=model)
+
+        with patch.object(get_storage(), "get_daily_rollups", wraps=get_storage().get_daily_rollups) as rollups:
+            with user_context("keith"):
+                result = await Runner.run(agent, "How am I doing?", run_config=RunConfig(tracing_disabled=True))
+        tool_stats.record_run(result)
+
+        assert result.final_output == "You're on track."
+        # Dashboard (rollups + derived activity state), fitness summary, fitness summary after the log;
+        # the repeated dashboard call is served from the run's memo
+        assert rollups.call_count == 4
+        stats = tool_stats.stats()
+        assert stats["memo"] == {"hits": 1, "misses": 3}
+        assert stats["llm_turns_per_run"] == 5
+        assert stats["tool_calls_per_run"] == 5
+
+
+@pytest.mark.asyncio
+async def test_concurrent_runs_do_not_serialize_on_tool_io():
+    """Test 20 simultaneous coach runs overlap their async tool I/O instead of queueing."""
+    import asyncio
+    import os
+    import time
+    from agents import Agent, RunConfig, Runner
+
+    with patch.dict(os.environ, {"STORAGE_BACKEND": "memory"}):
+        from src.agent.coach import COACH_TOOLS
+        from src.agent.context import user_context
+        from src.storage.engine import get_storage
+
+        latency = 0.1
+
+        class SlowStorage:
+            """Async storage whose every call waits ``latency`` seconds, like a network round trip."""
+
+            def __getattr__(self, name):
+                method = getattr(get_storage(), name)
+
+                async def call(*args, **kwargs):
+                    await asyncio.sleep(latency)
+                    return method(*args, **kwargs)
+                return call
+
+        async def conversation(n: int) -> str:
+            model = _ScriptedModel([
+                [("_get_dashboard", {"days": 7})],
+                [("_log_workout", {"description": "ran 5k 28 min"})],
+                [("_get_nutrition_summary", {"days": 1})],
+                f"Done {n}.",
+            ])
+            agent = Agent(name="Coach", tools=COACH_TOOLS, model=model)
+            with user_context(f"user{n}"):
+                result = await Runner.run(agent, "How am I doing?", run_config=RunConfig(tracing_disabled=True))
+            return result.final_output
+
+        lags = []
+
+        async def heartbeat():
+            while True:
+                tick = time.perf_counter()
+                await asyncio.sleep(0.01)
+                lags.append(time.perf_counter() - tick - 0.01)
+
+        with patch("src.agent.tools.fitness.get_async_storage", SlowStorage), \
+                patch("src.agent.tools.nutrition.get_async_storage", SlowStorage), \
+                patch("src.agent.tools.dashboard.get_async_storage", SlowStorage):
+            beat = asyncio.create_task(heartbeat())
+            started = time.perf_counter()
+            replies = await asyncio.gather(*(conversation(n) for n in range(20)))
+            elapsed = time.perf_counter() - started
+            beat.cancel()
+
+        assert replies == [f"Done {n}." for n in range(20)]
+        # Each run waits on three storage round trips (the dashboard's reads are
+        # concurrent); serialized, 20 runs would take 20 * 3 * latency = 6s
+        assert elapsed < 20 * 3 * latency / 4
+        assert max(lags) < 0.25
+        assert len(get_storage().get_workouts(days=1, user_id="user7")) == 1
@@ -1,4 +1,6 @@
 # tests/test_webhooks.py
+import os
+
 import pytest
 from fastapi.testclient import TestClient
 from unittest.mock import patch, MagicMock, AsyncMock
@@ -43,3 +45,101 @@ def test_health_endpoint():
 
     assert response.status_code == 200
     assert response.json() == {"status": "healthy"}
+
+
+@pytest.mark.asyncio
+async def test_slow_sms_reply_is_deferred_to_rest_api():
+    """Test a reply that overruns the budget acks empty TwiML and is texted later."""
+    import asyncio
+    from src.webhooks.deferred import DeferredReplies
+
+    async def slow_chat(message, user_id):
+        await asyncio.sleep(0.1)
+        return "Worth the wait."
+
+    replies = DeferredReplies(budget=0.02)
+    with patch("src.webhooks.sms.chat_async", slow_chat), \
+            patch("src.webhooks.sms.sms_replies", replies), \
+            patch("src.webhooks.deferred.deliver_sms_async") as mock_deliver:
+        from src.webhooks.sms import handle_sms
+
+        twiml = await handle_sms(Body="How am I doing?", From="+15551234567")
+
+        assert "<Message>" not in twiml
+        assert replies.stats()["deferred_by_elapsed"] == 1
+        assert replies.depth() == 1
+        await asyncio.gather(*replies._background)
+
+        mock_deliver.assert_called_once_with("+15551234567", "Worth the wait.")
+        stats = replies.stats()
+        assert stats["delivered"] == 1
+        assert stats["queue_depth"] == 0
+        assert stats["delivery_p50_s"] >= 0.1
+
+
+@pytest.mark.asyncio
+async def test_sms_deferred_up_front_when_estimate_over_budget():
+    """Test replies go straight to the worker queue while the estimate is over budget."""
+    from src.webhooks.deferred import DeferredReplies
+
+    replies = DeferredReplies(budget=1.0, workers=1)
+    replies.record(5.0)
+    chat = AsyncMock(return_value="Later.")
+    with patch.dict(os.environ, {"STORAGE_BACKEND": "memory"}), \
+            patch("src.webhooks.sms.agent_reply", chat), \
+            patch("src.webhooks.sms.sms_replies", replies), \
+            patch("src.webhooks.deferred.deliver_sms_async") as mock_deliver:
+        from src.webhooks.sms import handle_sms
+
+        await replies.start()
+        twiml = await handle_sms(Body="hi", From="+15551234567")
+        assert "<Message>" not in twiml
+        await replies.stop()
+
+    chat.assert_awaited_once()
+    assert chat.await_args.args[:2] == ("hi", "15551234567")
+    mock_deliver.assert_called_once_with("+15551234567", "Later.")
+    assert replies.stats()["deferred_by_estimate"] == 1
+
+
+@pytest.mark.asyncio
+async def test_fast_path_log_answered_inline_while_deferring():
+    """Test a plain log gets its TwiML reply even while agent replies are being deferred."""
+    from src.webhooks.deferred import DeferredReplies
+
+    replies = DeferredReplies(budget=1.0)
+    replies.record(5.0)
+    with patch.dict(os.environ, {"STORAGE_BACKEND": "memory"}), \
+            patch("src.webhooks.sms.agent_reply", AsyncMock()) as mock_agent, \
+            patch("src.webhooks.sms.sms_replies", replies):
+        from src.webhooks.sms import handle_sms
+
+        twiml = await handle_sms(Body="ran 5k 28 min", From="+15551234567")
+
+    assert "<Message>Logged: 5 km run, 28 min." in twiml
+    mock_agent.assert_not_called()
+    assert replies.stats()["inline"] == 1
+    assert replies.stats()["deferred_by_estimate"] == 0
+
+
+@pytest.mark.asyncio
+async def test_estimate_excludes_time_waiting_for_a_worker():
+    """Test queued replies feed the estimate their handler time, not their wait."""
+    import asyncio
+    import time
+    from src.webhooks.deferred import DeferredReplies
+
+    async def reply():
+        await asyncio.sleep(0.05)
+        return "Done."
+
+    replies = DeferredReplies(budget=0.08, workers=1, alpha=1.0)
+    with patch("src.webhooks.deferred.deliver_sms_async"):
+        await replies.start()
+        for _ in range(4):
+            replies.defer(reply, "+15551234567", time.monotonic())
+        await replies.stop()
+
+    # The last job waited ~0.15s for the worker but only ran for ~0.05s
+    assert replies.estimate < replies.budget
+    assert not replies.should_defer()
@@ -0,0 +1,209 @@
+# tests/test_writebehind.py
+import os
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+
+@pytest.fixture(autouse=True)
+def reset_firestore_singleton():
+    """Reset the FirestoreClient singleton between tests."""
+    yield
+    import src.storage.firestore as fs_module
+    if fs_module.FirestoreClient._initialized:
+        fs_module.FirestoreClient().close()
+    fs_module.FirestoreClient._instance = None
+    fs_module.FirestoreClient._initialized = False
+    fs_module.AsyncFirestoreClient._instance = None
+    fs_module.AsyncFirestoreClient._initialized = False
+
+
+def _queue(db, **kwargs):
+    from src.storage.writebehind import WriteBehindQueue
+    kwargs.setdefault("flush_interval", 60)
+    return WriteBehindQueue(db, **kwargs)
+
+
+def test_stage_defers_commit_until_flush():
+    """Test staged writes are only committed on flush."""
+    db = MagicMock()
+    queue = _queue(db)
+
+    queue.stage([("ref1", {"a": 1}, False), ("rollup", {"n": 1}, True)])
+    queue.stage([("ref2", {"a": 2}, False)])
+
+    db.batch.return_value.commit.assert_not_called()
+    assert queue.stats()["pending"] == 2
+
+    queue.flush()
+
+    db.batch.return_value.commit.assert_called_once()
+    assert db.batch.return_value.set.call_count == 3
+    stats = queue.stats()
+    assert stats["queued"] == 2
+    assert stats["flushed"] == 2
+    assert stats["pending"] == 0
+    queue.close()
+
+
+def test_backpressure_flushes_inline_when_full():
+    """Test a full queue makes the producer flush before staging more."""
+    db = MagicMock()
+    queue = _queue(db, batch_size=100, max_queue=2)
+
+    queue.stage([("ref1", {}, False)])
+    queue.stage([("ref2", {}, False)])
+    queue.stage([("ref3", {}, False)])
+
+    assert queue.stats()["flushed"] == 2
+    assert queue.pending() == 1
+    queue.close()
+    assert queue.stats()["flushed"] == 3
+
+
+def test_commit_retries_then_counts_failures():
+    """Test failed commits are retried with backoff and counted when dropped."""
+    db = MagicMock()
+    db.batch.return_value.commit.side_effect = Exception("unavailable")
+    queue = _queue(db, max_retries=2, retry_backoff=0)
+
+    queue.stage([("ref1", {}, False)])
+    queue.flush()
+
+    stats = queue.stats()
+    assert db.batch.return_value.commit.call_count == 3
+    assert stats["retries"] == 2
+    assert stats["failed"] == 1
+    assert stats["flushed"] == 0
+    queue.close()
+
+
+def test_transactional_groups_commit_alone_in_order():
+    """Test a staged transaction runs on its own between write batches."""
+    db = MagicMock()
+    order = []
+    db.batch.return_value.commit.side_effect = lambda: order.append("batch")
+    queue = _queue(db)
+
+    queue.stage([("ref1", {}, False)])
+    queue.stage(lambda db: order.append("transaction"))
+    queue.stage([("ref2", {}, False)])
+    queue.flush()
+
+    assert order == ["batch", "transaction", "batch"]
+    assert queue.stats()["flushed"] == 3
+    queue.close()
+
+
+def test_firestore_client_write_behind_returns_id_immediately():
+    """Test log_workout returns a client-generated ID without committing."""
+    with patch.dict(os.environ, {"FIRESTORE_WRITE_BEHIND": "1"}):
+        with patch("src.storage.firestore.firebase_admin") as mock_firebase:
+            with patch("src.storage.firestore.firestore") as mock_firestore:
+                mock_firebase._apps = []
+                mock_db = MagicMock()
+                mock_firestore.client.return_value = mock_db
+                mock_doc_ref = MagicMock()
+                mock_doc_ref.id = "client-id"
+                mock_db.collection.return_value.document.return_value.collection.return_value.document.return_value = mock_doc_ref
+                transaction = mock_db.transaction.return_value
+                transaction._max_attempts = 1
+                transaction._read_only = False
+
+                from src.storage.firestore import FirestoreClient, shutdown_storage
+                FirestoreClient._instance = None
+                FirestoreClient._initialized = False
+
+                client = FirestoreClient()
+                result = client.log_workout(workout_type="run", duration_mins=30)
+
+                assert result == "client-id"
+                transaction._commit.assert_not_called()
+
+                shutdown_storage()
+
+                # The staged log runs as its own transaction, reading the activity doc first
+                mock_doc_ref.get.assert_called_once_with(transaction=transaction)
+                assert transaction.set.call_count == 3
+                transaction._commit.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_async_reads_flush_sync_write_behind():
+    """Test the async client lands logs staged by the sync client before reading."""
+    with patch.dict(os.environ, {"FIRESTORE_WRITE_BEHIND": "1"}):
+        with patch("src.storage.firestore.firebase_admin") as mock_firebase, \
+                patch("src.storage.firestore.firestore") as mock_firestore, \
+                patch("src.storage.firestore.firestore_async") as mock_firestore_async:
+            mock_firebase._apps = []
+            mock_db = MagicMock()
+            mock_firestore.client.return_value = mock_db
+            transaction = mock_db.transaction.return_value
+            transaction._max_attempts = 1
+            transaction._read_only = False
+            async_db = MagicMock()
+            mock_firestore_async.client.return_value = async_db
+            activity_ref = async_db.collection.return_value.document.return_value.collection.return_value.document.return_value
+            activity_ref.get = AsyncMock(return_value=MagicMock(exists=True, to_dict=MagicMock(return_value={"data_version": 1})))
+
+            from src.storage.firestore import AsyncFirestoreClient, FirestoreClient
+            FirestoreClient().log_workout(workout_type="run", duration_mins=30)
+            transaction._commit.assert_not_called()
+
+            assert await AsyncFirestoreClient().get_data_version() == "1"
+
+            transaction._commit.assert_called_once()
+            assert FirestoreClient().write_behind.pending() == 0
+
+
+def _write_behind_client(mock_firestore):
+    """FirestoreClient with write-behind on and transactions that commit first try."""
+    mock_db = MagicMock()
+    mock_firestore.client.return_value = mock_db
+    transaction = mock_db.transaction.return_value
+    transaction._max_attempts = 1
+    transaction._read_only = False
+
+    from src.storage.firestore import FirestoreClient
+    FirestoreClient._instance = None
+    FirestoreClient._initialized = False
+    return FirestoreClient(), mock_db
+
+
+def test_same_day_logs_commit_in_one_batch():
+    """Test logs after the day's first one are plain write groups that share a WriteBatch."""
+    with patch.dict(os.environ, {"FIRESTORE_WRITE_BEHIND": "1"}):
+        with patch("src.storage.firestore.firebase_admin") as mock_firebase, \
+                patch("src.storage.firestore.firestore") as mock_firestore:
+            mock_firebase._apps = []
+            client, mock_db = _write_behind_client(mock_firestore)
+
+            client.log_meal(meal_type="breakfast", calories=400, protein=20, carbs=50, fat=10, description="oats")
+            client.write_behind.flush()
+            for calories in (300, 500, 700):
+                client.log_meal(meal_type="snack", calories=calories, protein=5, carbs=5, fat=5, description="snack")
+            client.write_behind.flush()
+
+            mock_db.transaction.return_value._commit.assert_called_once()
+            mock_db.batch.return_value.commit.assert_called_once()
+            assert mock_db.batch.return_value.set.call_count == 9
+            stats = client.write_behind.stats()
+            assert stats["flushed"] == 4 and stats["batches"] == 2
+
+
+@pytest.mark.asyncio
+async def test_async_logs_are_staged_in_the_shared_queue():
+    """Test the async client stages logs instead of committing on the reply path."""
+    with patch.dict(os.environ, {"FIRESTORE_WRITE_BEHIND": "1"}):
+        with patch("src.storage.firestore.firebase_admin") as mock_firebase, \
+                patch("src.storage.firestore.firestore") as mock_firestore, \
+                patch("src.storage.firestore.firestore_async") as mock_firestore_async:
+            mock_firebase._apps = []
+            client, mock_db = _write_behind_client(mock_firestore)
+            async_db = mock_firestore_async.client.return_value
+
+            from src.storage.firestore import AsyncFirestoreClient
+            await AsyncFirestoreClient().log_workout(workout_type="run", duration_mins=30)
+
+            assert client.write_behind.pending() == 1
+            async_db.transaction.assert_not_called()
+            async_db.batch.assert_not_called()